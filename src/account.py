@@ -1,60 +1,129 @@
+import logging
 import pathlib
-import json
-import traceback
-from typing import Final, Self, Any
-from maid import poslog
+import threading
+from typing import Callable, Final, Self, Any
+from ringlog import poslog
+from itemindex import ItemIndex
+from item import Task, Todo
+from storage import Storage, apply_record, open_storage
+from registry import make_verifier, check_password
+from bodycache import BodyCache
+from durable import Durability
+from autosave import Autosaver
+from metrics import metrics
+import config
 
 SRC: Final[pathlib.Path] = pathlib.Path(__file__).parent
 
 
+class DefaultStorage:
+    "Account.storage until first used, importing account opens nothing on disk"
+
+    def __get__(self, _obj: Any, _owner: type, /) -> Storage:
+        storage = open_storage(
+            config.storage, SRC / "account_db", durability=Durability(config.durability)
+        )
+        # the class attribute takes the descriptor's place, opened only once
+        _owner.storage = storage
+        return storage
+
+
 class Account:
-    db_path = SRC / "account_db"
-
-    def __init__(self, _acc_name: str | pathlib.Path, _password: Any = None, /) -> Self:
-        if isinstance(_acc_name, str):
-            if _acc_name.strip() == "":
-                raise ValueError("error: file name cannot be empty")
-            self.path = self.db_path / pathlib.Path(
-                str("acc_" + _acc_name)
-            ).with_suffix(".json")
-        else:
-            self.path = _acc_name
-        self.name = self.path.with_suffix("").name
+    storage: Storage = DefaultStorage()
+    # bytes of task bodies kept in memory once they were loaded on demand
+    body_budget = config.body_cache
+
+    def __init__(self, _acc_name: str, _password: Any = None, /) -> Self:
+        if _acc_name.strip() == "":
+            raise ValueError("error: file name cannot be empty")
+        self.name = _acc_name
+        self.seq = 0
+        self.changes = []
+        self.bytes_written = 0
+        self._undo = None
+        self._depth = 0
+        self._begin_seq = 0
+        # a nested transaction rolled back, the outermost one may not commit
+        self._aborted = False
+        self.bodies = BodyCache(self.body_budget)
+        self.listeners = []
+        self.autosave = None
+        # why the last save off the ui thread failed, None once one landed
+        self.autosave_error = None
+        # newest seq this session knows is on disk, what other sessions
+        # saved past it waits in found until the ui thread merges it
+        self.disk_seq = 0
+        self.found = []
+        # ours write_changes() landed, the ui thread gives their bodies a ref
+        self.landed = []
+        self._sync = threading.RLock()
+        # whether the account is on disk, approve() appends or creates by it
+        self.stored = False
         self.data = {
-            "acc-name": self.name,
-            "acc-pass": str(_password) if _password is not None else None,
+            "acc-name": f"acc_{self.name}",
+            "acc-pass": None,
             "acc-data": {
-                "task": [],
-                "todo": [],
+                "task": ItemIndex(),
+                "todo": ItemIndex(),
             },
         }
 
-        if self.path.exists():
-            with self.path.open() as _acf:
-                self.data = json.load(_acf)
-        else:
-            try:
-                self.path.touch(exist_ok=False)
-            except FileExistsError:
-                pass
+        self.load()
+        if not self.stored and _password is not None:
+            # only a verifier is kept, never the password itself
+            self.data["acc-pass"] = make_verifier(str(_password))
+
+    def load(self) -> None:
+        loaded = self.storage.load(self.name)
+        # the bodies of the items being replaced no longer count
+        self.bodies.clear()
+        if loaded is not None:
+            self.data, self.seq = loaded
+            self.disk_seq = self.seq
+        self.stored = loaded is not None
+        self.tasks = self.data["acc-data"]["task"]
+        self.todos = self.data["acc-data"]["todo"]
+        self.notify({"op": "reset"})
+
+    def subscribe(self, _listener: Callable[[dict[str, Any]], None], /) -> None:
+        "the listener sees every applied record, and a reset when it all changed"
+        self.listeners.append(_listener)
+
+    def unsubscribe(self, _listener: Callable[[dict[str, Any]], None], /) -> None:
+        if _listener in self.listeners:
+            self.listeners.remove(_listener)
+
+    def notify(self, _record: dict[str, Any], /) -> None:
+        for listener_ in self.listeners:
+            listener_(_record)
 
-        self.task_link = self.data["acc-data"]["task"]
-        self.todo_link = self.data["acc-data"]["todo"]
+    @property
+    def path(self) -> pathlib.Path:
+        return self.storage.path_of(self.name)
 
     def __delete_account(self) -> None:
-        self.path.unlink(missing_ok=False)
+        self.storage.delete(self.name)
+        self.stored = False
 
     def __enter__(self) -> Self:
+        self.begin()
         return self
 
     def __exit__(self, _exc_type, _exc_val, _trace) -> bool:
-        self.approve()
-        if _exc_type is not None:
+        if _exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+            # this with block is over, an outer one still holds the rest
+            self._depth = max(0, self._depth - 1)
+            # into the log ring, stderr is the terminal curses is drawing on
             poslog(
-                f"an exception occurred :\nexception : {_exc_type}\nvalue : {_exc_val}\ntraceback : {_trace}\n"
+                "rolled back on %s : %s",
+                _exc_type.__name__,
+                _exc_val,
+                level=logging.ERROR,
+                exc_info=(_exc_type, _exc_val, _trace),
             )
-
-            traceback.print_tb(_trace)
             # raise _exc_type(_exc_val)
             raise _exc_type from _exc_val
         return True
@@ -68,127 +137,419 @@ class Account:
         return self.data["acc-pass"]
 
     @property
-    def content(self) -> dict[str, list[dict[str, str]]]:
-        return self.data["acc-data"]
+    def content(self) -> dict[str, list[dict[str, Any]]]:
+        return {
+            "task": [
+                Task(tsk_.name, self.get_task_content(tsk_.name)).to_json()
+                for tsk_ in self.tasks.values()
+            ],
+            "todo": [tdo_.to_json() for tdo_ in self.todos.values()],
+        }
 
     @property
-    def task(self) -> list[dict[str, str]]:
-        return self.task_link
+    def task(self) -> list[Task]:
+        return list(self.tasks.values())
 
     @property
-    def todo(self) -> list[dict[str, str]]:
-        return self.todo_link
+    def todo(self) -> list[Todo]:
+        return list(self.todos.values())
 
     @property
-    def items(self) -> list[dict[str, str]]:
+    def items(self) -> list[Task | Todo]:
         itms = []
-        itms.extend(self.task_link)
-        itms.extend(self.todo_link)
+        itms.extend(self.tasks.values())
+        itms.extend(self.todos.values())
         return itms
 
-    def is_account(self) -> bool:
-        return self.path.name.startswith("acc_")
+    def has_task(self, _task_name: str, /) -> bool:
+        return _task_name in self.tasks
+
+    def has_todo(self, _todo_name: str, /) -> bool:
+        return _todo_name in self.todos
+
+    @property
+    def durability(self) -> Durability:
+        return self.storage.durability
+
+    @durability.setter
+    def durability(self, _durability: Durability) -> None:
+        # the level belongs to the backend, every account using it follows
+        self.storage.durability = _durability
 
     def is_exist(self) -> bool:
-        dat = None
-        with self.path.open() as _file:
-            dat = _file.read()
-        return dat != ""
+        return self.storage.exists(self.name)
 
-    def approve(self) -> None:
-        with self.path.open("w") as _acc:
-            json.dump(self.data, _acc)
+    @property
+    def dirty(self) -> bool:
+        return bool(self.changes)
+
+    @property
+    def unflushed(self) -> bool:
+        "changes made that are not on disk yet, queued ones included"
+        return self.dirty or (self.autosave is not None and self.autosave.unflushed)
+
+    def start_autosave(self, _delay: float, /) -> bool:
+        "hand approved changes to a writer thread, False when it has to stay inline"
+        if self.autosave is not None:
+            return True
+        if _delay <= 0 or self.storage.append_reads_items or not self.is_exist():
+            return False
+        self.autosave = Autosaver(self, _delay)
+        return True
+
+    @property
+    def save_error(self) -> Exception | None:
+        "why changes are not reaching the disk, None while they do"
+        if self.autosave is not None:
+            return self.autosave.error
+        return self.autosave_error
+
+    def stop_autosave(self) -> Exception | None:
+        """
+        land everything queued, later approves write inline again. what the
+        writer could not save gets one more inline try, failing that it stays
+        in changes for the next approve and the error comes back
+        """
+        if self.autosave is None:
+            return None
+        leftover = self.autosave.close()
+        self.autosave = self.autosave_error = None
+        if not leftover:
+            return None
+        try:
+            self.bytes_written += self.write_changes(leftover)
+        except Exception as _err:
+            self.changes[:0] = leftover
+            self.autosave_error = _err
+            poslog(
+                "%d changes of %s not saved : %s",
+                len(leftover),
+                self.name,
+                _err,
+                level=logging.ERROR,
+            )
+            return _err
+        return None
+
+    def upgrade(self) -> None:
+        "let the storage bring an older layout of this account up to date"
+        if self.stored:
+            self.storage.upgrade(self.name, self.data)
+
+    def close(self) -> None:
+        "the session is over, whatever summary the storage keeps catches up once"
+        if self.stored and self.bytes_written:
+            self.storage.checkpoint(self.name, self.data)
+
+    def unwritten(self) -> list[dict[str, Any]]:
+        "records applied here that are not on disk yet, in order"
+        queued = self.autosave.queued() if self.autosave is not None else []
+        return [*queued, *self.changes]
+
+    def flush(self) -> Exception | None:
+        "wait for queued saves, the error when the writer could not land them"
+        if self.autosave is not None:
+            return self.autosave.flush()
+        return None
+
+    def begin(self) -> None:
+        "open a transaction, nested calls join the outermost one"
+        if self._depth == 0:
+            self._undo = []
+            self._begin_seq = self.seq
+        self._depth += 1
+
+    def commit(self) -> int:
+        "persist the change set once the outermost transaction closes"
+        if self._depth > 0:
+            self._depth -= 1
+            if self._depth > 0:
+                return 0
+        if self._aborted:
+            self.rollback()
+            raise ValueError("error: a nested transaction was rolled back")
+        self._undo = None
+        self.tasks.purge()
+        self.todos.purge()
+        return self.approve()
+
+    def rollback(self) -> None:
+        """
+        drop every change made since the outermost begin(). nested, the
+        transactions stay open and the outermost commit raises instead
+        """
+        if self._undo:
+            for undo_ in reversed(self._undo):
+                undo_()
+            self.seq = self._begin_seq
+            # only when something was undone, listeners rebuild on a reset
+            self.notify({"op": "reset"})
+        self.changes.clear()
+        if self._depth > 1:
+            self._undo = []
+            self._aborted = True
+            return
+        self._undo = None
+        self._depth = 0
+        self._aborted = False
+
+    @metrics.timed("approve")
+    def approve(self) -> int:
+        if self.autosave is not None:
+            # the writer lands it later, the caller never waits on the disk
+            if self.changes:
+                self.autosave.request(self.changes)
+                self.changes = []
+            return 0
+        if self.stored and not self.changes:
+            return 0
+        if self.stored:
+            written = self.write_changes(self.changes)
+        else:
+            with self._sync, self.storage.lock(self.name):
+                written = self.storage.create(self.name, self.data, self.seq)
+                self.disk_seq = self.seq
+                self.landed.extend(self.changes)
+            self.stored = True
+            metrics.count("bytes written", written)
+        self.changes.clear()
+        self.bytes_written += written
+        self.merge_found()
+        return written
+
+    @metrics.timed("write")
+    def write_changes(self, _changes: list[dict[str, Any]], /) -> int:
+        """
+        append records under the account's lock, numbered after whatever other
+        sessions saved meanwhile. safe off the ui thread unless the backend
+        rewrites every item, then it runs inline and merges theirs first
+        """
+        with self._sync, self.storage.lock(self.name):
+            last = self.storage.last_seq(self.name)
+            if last != self.disk_seq:
+                theirs = self.storage.changes_since(self.name, self.disk_seq)
+                if self.storage.append_reads_items:
+                    # the whole state gets written, it has to hold theirs first
+                    self.merge([(theirs, [])])
+                else:
+                    # ours land after theirs, so ours win again on the merge
+                    self.found.append((theirs, [*_changes]))
+            for seq_, rec_ in enumerate(_changes, last + 1):
+                rec_["seq"] = seq_
+            seq = last + len(_changes)
+            written = self.storage.append(self.name, _changes, self.data, seq)
+            self.disk_seq = seq
+            self.landed.extend(_changes)
+        metrics.count("bytes written", written)
+        return written
+
+    def poll(self) -> bool:
+        "merge what other sessions saved since the last look, True when any came"
+        # a busy writer reports what it found itself, no waiting here
+        if not self._sync.acquire(blocking=False):
+            return False
+        try:
+            if self.storage.last_seq(self.name) != self.disk_seq:
+                theirs = self.storage.changes_since(self.name, self.disk_seq)
+                self.found.append((theirs, []))
+                if theirs:
+                    self.disk_seq = theirs[-1]["seq"]
+            found, self.found = self.found, []
+            landed, self.landed = self.landed, []
+        finally:
+            self._sync.release()
+        self.saved(landed)
+        return self.merge(found)
+
+    def merge_found(self) -> bool:
+        with self._sync:
+            found, self.found = self.found, []
+            landed, self.landed = self.landed, []
+        self.saved(landed)
+        return self.merge(found)
+
+    def saved(self, _records: list[dict[str, Any]], /) -> None:
+        "records now on disk, the bodies they set may be unloaded and read back"
+        for rec_ in _records:
+            if rec_["op"] not in ("add-task", "edit-task"):
+                continue
+            itm = self.tasks.get(rec_["task-name"])
+            # a later edit put another body in place, that one is not saved yet
+            if itm is not None and itm.ref is None and itm.content is rec_["task-content"]:
+                # no place in a bodies file yet, storage finds it by name
+                itm.ref = True
+        self.bodies.evict()
+
+    def merge(
+        self, _found: list[tuple[list[dict[str, Any]] | None, list[dict[str, Any]]]], /
+    ) -> bool:
+        """
+        apply (their records, ours saved after them) pairs on the ui thread.
+        ours that are not on disk yet come after all of it, so they win again
+        """
+        if not _found:
+            return False
+        if any(theirs_ is None for theirs_, _ in _found):
+            # theirs were folded into a snapshot already, read everything again
+            self.flush()
+            with self._sync:
+                self.load()
+            # what is still queued after a failed flush goes on top again
+            for rec_ in self.unwritten():
+                self.absorb(rec_)
+        else:
+            for theirs_, ours_ in _found:
+                for rec_ in (*theirs_, *ours_):
+                    self.absorb(rec_)
+                self.saved([*theirs_, *ours_])
+            for rec_ in self.unwritten():
+                self.absorb(rec_)
+        self.seq = max(self.seq, self.disk_seq)
+        return True
+
+    def absorb(self, _record: dict[str, Any], /) -> bool:
+        "apply a record saved elsewhere, nothing to undo and nothing to write"
+        if self.undo_for(_record) is None:
+            return False
+        self.apply(_record)
+        self.notify(_record)
+        return True
+
+    def apply(self, _record: dict[str, Any], /) -> None:
+        "apply_record() here, the bodies it sets or drops follow in the lru"
+        op = _record["op"]
+        if op in ("add-task", "delete-task", "rename-task"):
+            itm = self.tasks.get(_record["task-name"])
+            if itm is not None and op == "rename-task" and itm.ref is True:
+                # found by its name, it is pinned until the new one is saved
+                self.get_task_content(itm.name)
+                itm.ref = None
+            elif itm is not None:
+                # a replaced or deleted body leaves the lru with its item
+                self.bodies.discard(itm)
+        apply_record(self.data, _record)
+        if op in ("add-task", "edit-task"):
+            # counted against the budget, unloaded only once it is saved
+            self.bodies.put(self.tasks[_record["task-name"]])
+
+    def record(self, _record: dict[str, Any], /) -> None:
+        "apply a mutation in memory and queue it for the next approve()"
+        undo = self.undo_for(_record)
+        if undo is None:
+            # nothing would change, keep the account clean
+            return
+        self.seq += 1
+        _record["seq"] = self.seq
+        self.apply(_record)
+        self.changes.append(_record)
+        if self._undo is not None:
+            self._undo.append(undo)
+        self.notify(_record)
+
+    def undo_for(self, _record: dict[str, Any], /) -> Callable[[], None] | None:
+        "build the inverse of a record, None when the record is a no-op"
+        op, _, kind = _record["op"].partition("-")
+        if op == "set":
+            old_pass = self.data["acc-pass"]
+            if old_pass == _record["acc-pass"]:
+                return None
+            return lambda: self.data.__setitem__("acc-pass", old_pass)
+        items = self.tasks if kind == "task" else self.todos
+        name = _record[f"{kind}-name"]
+        old = items.get(name)
+        if op == "add":
+            if old is None:
+
+                def undo() -> None:
+                    # an unsaved body leaves the lru with its item
+                    self.bodies.discard(items[name])
+                    items.discard(name)
+
+                return undo
+            return lambda: items.add(old)
+        if old is None:
+            return None
+        if op == "delete":
+            return lambda: items.restore(name, old)
+        if op == "rename":
+            new_name = _record["new-name"]
+            if new_name in items:
+                return None
+            return lambda: items.rename(new_name, name)
+        if op == "edit":
+            saved, saved_ref = self.get_task_content(name), old.ref
+            if saved == _record["task-content"]:
+                return None
+            # an edited body is pinned in memory until it reaches storage
+            self.bodies.discard(old)
+
+            def undo() -> None:
+                old.content, old.ref = saved, saved_ref
+                self.bodies.put(old)
+
+            return undo
+        saved = old.finished
+        if saved == _record["finished?"]:
+            return None
+        # records mutate the item in place, restore the original value
+        return lambda: setattr(old, "finished", saved)
 
     def set_password(self, _old_password: str | None, _new_password: Any) -> None:
-        if self.data["acc-pass"] is None or self.data["acc-pass"] == _old_password:
-            self.data["acc-pass"] = str(_new_password)
+        stored = self.data["acc-pass"]
+        if stored is None or check_password(stored, _old_password):
+            self.record({"op": "set-pass", "acc-pass": make_verifier(str(_new_password))})
 
     def add_task(self, _task_name: str, _task_content: str, /) -> None:
-        task_temp = {
-            "task-name": _task_name,
-            "item-type": "task",
-            "task-content": _task_content,
-        }
-        self.task.append(task_temp)
+        self.record(
+            {"op": "add-task", "task-name": _task_name, "task-content": _task_content}
+        )
 
     def add_todo(self, _todo_name: str, _finished: bool, /) -> None:
-        todo_temp = {
-            "todo-name": _todo_name,
-            "item-type": "todo",
-            "finished?": _finished,
-        }
-        self.todo.append(todo_temp)
+        self.record({"op": "add-todo", "todo-name": _todo_name, "finished?": _finished})
 
     def delete_task(self, _task_name: str, /) -> bool:
-        for idx_, itm_ in enumerate(self.task):
-            if (
-                itm_.get("item-type", None) == "task"
-                and itm_["task-name"] == _task_name
-            ):
-                self.task.pop(idx_)
+        self.record({"op": "delete-task", "task-name": _task_name})
 
     def delete_todo(self, _todo_name: str, /) -> bool:
-        for idx_, itm_ in enumerate(self.todo):
-            if (
-                itm_.get("item-type", None) == "task"
-                and itm_["task-name"] == _todo_name
-            ):
-                self.todo.pop(idx_)
+        self.record({"op": "delete-todo", "todo-name": _todo_name})
 
     def rename_task(self, _old_task_name: str, _new_task_name: str, /) -> None:
-        for idx_, itm_ in enumerate(self.task):
-            if (
-                itm_.get("item-type", None) == "task"
-                and itm_["task-name"] == _old_task_name
-            ):
-                self.task[idx_][_new_task_name] = itm_
-                del self.task[idx_][_old_task_name]
+        self.record(
+            {"op": "rename-task", "task-name": _old_task_name, "new-name": _new_task_name}
+        )
 
     def rename_todo(self, _old_todo_name: str, _new_todo_name: str, /) -> None:
-        for idx_, itm_ in enumerate(self.todo):
-            if (
-                itm_.get("item-type", None) == "todo"
-                and itm_["task-name"] == _old_todo_name
-            ):
-                self.todo[idx_][_new_todo_name] = itm_
-                del self.todo[idx_][_old_todo_name]
-
-    def get_task_content(self, _which_task: str, /) -> str:
-        for idx_, itm_ in enumerate(self.task):
-            if (
-                itm_.get("item-type", None) == "task"
-                and itm_["task-name"] == _which_task
-            ):
-                with self.path.open() as _f_c:
-                    # return json.load(_f_c)["acc-data"]["task"]["task-content"]
-                    return self.task[idx_]["task-content"]
+        self.record(
+            {"op": "rename-todo", "todo-name": _old_todo_name, "new-name": _new_todo_name}
+        )
+
+    def get_task_content(self, _which_task: str, /) -> str | None:
+        itm = self.tasks.get(_which_task)
+        if itm is None:
+            return None
+        if itm.loaded:
+            self.bodies.touch(itm)
+            return itm.content
+        itm.content = self.storage.load_body(self.name, itm)
+        self.bodies.put(itm)
+        return itm.content
 
     def edit_task(self, _which_task: str, _content: str, /) -> None:
-        for idx_, itm_ in enumerate(self.task):
-            if (
-                itm_.get("item-type", None) == "task"
-                and itm_["task-name"] == _which_task
-            ):
-                self.task[idx_]["task-content"] = _content
+        self.record({"op": "edit-task", "task-name": _which_task, "task-content": _content})
 
     def check_todo(self, _which_todo: str, _finished: bool, /) -> None:
-        for idx_, itm_ in enumerate(self.todo):
-            if (
-                itm_.get("item-type", None) == "todo"
-                and itm_["todo-name"] == _which_todo
-            ):
-                self.todo[idx_]["finished?"] = _finished
+        self.record({"op": "check-todo", "todo-name": _which_todo, "finished?": _finished})
 
     def list_item(
         self,
-    ) -> tuple[tuple[dict[str, str], ...], tuple[dict[str, str], ...],]:
-        return tuple([tuple(self.task_link), tuple(self.todo_link)])
+    ) -> tuple[tuple[Task, ...], tuple[Todo, ...],]:
+        return tuple([tuple(self.tasks.values()), tuple(self.todos.values())])
 
-    def list_task(self) -> tuple[dict[str, str], ...]:
-        return tuple(self.task_link)
+    def list_task(self) -> tuple[Task, ...]:
+        return tuple(self.tasks.values())
 
-    def list_todo(self) -> tuple[dict[str, str], ...]:
-        return tuple(self.todo_link)
+    def list_todo(self) -> tuple[Todo, ...]:
+        return tuple(self.todos.values())
 
 
 def create_account(_username: str, _password: Any = None, /) -> Account:
@@ -210,17 +571,11 @@ def delete_account(_name: Account) -> None:
 
 
 def list_account() -> tuple[str, ...]:
-    return tuple(
-        file_.with_suffix("").name.replace("acc_", "")
-        for file_ in Account.db_path.glob("*.json")
-        if Account(file_).is_account()
-    )
+    return Account.storage.names()
 
 
 def list_account_path() -> tuple[pathlib.Path, ...]:
-    return tuple(
-        file_ for file_ in Account.db_path.glob("*.json") if Account(file_).is_account()
-    )
+    return tuple(Account.storage.path_of(name_) for name_ in list_account())
 
 
 def verify_account(_username: str | Account, _password: str = None) -> bool:
@@ -229,11 +584,11 @@ def verify_account(_username: str | Account, _password: str = None) -> bool:
     else:
         if _password is None:
             raise ValueError()
-    if _username in list_account():
-        with get_account(_username) as _acc:
-            if _acc.password == _password:
-                return True
-    return False
+    return Account.storage.verify(_username, _password)
+
+
+def rebuild_index() -> int:
+    return Account.storage.rebuild_index()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+import time
+import threading
+from typing import Any
+
+
+class Autosaver:
+    """
+    writes the change sets of one account on its own thread. sets handed over
+    within delay seconds of each other are coalesced into a single append
+    """
+
+    def __init__(self, _account: Any, _delay: float, /, max_delay: float = None) -> None:
+        self.account = _account
+        self.delay = _delay
+        # a steady stream of changes still lands at least this often
+        self.max_delay = max_delay if max_delay is not None else 8 * _delay
+        self.pending = []
+        self.writing = False
+        self.closed = False
+        # the last failed write, cleared by the next one that lands
+        self.error = None
+        self.failures = 0
+        self.writes = 0
+        self._first = self._last = 0.0
+        self._batch = []
+        self._flushing = 0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name=f"autosave-{_account.name}", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def unflushed(self) -> bool:
+        return bool(self.pending) or self.writing
+
+    def request(self, _changes: list[dict[str, Any]], /) -> None:
+        "queue records already applied in memory"
+        if self.closed:
+            raise ValueError("error: autosave is already closed")
+        with self._cond:
+            now = time.monotonic()
+            if not self.pending:
+                self._first = now
+            self._last = now
+            self.pending.extend(_changes)
+            self._cond.notify_all()
+
+    def queued(self) -> list[dict[str, Any]]:
+        "records not written yet, the one being written included"
+        with self._cond:
+            return [*self._batch, *self.pending]
+
+    def flush(self) -> Exception | None:
+        """
+        block until everything requested so far is on disk, or one more try
+        failed. the error of that try comes back, the records stay queued
+        """
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            failures = self.failures
+            try:
+                while self.unflushed and self.failures == failures:
+                    self._cond.wait()
+                return self.error if self.unflushed else None
+            finally:
+                self._flushing -= 1
+
+    def close(self) -> list[dict[str, Any]]:
+        "flush and stop the thread, return the records it could not write"
+        self.flush()
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        return self.queued()
+
+    def _due(self) -> float:
+        # seconds until the pending set goes out, 0 or less is now
+        if self._flushing or self.closed:
+            return 0.0
+        return min(self._last + self.delay, self._first + self.max_delay) - time.monotonic()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self.pending and not self.closed:
+                    self._cond.wait()
+                if not self.pending:
+                    return
+                while (wait := self._due()) > 0:
+                    self._cond.wait(wait)
+                batch = self._batch = self.pending
+                self.pending = []
+                self.writing = True
+            try:
+                written = self.account.write_changes(batch)
+            except Exception as _err:
+                with self._cond:
+                    # keep the records in order for the next try
+                    self.pending[:0] = batch
+                    self._batch = []
+                    self.error = _err
+                    self.failures += 1
+                    self._first = self._last = time.monotonic()
+                    self.writing = False
+                    self._cond.notify_all()
+                    if self.closed:
+                        return
+                    # back off instead of hammering a failing disk
+                    self._cond.wait(self.max_delay)
+                continue
+            with self._cond:
+                self.account.bytes_written += written
+                self.writes += 1
+                self.error = None
+                self._batch = []
+                self.writing = False
+                self._cond.notify_all()
+
+
+if __name__ == "__main__":
+
+    class Stub:
+        name = "bench"
+        bytes_written = 0
+
+        def write_changes(self, _changes: list[dict[str, Any]], /) -> int:
+            time.sleep(0.05)
+            return len(_changes)
+
+    saver = Autosaver(Stub(), 0.02)
+    start = time.perf_counter()
+    for seq_ in range(1, 501):
+        saver.request([{"op": "check-todo", "seq": seq_}])
+        time.sleep(0.001)
+    queued = time.perf_counter() - start
+    assert not saver.close()
+    print(
+        f"500 changes queued in {queued * 1000:.0f} ms, "
+        f"{saver.writes} writes, {saver.account.bytes_written} records landed"
+    )
@@ -0,0 +1,312 @@
+import gc
+import sys
+import json
+import time
+import random
+import pathlib
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from typing import Any, Callable
+from item import Task, Todo
+from durable import Durability
+from storage import open_storage
+import account
+import config
+
+SRC = pathlib.Path(__file__).parent
+BASELINE = SRC / "bench_baseline.json"
+SIZES = (1_000, 10_000, 100_000)
+# mutations timed per operation, each one its own committed transaction
+OPS = 500
+# a metric this much worse than the baseline is a regression, disk timings
+# of one machine wander by a third between runs
+TOLERANCE = 0.5
+# a frame takes a couple of ms, a scheduler hiccup alone can double it
+TOLERANCES = {"frame_s": 1.0}
+# best of this many runs or chunks of OPS, sizes past REPEAT_UNDER load once
+REPEAT = 5
+REPEAT_UNDER = 100_000
+# whole runs per size, each metric keeps its best. a busy machine slows down
+# everything inside one run at once, more repeats within it do not help
+RUNS = 3
+# what the throughput metrics end in, more is better for those only
+RATE = "_per_s"
+# what the timings end in, those follow the speed of the machine
+TIMED = "_s"
+# the fixed piece of pure python the speed of the machine is taken from
+MACHINE = "machine_s"
+# terminal the frames are drawn on
+SCREEN = (50, 160)
+
+WORDS = (
+    "fix review deploy write call plan check update move clean draft read "
+    "meeting report budget server client release notes bug test design "
+    "email invoice backup migrate docs sprint weekly monthly today urgent"
+).split()
+
+
+def synthetic_text(_rng: random.Random, /) -> str:
+    "a task body, most a few lines, some pages long"
+    length = min(int(_rng.lognormvariate(5.5, 1.0)), 20_000)
+    words, size = [], 0
+    while size < length:
+        word = _rng.choice(WORDS)
+        words.append(word + ("\n" if _rng.random() < 0.1 else " "))
+        size += len(word) + 1
+    return "".join(words)
+
+
+def synthetic_name(_rng: random.Random, _idx: int, /) -> str:
+    return f"{' '.join(_rng.choices(WORDS, k=_rng.randint(1, 4)))} {_idx}"
+
+
+def fill(_account: account.Account, _size: int, /, seed: int = 0) -> None:
+    "one task for every three todos, straight into memory, nothing recorded"
+    rng = random.Random(seed)
+    for idx_ in range(_size):
+        if idx_ % 4 == 0:
+            _account.tasks.add(Task(synthetic_name(rng, idx_), synthetic_text(rng)))
+        else:
+            _account.todos.add(Todo(synthetic_name(rng, idx_), rng.random() < 0.3))
+    _account.seq = _size
+
+
+def best(_run: Callable[[], Any], _repeat: int, /) -> float:
+    "fastest of a few runs in seconds, the others are noise from the machine"
+    took = []
+    for _ in range(_repeat):
+        start = time.perf_counter()
+        _run()
+        took.append(time.perf_counter() - start)
+    return min(took)
+
+
+def machine_speed() -> float:
+    "seconds a fixed piece of pure python takes, timings are compared relative to it"
+    rng = random.Random(0)
+    names = [synthetic_name(rng, idx_) for idx_ in range(5000)]
+    return best(lambda: sorted(json.loads(json.dumps(names))), REPEAT * 2)
+
+
+def peak(_run: Callable[[], Any], /) -> tuple[Any, int]:
+    "what the run returns and the most it had allocated at once, in bytes"
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = _run()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def throughput(_acc: account.Account, _mutate: Callable[[int], Any], _ops: int, /) -> float:
+    """
+    committed mutations per second, the saves and background work included.
+    the fastest chunk counts, a slow disk moment should not fail the run
+    """
+    chunk = max(1, _ops // REPEAT)
+    rates = []
+    for first_ in range(0, _ops - chunk + 1, chunk):
+        start = time.perf_counter()
+        for idx_ in range(first_, first_ + chunk):
+            with _acc:
+                _mutate(idx_)
+        _acc.storage.flush()
+        rates.append(chunk / (time.perf_counter() - start))
+    return max(rates)
+
+
+def frame_cost(_acc: account.Account, /) -> float:
+    "seconds to draw a full page of the item list on a virtual screen"
+    # the ui side needs curses, the storage benchmarks run without it
+    from screen import VirtualScreen
+    from render import Renderer
+    from itemview import ItemView
+    from viewport import Viewport
+    import taskman
+
+    items, view = ItemView(_acc), Viewport()
+    screen = VirtualScreen(*SCREEN)
+    frame = Renderer(screen)
+    pages = iter(range(REPEAT * 2))
+
+    def draw() -> None:
+        # a page away and back, every row is written each time
+        view.scroll_page(1 if next(pages) % 2 == 0 else -1)
+        taskman.interface_dict_item(screen, "bench", items, view, frame)
+
+    try:
+        # the first frame sizes the viewport, a page is only a page after it
+        taskman.interface_dict_item(screen, "bench", items, view, frame)
+        return best(draw, REPEAT * 2)
+    finally:
+        items.close()
+
+
+def bench_size(_size: int, _backend: str, /) -> dict[str, float]:
+    # read from the class dict, a getattr would open the default storage
+    default = account.Account.__dict__["storage"]
+    with tempfile.TemporaryDirectory() as _tmp:
+        storage = open_storage(
+            _backend, pathlib.Path(_tmp), durability=Durability(config.durability)
+        )
+        account.Account.storage = storage
+        repeat = REPEAT if _size < REPEAT_UNDER else 1
+        result = {MACHINE: machine_speed()}
+        try:
+            acc = account.Account("bench", "bench")
+            fill(acc, _size)
+            start = time.perf_counter()
+            acc.approve()
+            storage.flush()
+            result["create_s"] = time.perf_counter() - start
+            result["account_bytes"] = sum(
+                path_.stat().st_size for path_ in pathlib.Path(_tmp).iterdir()
+            )
+            # a few neighbours, listing has more than one name to go through
+            for idx_ in range(9):
+                account.Account(f"other {idx_}", "other").approve()
+
+            result["load_s"] = best(lambda: account.Account("bench"), repeat)
+            acc, result["load_peak_bytes"] = peak(lambda: account.Account("bench"))
+            result["list_s"] = best(acc.list_item, repeat)
+            result["list_account_s"] = best(account.list_account, repeat)
+            result["verify_account_s"] = best(
+                lambda: account.verify_account("bench", "bench"), repeat
+            )
+            result["frame_s"] = frame_cost(acc)
+
+            todos = [tdo_.name for tdo_ in acc.list_todo()][:OPS]
+            tasks = [tsk_.name for tsk_ in acc.list_task()][:OPS]
+            ops = min(OPS, len(todos), len(tasks))
+            result["add_per_s"] = throughput(
+                acc, lambda idx_: acc.add_todo(f"bench added {idx_}", False), ops
+            )
+
+            def check(_idx: int, /) -> None:
+                acc.check_todo(todos[_idx], not acc.todos[todos[_idx]].finished)
+
+            result["check_per_s"] = throughput(acc, check, ops)
+            result["edit_per_s"] = throughput(
+                acc, lambda idx_: acc.edit_task(tasks[idx_], f"edited {idx_}\n"), ops
+            )
+            result["delete_per_s"] = throughput(
+                acc, lambda idx_: acc.delete_todo(todos[idx_]), ops
+            )
+            saves = iter(range(REPEAT))
+
+            def save() -> None:
+                # one change against everything written so far
+                with acc:
+                    acc.add_task(f"bench saved {next(saves)}", "saved alone")
+                storage.flush()
+
+            result["save_s"] = best(save, REPEAT)
+            # the machine may have slowed down half way, the faster look counts
+            result[MACHINE] = min(result[MACHINE], machine_speed())
+        finally:
+            storage.close()
+            account.Account.storage = default
+    return result
+
+
+def run(_sizes: tuple[int, ...], _backend: str, /, runs: int = RUNS) -> dict[str, Any]:
+    results = {}
+    for size_ in _sizes:
+        start = time.perf_counter()
+        tries = [bench_size(size_, _backend) for _ in range(runs)]
+        results[str(size_)] = {
+            name_: (max if name_.endswith(RATE) else min)(try_[name_] for try_ in tries)
+            for name_ in tries[0]
+        }
+        print(f"{size_:>9} items in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    return {
+        "meta": {
+            "backend": _backend,
+            "durability": config.durability,
+            "runs": runs,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "sizes": results,
+    }
+
+
+def compare(
+    _run: dict[str, Any], _baseline: dict[str, Any], /, tolerance: float = TOLERANCE
+) -> list[str]:
+    "one line per metric both runs have, regressions marked, and the regressions"
+    lines, regressions = [], []
+    for size_, metrics_ in _run["sizes"].items():
+        base = _baseline["sizes"].get(size_)
+        if base is None:
+            continue
+        # timings are compared as if both runs had the same machine
+        speed = metrics_.get(MACHINE, 0) / base.get(MACHINE, 0) if base.get(MACHINE) else 1
+        for name_, value_ in metrics_.items():
+            old = base.get(name_)
+            if not old or not value_ or name_ == MACHINE:
+                continue
+            # how many times worse, rates turned around so above 1 is always worse
+            if name_.endswith(RATE):
+                ratio = old / value_ / speed
+            elif name_.endswith(TIMED):
+                ratio = value_ / old / speed
+            else:
+                ratio = value_ / old
+            worse = ratio > 1 + max(tolerance, TOLERANCES.get(name_, 0.0))
+            line = f"{size_:>9} {name_:<18} {old:>14.6g} -> {value_:<14.6g} x{ratio:.2f}"
+            lines.append(line + ("  REGRESSION" if worse else ""))
+            if worse:
+                regressions.append(line)
+    print("\n".join(lines))
+    return regressions
+
+
+def parse_args(_argv: list[str], /) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="account benchmarks at synthetic sizes")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, SIZES)),
+        help="comma separated item counts, e.g. 1000,10000,100000,1000000",
+    )
+    parser.add_argument(
+        "--backend", default=config.storage, help="json, json-snapshot or sqlite"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=RUNS, help="whole runs per size, the best one counts"
+    )
+    parser.add_argument("--out", help="write the results as json here")
+    parser.add_argument("--baseline", default=str(BASELINE), help="results to compare with")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store this run as the baseline"
+    )
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    return parser.parse_args(_argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    results = run(
+        tuple(int(size_) for size_ in args.sizes.split(",")), args.backend, runs=args.runs
+    )
+    if args.out:
+        pathlib.Path(args.out).write_text(json.dumps(results, indent=2))
+    baseline = pathlib.Path(args.baseline)
+    if args.save_baseline:
+        baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline saved to {baseline}")
+    elif not baseline.exists():
+        print(json.dumps(results, indent=2))
+    else:
+        saved = json.loads(baseline.read_text())
+        if saved["meta"]["backend"] != results["meta"]["backend"]:
+            print(f"error: baseline is for {saved['meta']['backend']}", file=sys.stderr)
+            sys.exit(2)
+        regressions = compare(results, saved, tolerance=args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) past {args.tolerance:.0%}")
+            sys.exit(1)
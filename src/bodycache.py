@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from item import Task
+
+
+class BodyCache:
+    """
+    least recently used task bodies, unloaded again once they pass the budget.
+    a body not saved yet counts as well, it is only unloaded once it has a ref
+    """
+
+    def __init__(self, _budget: int, /) -> None:
+        self.budget = _budget
+        self.size = 0
+        self._tasks = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def put(self, _task: Task, /) -> None:
+        "remember a body that was just loaded from storage or set in memory"
+        self.discard(_task)
+        self._tasks[id(_task)] = (_task, len(_task.content))
+        self.size += len(_task.content)
+        self.evict()
+
+    def touch(self, _task: Task, /) -> None:
+        if id(_task) in self._tasks:
+            self._tasks.move_to_end(id(_task))
+
+    def discard(self, _task: Task, /) -> None:
+        entry = self._tasks.pop(id(_task), None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def evict(self) -> None:
+        if self.size <= self.budget:
+            return
+        # the newest body always stays, even when it is bigger than the budget
+        for key_ in list(self._tasks)[:-1]:
+            task_, size_ = self._tasks[key_]
+            # an edited body has no copy in storage yet, it must stay
+            if task_.ref is None:
+                continue
+            del self._tasks[key_]
+            self.size -= size_
+            task_.content = None
+            if self.size <= self.budget:
+                return
+
+    def clear(self) -> None:
+        for task_, _ in self._tasks.values():
+            if task_.ref is not None:
+                task_.content = None
+        self._tasks.clear()
+        self.size = 0
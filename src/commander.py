@@ -0,0 +1,159 @@
+import pathlib
+from typing import Any, Callable
+from account import Account
+from transfer import import_file, export_file
+from searchindex import open_index
+from metrics import metrics
+
+# nothing in here may import curses, the headless cli runs on top of it
+commands = [
+    "task",
+    "todo",
+    "check",
+    "uncheck",
+    "edit",
+    "logout",
+    "delete",
+    "exit",
+    "quit",
+    "import",
+    "export",
+    "find",
+]
+# matches a find prints at most
+FIND_LIMIT = 20
+
+
+@metrics.timed("parse")
+def command_parser(
+    _command: str | list[str], /, commands: list[str] = commands
+) -> dict[str, Any] | None:
+    "group words under the command before them, a string is split on spaces"
+    parser = {}
+    if isinstance(_command, str):
+        _command = _command.split()
+    command_name = None
+    if len(_command) < 1 or _command[0] not in commands:
+        return None
+    for com_ in _command:
+        if com_ not in parser:
+            if com_ in commands:
+                parser[com_] = []
+                command_name = com_
+            else:
+                if command_name is not None:
+                    parser[command_name].append(com_)
+    return parser if parser != {} else None
+
+
+def resolve_name(_name: str, _exists: Callable[[str], bool], /) -> str | None:
+    "names are typed with '-' in place of spaces, try it raw first"
+    if _exists(_name):
+        return _name
+    spaced = _name.replace("-", " ")
+    if spaced != _name and _exists(spaced):
+        return spaced
+    return None
+
+
+def transfer_command(_account: Account, _command: str, _path: pathlib.Path, /) -> str:
+    try:
+        if _command == "import":
+            stats = import_file(_account, _path)
+        else:
+            stats = export_file(_account, _path)
+    except (OSError, ValueError) as _err:
+        return f"{_command} failed : {_err}"
+    return f"{_command}ed {stats}"
+
+
+def run_commands(
+    _commands: dict[str, list[str]] | None,
+    _on_acc: Account,
+    /,
+    edit: Callable[[str, str], str | None] | None = None,
+    report: Callable[[str], None] | None = None,
+) -> int | None:
+    """
+    apply a parsed command line to an account, -1 exit, None logout,
+    2 no target, -2 unknown, 1 done. edit gets (name, content) and
+    returns the new content or None, report gets one line messages
+    """
+    if _commands is None:
+        return -2
+    # one transaction per command line, commits once and only when dirty
+    with _on_acc as _acc:
+        for com_, targ_ in _commands.items():
+            match com_:
+                case "exit" | "quit":
+                    return -1
+                case "logout":
+                    return None
+                case "check" | "uncheck":
+                    if len(targ_) < 1:
+                        return 2
+                    for td_ in targ_:
+                        if (name_ := resolve_name(td_, _acc.has_todo)) is not None:
+                            _acc.check_todo(name_, com_ == "check")
+                case "task":
+                    if len(targ_) < 1:
+                        return 2
+                    for ts_ in targ_:
+                        if resolve_name(ts_, _acc.has_task) is None:
+                            _acc.add_task(ts_.replace("-", " "), "")
+                case "todo":
+                    if len(targ_) < 1:
+                        return 2
+                    for td_ in targ_:
+                        if resolve_name(td_, _acc.has_todo) is None:
+                            _acc.add_todo(td_.replace("-", " "), False)
+                case "delete":
+                    if len(targ_) < 1:
+                        return 2
+                    for itm_ in targ_:
+                        if (name_ := resolve_name(itm_, _acc.has_task)) is not None:
+                            _acc.delete_task(name_)
+                        if (name_ := resolve_name(itm_, _acc.has_todo)) is not None:
+                            _acc.delete_todo(name_)
+                case "edit":
+                    if len(targ_) < 1:
+                        return 2
+                    if edit is None:
+                        continue
+                    for tsk_ in targ_:
+                        if (name_ := resolve_name(tsk_, _acc.has_task)) is not None:
+                            content = _acc.get_task_content(name_)
+                            if content is None:
+                                continue
+                            new_content = edit(name_, content)
+                            if new_content is not None:
+                                _acc.edit_task(name_, new_content)
+                case "import" | "export":
+                    if len(targ_) < 1:
+                        return 2
+                    # close what came before, the transfer commits per batch
+                    _acc.commit()
+                    try:
+                        for path_ in targ_:
+                            message = transfer_command(_acc, com_, pathlib.Path(path_))
+                            if report is not None:
+                                report(message)
+                    finally:
+                        _acc.begin()
+                case "find":
+                    if len(targ_) < 1:
+                        return 2
+                    # the index catches up from the disk and whatever is unwritten
+                    _acc.commit()
+                    index = open_index(_acc)
+                    try:
+                        for kind_, name_ in index.search(" ".join(targ_), limit=FIND_LIMIT):
+                            if report is not None:
+                                report(f"{kind_} : {name_}")
+                    finally:
+                        index.detach()
+                        index.save()
+                        _acc.begin()
+                case _:
+                    return -2
+    return 1
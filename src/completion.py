@@ -0,0 +1,172 @@
+from os.path import commonprefix
+from typing import Any, Iterable
+
+# marks the end of a word inside a node, no single character equals it
+END = ""
+# names offered at once when a prefix is still ambiguous
+CHOICES_LIMIT = 8
+
+
+class Trie:
+    "prefix tree of words, a lookup walks the prefix and never the whole set"
+
+    def __init__(self, _words: Iterable[str] = (), /) -> None:
+        self.root = {}
+        self.size = 0
+        for word_ in _words:
+            self.add(word_)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, _word: str) -> bool:
+        node = self.find(_word)
+        return node is not None and END in node
+
+    def find(self, _prefix: str, /) -> dict[str, Any] | None:
+        node = self.root
+        for char_ in _prefix:
+            node = node.get(char_)
+            if node is None:
+                return None
+        return node
+
+    def add(self, _word: str, /) -> None:
+        node = self.root
+        for char_ in _word:
+            node = node.setdefault(char_, {})
+        if END not in node:
+            node[END] = True
+            self.size += 1
+
+    def remove(self, _word: str, /) -> None:
+        path = [self.root]
+        for char_ in _word:
+            node = path[-1].get(char_)
+            if node is None:
+                return
+            path.append(node)
+        if path[-1].pop(END, None) is None:
+            return
+        self.size -= 1
+        # prune the branch back up to the last node something else still uses
+        for char_, node_ in zip(reversed(_word), reversed(path[:-1])):
+            if node_[char_]:
+                break
+            del node_[char_]
+
+    def complete(self, _prefix: str, /, limit: int = CHOICES_LIMIT) -> list[str]:
+        "up to limit words starting with prefix, in order"
+        node = self.find(_prefix)
+        if node is None:
+            return []
+        found = []
+        # depth first over sorted children, stops as soon as enough turned up
+        stack = [(_prefix, node)]
+        while stack and len(found) < limit:
+            word, node = stack.pop()
+            if END in node:
+                found.append(word)
+            for char_ in sorted((chr_ for chr_ in node if chr_ != END), reverse=True):
+                stack.append((word + char_, node[char_]))
+        return found
+
+    def extend(self, _prefix: str, /) -> str:
+        "the prefix grown for as long as the words below it agree"
+        node = self.find(_prefix)
+        if node is None:
+            return _prefix
+        while END not in node and len(node) == 1:
+            (char,) = node
+            _prefix += char
+            node = node[char]
+        return _prefix
+
+
+def typed(_name: str, /) -> str:
+    # the command box splits on spaces, names are typed with '-' instead
+    return _name.replace(" ", "-")
+
+
+class Completer:
+    "tab completion of command words and item names, kept in step with an account"
+
+    # which names may follow a command word
+    completes = {
+        "check": ("todo",),
+        "uncheck": ("todo",),
+        "edit": ("task",),
+        "delete": ("task", "todo"),
+        "goto": ("task", "todo"),
+        "find": (),
+        "task": (),
+        "todo": (),
+    }
+
+    def __init__(self, _account: Any, _commands: Iterable[str], /) -> None:
+        self.account = _account
+        self.command_words = tuple(_commands)
+        self.commands = Trie(self.command_words)
+        self.reset()
+        _account.subscribe(self.apply)
+
+    def close(self) -> None:
+        self.account.unsubscribe(self.apply)
+
+    def reset(self) -> None:
+        self.names = {
+            "task": Trie(map(typed, self.account.tasks)),
+            "todo": Trie(map(typed, self.account.todos)),
+        }
+
+    def apply(self, _record: dict[str, Any], /) -> None:
+        op, _, kind = _record["op"].partition("-")
+        match op:
+            case "reset":
+                self.reset()
+            case "add":
+                self.names[kind].add(typed(_record[f"{kind}-name"]))
+            case "delete":
+                self.names[kind].remove(typed(_record[f"{kind}-name"]))
+            case "rename":
+                self.names[kind].remove(typed(_record[f"{kind}-name"]))
+                self.names[kind].add(typed(_record["new-name"]))
+
+    def complete(self, _before: str, /) -> tuple[str, list[str]]:
+        "(text before the cursor after completing its last word, the choices)"
+        head, space, word = _before.rpartition(" ")
+        if space == "":
+            tries = [self.commands]
+        else:
+            command = next(
+                (word_ for word_ in reversed(head.split()) if word_ in self.command_words),
+                None,
+            )
+            kinds = self.completes.get(command, ("task", "todo"))
+            tries = [self.names[kind_] for kind_ in kinds]
+            # another command may follow the names, offered when no name fits
+            if not any(trie_.find(word) is not None for trie_ in tries):
+                tries = [self.commands]
+        choices = sorted({chc_ for trie_ in tries for chc_ in trie_.complete(word)})
+        if len(choices) == 0:
+            return _before, choices
+        if len(choices) == 1:
+            return f"{head}{space}{choices[0]} ", choices
+        # choices are cut at a limit, each trie knows its own full agreement
+        grown = commonprefix(
+            [trie_.extend(word) for trie_ in tries if trie_.find(word) is not None]
+        )
+        return f"{head}{space}{grown}", choices
+
+
+if __name__ == "__main__":
+    import time
+
+    names = Trie(f"todo-{idx_}" for idx_ in range(1_000_000))
+    start = time.perf_counter()
+    for idx_ in range(10_000):
+        names.complete(f"todo-{idx_}")
+        names.extend(f"todo-{idx_}")
+    took = (time.perf_counter() - start) / 10_000 * 1e6
+    print(f"{len(names)} names, {took:.1f} us per completion")
+    print(names.complete("todo-99999"), names.extend("todo-12345"))
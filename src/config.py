@@ -0,0 +1,27 @@
+import os
+
+# deployment settings, read once from the environment at import time
+
+# "json" (snapshot + journal), "json-snapshot" (full rewrite) or "sqlite"
+storage = os.environ.get("TASKMAN_STORAGE", "json")
+
+# bytes of task bodies kept in memory after they were loaded on demand
+body_cache = int(os.environ.get("TASKMAN_BODY_CACHE", 4 * 1024 * 1024))
+
+# "buffered" (write in place), "atomic" (temp file + rename) or "fsync"
+durability = os.environ.get("TASKMAN_DURABILITY", "atomic")
+
+# seconds the autosave thread waits for more changes, 0 writes on the ui thread
+autosave = float(os.environ.get("TASKMAN_AUTOSAVE", 0.5))
+
+# lowest level the in-memory log keeps: "debug", "info", "warning", "error"
+log_level = os.environ.get("TASKMAN_LOG", "warning")
+
+# records the log ring holds before the oldest are dropped
+log_size = int(os.environ.get("TASKMAN_LOG_SIZE", 10_000))
+
+# where the ring is dumped on exit and on SIGUSR1, empty keeps it in memory only
+log_file = os.environ.get("TASKMAN_LOG_FILE", "")
+
+# json file the timings and counters of a session are written to on exit
+metrics_file = os.environ.get("TASKMAN_METRICS_FILE", "")
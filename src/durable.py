@@ -0,0 +1,126 @@
+import os
+import pathlib
+from enum import Enum
+
+try:
+    import fcntl
+except ModuleNotFoundError as _:
+    # windows has byte range locks instead
+    fcntl = None
+    import msvcrt
+
+
+class Durability(Enum):
+    "how hard a save tries to survive a crash, cheapest first"
+
+    # write in place, the os flushes whenever it likes
+    Buffered = "buffered"
+    # write a temp file and rename it over, readers never see half a file
+    Atomic = "atomic"
+    # atomic, plus fsync of the file and its directory before returning
+    Fsync = "fsync"
+
+
+def write_file(
+    _path: pathlib.Path, _data: str | bytes, _durability: Durability, /
+) -> None:
+    mode = "wb" if isinstance(_data, bytes) else "w"
+    if _durability is Durability.Buffered:
+        with _path.open(mode) as _f:
+            _f.write(_data)
+        return
+    tmp = _path.with_name(_path.name + ".tmp")
+    with tmp.open(mode) as _f:
+        _f.write(_data)
+        if _durability is Durability.Fsync:
+            _f.flush()
+            os.fsync(_f.fileno())
+    os.replace(tmp, _path)
+    if _durability is Durability.Fsync:
+        sync_dir(_path.parent)
+
+
+def append_file(
+    _path: pathlib.Path, _data: str | bytes, _durability: Durability, /
+) -> None:
+    "appends are torn at worst, never reordered, so only fsync changes here"
+    mode = "ab" if isinstance(_data, bytes) else "a"
+    created = _durability is Durability.Fsync and not _path.exists()
+    with _path.open(mode) as _f:
+        _f.write(_data)
+        if _durability is Durability.Fsync:
+            _f.flush()
+            os.fsync(_f.fileno())
+    if created:
+        sync_dir(_path.parent)
+
+
+class FileLock:
+    """
+    advisory lock held on a side file, other processes and other threads
+    opening the same file wait for it. one instance per acquisition
+    """
+
+    def __init__(self, _path: pathlib.Path, /) -> None:
+        self.path = _path
+        self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        return self
+
+    def __exit__(self, _exc_type, _exc_val, _trace) -> None:
+        fd, self._fd = self._fd, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+
+def sync_dir(_path: pathlib.Path, /) -> None:
+    # makes a rename or a new file itself durable, not possible on windows
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(_path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import tempfile
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    line = '{"op":"check-todo","todo-name":"todo 1","finished?":true,"seq":1}\n'
+    snapshot = "x" * 64 * 1024
+    with tempfile.TemporaryDirectory() as _tmp:
+        target = pathlib.Path(_tmp) / "bench"
+        for durability_ in Durability:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                append_file(target, line, durability_)
+            appended = (time.perf_counter() - start) / rounds
+            start = time.perf_counter()
+            for _ in range(rounds):
+                write_file(target, snapshot, durability_)
+            written = (time.perf_counter() - start) / rounds
+            print(
+                f"{durability_.value:<9} journal append {appended * 1e6:8.1f} us"
+                f"   64 KiB snapshot {written * 1e6:8.1f} us"
+            )
@@ -0,0 +1,158 @@
+import curses
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+# how long a key wait may block while idle work is queued, in ms
+IDLE_POLL = 0
+
+
+class Timer:
+    "a callback due at a monotonic time, repeated every interval when set"
+
+    __slots__ = ("due", "callback", "interval", "cancelled")
+
+    def __init__(
+        self, _due: float, _callback: Callable[[], Any], _interval: float | None, /
+    ) -> None:
+        self.due = _due
+        self.callback = _callback
+        self.interval = _interval
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class EventLoop:
+    """
+    waits for keys without blocking the rest of the ui. while no key is
+    waiting it runs due timers, then one slice of idle work at a time
+    """
+
+    def __init__(self) -> None:
+        self._timers = []
+        self._order = itertools.count()
+        self._idle = []
+        self._held = 0
+
+    def call_later(self, _delay: float, _callback: Callable[[], Any], /) -> Timer:
+        return self._schedule(Timer(time.monotonic() + _delay, _callback, None))
+
+    def call_every(self, _interval: float, _callback: Callable[[], Any], /) -> Timer:
+        return self._schedule(Timer(time.monotonic() + _interval, _callback, _interval))
+
+    def _schedule(self, _timer: Timer, /) -> Timer:
+        heapq.heappush(self._timers, (_timer.due, next(self._order), _timer))
+        return _timer
+
+    def idle(self, _task: Iterator[Any], /) -> None:
+        "run a generator one step per idle moment, until it is exhausted"
+        self._idle.append(_task)
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._idle)
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        "timers wait while the screen belongs to something that is not theirs"
+        self._held += 1
+        try:
+            yield
+        finally:
+            self._held -= 1
+
+    def run_timers(self) -> bool:
+        "call every due timer once, True when any ran"
+        ran = False
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now and not self._held:
+            _, _, timer = heapq.heappop(self._timers)
+            if timer.cancelled:
+                continue
+            if timer.interval is not None:
+                # next one counts from now, a late tick does not pile up
+                timer.due = now + timer.interval
+                self._schedule(timer)
+            timer.callback()
+            ran = True
+        return ran
+
+    def run_idle(self) -> bool:
+        "advance the oldest idle task by one step, True when one was left"
+        while self._idle:
+            try:
+                next(self._idle[0])
+            except StopIteration:
+                self._idle.pop(0)
+                continue
+            # round robin, no task keeps the others waiting
+            self._idle.append(self._idle.pop(0))
+            return True
+        return False
+
+    def wait(self) -> int:
+        "ms until something besides a key wants to run, -1 is never"
+        if self._idle:
+            return IDLE_POLL
+        while self._timers and self._timers[0][2].cancelled:
+            heapq.heappop(self._timers)
+        if not self._timers or self._held:
+            return -1
+        return max(0, int((self._timers[0][0] - time.monotonic()) * 1000) + 1)
+
+    def getch(self, _win: Any, /) -> int:
+        "win.getch(), with timers and idle work run while no key is there"
+        return self._read(_win, _win.getch, -1)
+
+    def get_wch(self, _win: Any, /) -> int | str:
+        "win.get_wch(), whole characters, with the same scheduling as getch"
+        return self._read(_win, _win.get_wch, None)
+
+    def _read(self, _win: Any, _read: Callable[[], Any], _none: Any, /) -> Any:
+        try:
+            while True:
+                if self.run_timers():
+                    # a timer may have drawn elsewhere, the cursor goes back
+                    _win.refresh()
+                _win.timeout(self.wait())
+                try:
+                    key = _read()
+                except curses.error:
+                    # get_wch has nothing to hand over once the timeout is up
+                    key = _none
+                if key != _none:
+                    break
+                self.run_idle()
+        finally:
+            _win.timeout(-1)
+        return key
+
+
+if __name__ == "__main__":
+    loop = EventLoop()
+    ticks = []
+    timer = loop.call_every(0.01, lambda: ticks.append(time.monotonic()))
+
+    def slices() -> Iterator[None]:
+        for _ in range(1000):
+            sum(range(2000))
+            yield
+
+    loop.idle(slices())
+    start = time.perf_counter()
+    longest = 0.0
+    while loop.busy:
+        step = time.perf_counter()
+        loop.run_timers()
+        loop.run_idle()
+        longest = max(longest, time.perf_counter() - step)
+    timer.cancel()
+    took = time.perf_counter() - start
+    print(
+        f"1000 idle slices in {took * 1000:.0f} ms, {len(ticks)} ticks, "
+        f"longest step {longest * 1000:.2f} ms, the most a key waits"
+    )
@@ -0,0 +1,146 @@
+class GapBuffer:
+    """
+    editable text split at the cursor into two stacks, the gap between them.
+    typing and deleting at the cursor is O(1), moving it costs the distance,
+    and newline positions are kept per stack so any line is found directly
+    """
+
+    def __init__(self, _text: str = "", /) -> None:
+        # before holds the text left of the cursor, after the rest reversed
+        self.before = []
+        self.after = list(reversed(_text))
+        # indexes of "\n" inside each stack, both ascending
+        self.before_nl = []
+        self.after_nl = [idx_ for idx_, chr_ in enumerate(self.after) if chr_ == "\n"]
+
+    def __len__(self) -> int:
+        return len(self.before) + len(self.after)
+
+    def text(self) -> str:
+        return "".join(self.before) + "".join(reversed(self.after))
+
+    @property
+    def cursor(self) -> int:
+        return len(self.before)
+
+    @property
+    def line(self) -> int:
+        return len(self.before_nl)
+
+    @property
+    def column(self) -> int:
+        return len(self.before) - self.line_start(self.line)
+
+    @property
+    def lines(self) -> int:
+        return len(self.before_nl) + len(self.after_nl) + 1
+
+    def insert(self, _text: str, /) -> None:
+        for chr_ in _text:
+            if chr_ == "\n":
+                self.before_nl.append(len(self.before))
+            self.before.append(chr_)
+
+    def backspace(self) -> bool:
+        if not self.before:
+            return False
+        if self.before.pop() == "\n":
+            self.before_nl.pop()
+        return True
+
+    def delete(self) -> bool:
+        if not self.after:
+            return False
+        if self.after.pop() == "\n":
+            self.after_nl.pop()
+        return True
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def move(self, _count: int, /) -> None:
+        "move the cursor by count characters, negative is left"
+        if _count < 0:
+            count = min(-_count, len(self.before))
+            if count == 0:
+                return
+            cut = len(self.before) - count
+            # newlines crossing over keep their order, only the index changes
+            while self.before_nl and self.before_nl[-1] >= cut:
+                pos = self.before_nl.pop()
+                self.after_nl.append(len(self.after) + len(self.before) - 1 - pos)
+            self.after.extend(reversed(self.before[cut:]))
+            del self.before[cut:]
+        elif _count > 0:
+            count = min(_count, len(self.after))
+            if count == 0:
+                return
+            cut = len(self.after) - count
+            while self.after_nl and self.after_nl[-1] >= cut:
+                pos = self.after_nl.pop()
+                self.before_nl.append(len(self.before) + len(self.after) - 1 - pos)
+            self.before.extend(reversed(self.after[cut:]))
+            del self.after[cut:]
+
+    def move_to(self, _pos: int, /) -> None:
+        self.move(max(0, min(_pos, len(self))) - len(self.before))
+
+    def line_start(self, _line: int, /) -> int:
+        "absolute position of the first character of a line"
+        if _line <= 0:
+            return 0
+        if _line <= len(self.before_nl):
+            return self.before_nl[_line - 1] + 1
+        # the after stack is reversed, its newlines count from the end
+        idx = len(self.after_nl) - (_line - len(self.before_nl))
+        if idx < 0:
+            return len(self)
+        return len(self.before) + len(self.after) - 1 - self.after_nl[idx] + 1
+
+    def line_end(self, _line: int, /) -> int:
+        "absolute position of the newline closing a line, or the end"
+        if _line + 1 >= self.lines:
+            return len(self)
+        return self.line_start(_line + 1) - 1
+
+    def slice(self, _start: int, _stop: int, /) -> str:
+        "text between two absolute positions, touching only that range"
+        split = len(self.before)
+        left = "".join(self.before[_start : min(_stop, split)]) if _start < split else ""
+        if _stop <= split:
+            return left
+        # absolute p in after lives at len(after) - 1 - (p - split)
+        hi = len(self.after) - (max(_start, split) - split)
+        lo = len(self.after) - (_stop - split)
+        return left + "".join(reversed(self.after[max(lo, 0) : hi]))
+
+    def line_text(self, _line: int, _left: int = 0, _width: int | None = None, /) -> str:
+        start, end = self.line_start(_line), self.line_end(_line)
+        start = min(start + _left, end)
+        if _width is not None:
+            end = min(end, start + _width)
+        return self.slice(start, end)
+
+    def goto_line(self, _line: int, _column: int, /) -> None:
+        "cursor onto a line, at the column or the line end when it is shorter"
+        line = max(0, min(_line, self.lines - 1))
+        start = self.line_start(line)
+        self.move_to(min(start + _column, self.line_end(line)))
+
+
+if __name__ == "__main__":
+    import time
+
+    body = ("lorem ipsum dolor sit amet " * 3 + "\n") * 12_000
+    buffer = GapBuffer(body)
+    print(f"{len(buffer)} characters, {buffer.lines} lines")
+    buffer.goto_line(buffer.lines // 2, 10)
+    start = time.perf_counter()
+    for _ in range(10_000):
+        buffer.insert("x")
+        buffer.goto_line(buffer.line + 1, buffer.column)
+        buffer.backspace()
+        [buffer.line_text(line_, 0, 80) for line_ in range(buffer.line, buffer.line + 40)]
+    took = (time.perf_counter() - start) / 10_000 * 1e6
+    print(f"{took:.1f} us per keystroke with a 40 line redraw")
+    assert len(buffer.text()) == len(body)
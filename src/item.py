@@ -0,0 +1,141 @@
+from typing import Any
+from maid import convert_todo_check
+
+# characters of the first content line kept in memory for the item list
+PREVIEW_LEN = 120
+
+
+class Task:
+    "one task, converts losslessly to and from the json item schema"
+
+    # _content is None while the body only lives in storage, ref says where
+    __slots__ = ("name", "_content", "preview", "ref")
+    item_type = "task"
+
+    def __init__(
+        self,
+        _name: str,
+        _content: str | None = "",
+        /,
+        preview: str = "",
+        ref: Any = None,
+    ) -> None:
+        self.name = _name
+        self.preview = preview
+        self.ref = ref
+        self.content = _content
+
+    @property
+    def content(self) -> str | None:
+        return self._content
+
+    @content.setter
+    def content(self, _content: str | None) -> None:
+        self._content = _content
+        if _content is not None:
+            self.preview = make_preview(_content)
+
+    @property
+    def loaded(self) -> bool:
+        return self._content is not None
+
+    def __repr__(self) -> str:
+        return f"Task({self.name!r}, {self.content!r})"
+
+    def __eq__(self, _other: Any) -> bool:
+        if not isinstance(_other, Task):
+            return NotImplemented
+        return self.name == _other.name and self.content == _other.content
+
+    @property
+    def summary(self) -> str:
+        return self.preview
+
+    @classmethod
+    def from_json(cls, _raw: dict[str, Any], /) -> "Task":
+        if "task-content" in _raw:
+            return cls(_raw["task-name"], _raw["task-content"])
+        # header only, the body is fetched from storage when needed
+        return cls(
+            _raw["task-name"],
+            None,
+            preview=_raw["task-preview"],
+            ref=tuple(_raw["task-body"]),
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        if self._content is None:
+            raise ValueError(f"error: content of task {self.name!r} is not loaded")
+        return {
+            "task-name": self.name,
+            "item-type": "task",
+            "task-content": self._content,
+        }
+
+    def to_header(self) -> dict[str, Any]:
+        "the split form, needs the body to be stored already"
+        return {
+            "task-name": self.name,
+            "item-type": "task",
+            "task-preview": self.preview,
+            "task-body": list(self.ref),
+        }
+
+
+class Todo:
+    "one todo, converts losslessly to and from the json item schema"
+
+    __slots__ = ("name", "finished")
+    item_type = "todo"
+
+    def __init__(self, _name: str, _finished: bool = False, /) -> None:
+        self.name = _name
+        self.finished = _finished
+
+    def __repr__(self) -> str:
+        return f"Todo({self.name!r}, {self.finished!r})"
+
+    def __eq__(self, _other: Any) -> bool:
+        if not isinstance(_other, Todo):
+            return NotImplemented
+        return self.name == _other.name and self.finished == _other.finished
+
+    @property
+    def summary(self) -> str:
+        return convert_todo_check(self.finished)
+
+    @classmethod
+    def from_json(cls, _raw: dict[str, Any], /) -> "Todo":
+        return cls(_raw["todo-name"], _raw["finished?"])
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "todo-name": self.name,
+            "item-type": "todo",
+            "finished?": self.finished,
+        }
+
+
+def make_preview(_content: str, /) -> str:
+    line, *_ = _content.partition("\n")
+    return line[:PREVIEW_LEN]
+
+
+if __name__ == "__main__":
+    import tracemalloc
+
+    def measure(_build) -> int:
+        tracemalloc.start()
+        kept = _build()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        return size
+
+    count = 100_000
+    # names and contents are shared by both runs so only the containers count
+    names = [f"item {n_}" for n_ in range(count)]
+    as_dict = measure(lambda: [Task(n_, "content").to_json() for n_ in names])
+    as_slot = measure(lambda: [Task(n_, "content") for n_ in names])
+    print(f"{count} tasks as dict  : {as_dict / 1024 / 1024:.2f} MiB")
+    print(f"{count} tasks as Task  : {as_slot / 1024 / 1024:.2f} MiB")
@@ -0,0 +1,85 @@
+from typing import Any, Iterator
+
+# marks a deleted slot, keeping its position so a rollback can put it back
+REMOVED: Any = object()
+
+
+class ItemIndex:
+    "ordered name -> item map, every lookup / add / delete is O(1)"
+
+    def __init__(self, _items: Any = (), /) -> None:
+        self._items = {}
+        self._live = 0
+        for itm_ in _items:
+            self.add(itm_)
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __contains__(self, _name: str) -> bool:
+        return self._items.get(_name, REMOVED) is not REMOVED
+
+    def __getitem__(self, _name: str) -> Any:
+        itm = self._items.get(_name, REMOVED)
+        if itm is REMOVED:
+            raise KeyError(_name)
+        return itm
+
+    def __iter__(self) -> Iterator[str]:
+        return (name_ for name_, itm_ in self._items.items() if itm_ is not REMOVED)
+
+    def get(self, _name: str, _default: Any = None, /) -> Any:
+        itm = self._items.get(_name, REMOVED)
+        return _default if itm is REMOVED else itm
+
+    def values(self) -> Iterator[Any]:
+        return (itm_ for itm_ in self._items.values() if itm_ is not REMOVED)
+
+    def add(self, _item: Any, /) -> None:
+        "append a new item, an existing name is replaced where it stands"
+        name = _item.name
+        old = self._items.get(name, REMOVED)
+        if old is REMOVED:
+            # a tombstone would pin the new item to the old position
+            self._items.pop(name, None)
+            self._live += 1
+        self._items[name] = _item
+
+    def remove(self, _name: str, /) -> Any:
+        itm = self[_name]
+        self._items[_name] = REMOVED
+        self._live -= 1
+        return itm
+
+    def discard(self, _name: str, /) -> None:
+        "drop a name without leaving a tombstone"
+        if self._items.pop(_name, REMOVED) is not REMOVED:
+            self._live -= 1
+
+    def restore(self, _name: str, _item: Any, /) -> None:
+        "undo a remove(), the item comes back at its old position"
+        if self._items.get(_name, REMOVED) is REMOVED:
+            self._live += 1
+        self._items[_name] = _item
+
+    def rename(self, _old_name: str, _new_name: str, /) -> None:
+        # keeping the display order means rebuilding, renames are rare
+        itm = self[_old_name]
+        if _new_name != _old_name and _new_name in self:
+            self._live -= 1
+        itm.name = _new_name
+        self._items = {
+            (_new_name if name_ == _old_name else name_): itm_
+            for name_, itm_ in self._items.items()
+            if name_ != _new_name
+        }
+
+    def purge(self) -> None:
+        "forget tombstones once no rollback can need them"
+        # rebuild only when they pile up so deletes stay amortized O(1)
+        if len(self._items) - self._live > max(64, self._live // 4):
+            self._items = {
+                name_: itm_
+                for name_, itm_ in self._items.items()
+                if itm_ is not REMOVED
+            }
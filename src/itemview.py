@@ -0,0 +1,210 @@
+from typing import Any
+from item import Task, Todo
+from maid import shortened_content
+
+
+class Row:
+    "one line of the item list, the formatted text is kept per width"
+
+    __slots__ = ("item", "dead", "slot", "_key", "_text")
+
+    def __init__(self, _item: Task | Todo, /) -> None:
+        self.item = _item
+        self.dead = False
+        # where it sits in its Rows, tombstones included
+        self.slot = 0
+        self._key = None
+        self._text = ""
+
+    def text(self, _title_len: int, _content_len: int, /) -> str:
+        if self._key != (_title_len, _content_len):
+            shortened_title = shortened_content(self.item.name, _title_len)
+            spaces = " " * (_title_len - len(shortened_title) + 1)
+            self._text = (
+                f"{shortened_title}{spaces}: "
+                f"{shortened_content(self.item.summary, _content_len)}"
+            )
+            self._key = (_title_len, _content_len)
+        return self._text
+
+    def forget(self) -> None:
+        self._key = None
+
+
+class Rows:
+    """
+    rows of one kind in display order. a deleted row stays as a tombstone
+    until they pile up, a fenwick tree counting the live ones turns a
+    position on screen into a row and a row into its position in O(log n)
+    """
+
+    def __init__(self, _rows: Any = (), /) -> None:
+        self.slots = []
+        self.live = 0
+        self._tree = [0]
+        self._build(list(_rows))
+
+    def _build(self, _rows: list[Row], /) -> None:
+        self.slots, self.live = _rows, len(_rows)
+        tree = [0] + [1] * len(_rows)
+        for idx_, row_ in enumerate(_rows, 1):
+            row_.slot = idx_ - 1
+            parent = idx_ + (idx_ & -idx_)
+            if parent <= len(_rows):
+                tree[parent] += tree[idx_]
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return self.live
+
+    def _count(self, _slots: int, /) -> int:
+        "live rows among the first _slots"
+        count, tree = 0, self._tree
+        while _slots > 0:
+            count += tree[_slots]
+            _slots &= _slots - 1
+        return count
+
+    def append(self, _row: Row, /) -> None:
+        self.slots.append(_row)
+        _row.slot = len(self.slots) - 1
+        node = len(self.slots)
+        # the new node covers the slots below it down to its lowest bit
+        self._tree.append(1 + self._count(node - 1) - self._count(node - (node & -node)))
+        self.live += 1
+
+    def kill(self, _row: Row, /) -> None:
+        _row.dead = True
+        self.live -= 1
+        node, tree = _row.slot + 1, self._tree
+        while node < len(tree):
+            tree[node] -= 1
+            node += node & -node
+        # squeezed out only once they pile up, like the item index does
+        if len(self.slots) - self.live > max(64, self.live // 4):
+            self._build([row_ for row_ in self.slots if not row_.dead])
+
+    def index(self, _row: Row, /) -> int:
+        return self._count(_row.slot)
+
+    def __getitem__(self, _index: int, /) -> Row:
+        if not 0 <= _index < self.live:
+            raise IndexError(_index)
+        # walk down the tree to the slot holding the live row number _index
+        node, rest, tree = 0, _index + 1, self._tree
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            if node + step < len(tree) and tree[node + step] < rest:
+                node += step
+                rest -= tree[node]
+            step >>= 1
+        return self.slots[node]
+
+
+class ItemView:
+    "display rows of an account, tasks then todos, patched by its mutations"
+
+    def __init__(self, _account: Any, /) -> None:
+        self.account = _account
+        self.rebuilds = 0
+        self.reset()
+        _account.subscribe(self.apply)
+
+    def close(self) -> None:
+        self.account.unsubscribe(self.apply)
+
+    def reset(self) -> None:
+        "build every row again, only for reloads and rollbacks"
+        self._rows = {
+            "task": Rows(Row(itm_) for itm_ in self.account.tasks.values()),
+            "todo": Rows(Row(itm_) for itm_ in self.account.todos.values()),
+        }
+        self._by_name = {
+            kind_: {row_.item.name: row_ for row_ in rows_.slots}
+            for kind_, rows_ in self._rows.items()
+        }
+        self.rebuilds += 1
+
+    def apply(self, _record: dict[str, Any], /) -> None:
+        "patch the rows a single record touched"
+        op, _, kind = _record["op"].partition("-")
+        if op == "reset":
+            self.reset()
+            return
+        if op == "set":
+            return
+        rows, by_name = self._rows[kind], self._by_name[kind]
+        name = _record[f"{kind}-name"]
+        row = by_name.get(name)
+        match op:
+            case "add":
+                item = (self.account.tasks if kind == "task" else self.account.todos)[name]
+                if row is not None:
+                    # replaced where it stands, like the index does
+                    row.item = item
+                    row.forget()
+                else:
+                    row = by_name[name] = Row(item)
+                    rows.append(row)
+            case "delete":
+                rows.kill(by_name.pop(name))
+            case "rename":
+                new_name = _record["new-name"]
+                if new_name in by_name:
+                    rows.kill(by_name.pop(new_name))
+                by_name[new_name] = by_name.pop(name)
+                row.forget()
+            case _:
+                row.forget()
+
+    def __len__(self) -> int:
+        return len(self.account.tasks) + len(self.account.todos)
+
+    def __getitem__(self, _index: int, /) -> Row:
+        tasks = self._rows["task"]
+        if _index < len(tasks):
+            return tasks[_index]
+        return self._rows["todo"][_index - len(tasks)]
+
+    def row(self, _kind: str, _name: str, /) -> Row | None:
+        return self._by_name[_kind].get(_name)
+
+    def index(self, _name: str, /) -> int | None:
+        "position of an item by name, tasks first"
+        for offset_, kind_ in ((0, "task"), (len(self._rows["task"]), "todo")):
+            row = self._by_name[kind_].get(_name)
+            if row is not None:
+                return offset_ + self._rows[kind_].index(row)
+        return None
+
+    @property
+    def desc(self) -> str:
+        return f"| Task: {len(self.account.tasks)} - Todo: {len(self.account.todos)}"
+
+
+class FoundView:
+    "rows of the items a search found, best match first"
+
+    def __init__(
+        self, _items: ItemView, _query: str, _found: list[tuple[str, str]], /
+    ) -> None:
+        self.query = _query
+        self.rows = [
+            row_ for key_ in _found if (row_ := _items.row(*key_)) is not None
+        ]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, _index: int, /) -> Row:
+        return self.rows[_index]
+
+    def index(self, _name: str, /) -> int | None:
+        for idx_, row_ in enumerate(self.rows):
+            if row_.item.name == _name:
+                return idx_
+        return None
+
+    @property
+    def desc(self) -> str:
+        return f"| find {self.query!r} : {len(self.rows)} found, 'find' to go back"
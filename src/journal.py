@@ -0,0 +1,130 @@
+import os
+import json
+import pathlib
+from typing import Any, Iterator
+from durable import Durability, append_file
+
+
+class Journal:
+    "append-only log of account mutations, one json record per line"
+
+    def __init__(self, _path: pathlib.Path, /) -> None:
+        self.path = _path
+        self.old_path = _path.with_suffix(_path.suffix + ".old")
+        # what the last fold took out, kept so changes_since() reaches past it
+        self.folded_path = _path.with_suffix(_path.suffix + ".folded")
+
+    def size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def append(
+        self,
+        _records: list[dict[str, Any]],
+        _durability: Durability = Durability.Atomic,
+        /,
+    ) -> int:
+        "write every record in a single append, return the bytes written"
+        if not _records:
+            return 0
+        # a record torn by a crash would swallow the first one written after it
+        self.cut_torn()
+        chunk = "".join(
+            json.dumps(rec_, separators=(",", ":")) + "\n" for rec_ in _records
+        )
+        append_file(self.path, chunk, _durability)
+        return len(chunk)
+
+    def cut_torn(self) -> None:
+        "drop what follows the last whole record, only the last byte is read when none"
+        try:
+            _jf = self.path.open("r+b")
+        except FileNotFoundError:
+            return
+        with _jf:
+            end = _jf.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            _jf.seek(end - 1)
+            if _jf.read(1) == b"\n":
+                return
+            _jf.seek(0)
+            _jf.truncate(_jf.read().rfind(b"\n") + 1)
+
+    def replay(self) -> Iterator[dict[str, Any]]:
+        "yield records of the rotated journal first, then the live one"
+        for path_ in (self.old_path, self.path):
+            yield from read_records(path_)
+
+    def history(self) -> Iterator[dict[str, Any]]:
+        "replay(), with the records folded away last time in front"
+        yield from read_records(self.folded_path)
+        yield from self.replay()
+
+    def last_seq(self) -> int | None:
+        "seq of the newest record, None when neither journal holds one"
+        for path_ in (self.path, self.old_path):
+            record = last_record(path_)
+            if record is not None:
+                return record["seq"]
+        return None
+
+    def rotate(self) -> pathlib.Path | None:
+        "move the live journal aside so it can be folded into a snapshot"
+        if self.old_path.exists() or not self.path.exists():
+            return None
+        os.replace(self.path, self.old_path)
+        return self.old_path
+
+    def retire(self, _path: pathlib.Path, /) -> None:
+        "_path is in a snapshot now, its records replace the folded ones"
+        os.replace(_path, self.folded_path)
+
+    def unlink(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.old_path.unlink(missing_ok=True)
+        self.folded_path.unlink(missing_ok=True)
+
+
+def read_records(_path: pathlib.Path, /) -> Iterator[dict[str, Any]]:
+    try:
+        _jf = _path.open()
+    except FileNotFoundError:
+        return
+    with _jf:
+        for line_ in _jf:
+            if not line_.endswith("\n"):
+                # torn write from a crash, the record never got committed
+                break
+            try:
+                yield json.loads(line_)
+            except json.JSONDecodeError:
+                break
+
+
+def last_record(_path: pathlib.Path, /, chunk: int = 4096) -> dict[str, Any] | None:
+    "the newest whole record, read from the end without going through the rest"
+    try:
+        _jf = _path.open("rb")
+    except FileNotFoundError:
+        return None
+    with _jf:
+        end = _jf.seek(0, os.SEEK_END)
+        while True:
+            start = max(0, end - chunk)
+            _jf.seek(start)
+            tail = _jf.read(end - start)
+            # past the last newline is a torn write, never committed
+            cut = tail.rfind(b"\n")
+            if cut < 0 and start == 0:
+                return None
+            if cut >= 0:
+                begin = tail.rfind(b"\n", 0, cut) + 1
+                if begin > 0 or start == 0:
+                    try:
+                        return json.loads(tail[begin:cut])
+                    except json.JSONDecodeError:
+                        return None
+            chunk *= 2
@@ -0,0 +1,71 @@
+import textwrap
+from functools import lru_cache
+
+TITLE = "Task/ToDo Terminal"
+# narrowest column before the list drops to fewer columns
+COLUMN_MIN_WIDTH = 38
+
+
+class Layout:
+    "positions on a screen of one size, built once per size and then reused"
+
+    __slots__ = (
+        "lines",
+        "cols",
+        "title_y",
+        "left_margin",
+        "desc_x",
+        "desc_width",
+        "desc_lines",
+        "list_y",
+        "rows",
+        "columns",
+        "column_x",
+        "title_len",
+        "content_len",
+        "position_y",
+        "status_y",
+    )
+
+    def __init__(self, _lines: int, _cols: int, /) -> None:
+        self.lines = _lines
+        self.cols = _cols
+        # the position marker, the notice line and the command box sit below
+        # the list. a short screen gives up blank lines and header lines first,
+        # from 8 lines on nothing overlaps
+        self.title_y = max(1, min(2, _lines - 8))
+        self.left_margin = 4
+        self.desc_x = len(TITLE) + self.left_margin + 5
+        self.desc_width = max(1, _cols - self.left_margin - self.desc_x)
+        room = _lines - 5 - self.title_y
+        self.desc_lines = max(1, min(3, room - 1))
+        self.list_y = self.title_y + self.desc_lines
+        self.rows = max(1, room - self.desc_lines)
+        self.position_y = self.list_y + self.rows
+        self.status_y = _lines - 4
+
+        usable = max(1, _cols - self.left_margin)
+        self.columns = max(1, usable // COLUMN_MIN_WIDTH)
+        column_width = usable // self.columns
+        self.column_x = tuple(
+            self.left_margin + column_width * col_ for col_ in range(self.columns)
+        )
+        column_spacing = 4
+        self.title_len = 10
+        # "title" + " : " + content, a column gap to the next one
+        self.content_len = max(4, column_width - column_spacing - self.title_len - 3)
+
+    def wrap_desc(self, _desc: str, /) -> list[str]:
+        "the description beside the title, one piece per line, cut between words"
+        return textwrap.wrap(_desc, self.desc_width)
+
+
+@lru_cache(maxsize=8)
+def layout_for(_lines: int, _cols: int, /) -> Layout:
+    return Layout(_lines, _cols)
+
+
+if __name__ == "__main__":
+    for size_ in ((24, 80), (40, 120), (50, 200), (10, 30), (8, 30)):
+        lay = layout_for(*size_)
+        print(size_, lay.rows, "rows x", lay.columns, "columns at", lay.column_x)
@@ -1,25 +1,7 @@
-import logging
-import sys
-import pathlib
-import inspect
-
 # import datetime
 
 from typing import Any
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="[%(asctime)s - %(levelname)s] %(message)s",
-    datefmt="%H:%M:%S",
-)
-
-
-def poslog(_message: str) -> None:
-    "log debug message with it's position on code lines"
-    logging.debug(
-        f"-> {pathlib.Path(inspect.getframeinfo(inspect.currentframe().f_back).filename).name!r} : [:{sys._getframe(1).f_lineno}:] : {_message}"
-    )
-
 
 def shortened_content(_content: str, _len: int = 8) -> str:
     _content, *_ = _content.partition("\n")
@@ -32,8 +14,9 @@ def shortened_content(_content: str, _len: int = 8) -> str:
 
 # chatgpt help :)
 def divide_list(lst, divider):
-    if divider > len(lst):
-        raise ValueError("Divider cannot be greater than the length of the list.")
+    # fewer items than parts leaves the last parts empty
+    if divider <= 0:
+        raise ValueError("Divider must be positive.")
 
     # quotient = len(lst) // divider
     # remainder = len(lst) % divider
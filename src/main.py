@@ -1,4 +1,122 @@
-import taskman
+import os
+import sys
+import argparse
+
+
+def parse_args(_argv: list[str], /) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="task/todo manager, runs the curses ui unless an account is given"
+    )
+    parser.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="rebuild the account index from the account files and exit",
+    )
+    parser.add_argument("--account", help="run commands against this account, no ui")
+    parser.add_argument(
+        "--password",
+        help="account password, defaults to $TASKMAN_PASSWORD or a prompt",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        choices=("cprofile", "sample"),
+        help="profile the whole session, cprofile by default or a sampling thread",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default="profile",
+        help="where session.pstats, session.collapsed and memory snapshots go",
+    )
+    parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="trace allocations and snapshot them while an account is open",
+    )
+    parser.add_argument(
+        "command",
+        nargs=argparse.REMAINDER,
+        help="same commands as the command box, e.g. check 'task 1' delete old",
+    )
+    return parser.parse_args(_argv)
+
+
+def headless(_args: argparse.Namespace, /) -> int:
+    "run one command line against an account without ever loading curses"
+    from account import Account, verify_account
+    from commander import command_parser, run_commands
+    from profiling import snapshot_memory
+
+    password = _args.password or os.environ.get("TASKMAN_PASSWORD")
+    if password is None:
+        import getpass
+
+        password = getpass.getpass(f"password for {_args.account}: ")
+    # the pbkdf2 check is most of a small run, see VERIFIER_ROUNDS
+    if not verify_account(_args.account, password):
+        print(f"error: wrong account or password : {_args.account}", file=sys.stderr)
+        return 1
+
+    stdin_used = False
+
+    def edit(_name: str, _content: str) -> str | None:
+        # the new body comes from stdin, which can only be read once
+        nonlocal stdin_used
+        if stdin_used or sys.stdin.isatty():
+            print(f"skipped edit of {_name!r}, pipe the content in", file=sys.stderr)
+            return None
+        stdin_used = True
+        return sys.stdin.read()
+
+    commands = command_parser(_args.command)
+    account = Account(_args.account)
+    try:
+        result = run_commands(commands, account, edit=edit, report=print)
+    finally:
+        account.close()
+    snapshot_memory(account.name)
+    match result:
+        case -2:
+            print(f"error: unknown command : {' '.join(_args.command)}", file=sys.stderr)
+            return 2
+        case 2:
+            print("error: no target applied at command", file=sys.stderr)
+            return 2
+        case _:
+            return 0
+
+
+def main(_args: argparse.Namespace, /) -> int:
+    if _args.rebuild_index:
+        import account
+
+        print(f"indexed {account.rebuild_index()} account(s)")
+        return 0
+    if _args.account is not None:
+        from metrics import metrics
+        import config
+
+        code = headless(_args)
+        if config.metrics_file:
+            metrics.export(config.metrics_file)
+        return code
+    import taskman
+
+    taskman.run()
+    return 0
+
 
 if __name__ == "__main__":
-    taskman.run()
\ No newline at end of file
+    args = parse_args(sys.argv[1:])
+    if args.profile or args.tracemalloc:
+        import pathlib
+        import profiling
+
+        profiling.output = pathlib.Path(args.profile_dir)
+        if args.tracemalloc:
+            # before the account modules load, their own allocations count too
+            profiling.trace_memory()
+        if args.profile:
+            sys.exit(profiling.profile(lambda: main(args), args.profile))
+    sys.exit(main(args))
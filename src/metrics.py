@@ -0,0 +1,160 @@
+import json
+import math
+import time
+import pathlib
+import threading
+from collections import deque
+from functools import wraps
+from typing import Any, Callable
+
+# latency buckets grow by this factor, any percentile is within half of it
+BUCKET_GROWTH = 1.1
+# samples per span the hud percentiles are taken from
+RECENT = 256
+
+
+class Histogram:
+    "latencies in log spaced buckets for the whole run, and the latest few as is"
+
+    __slots__ = ("count", "total", "buckets", "recent")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        # bucket index -> samples, a sample of n ns lands in log(n, growth)
+        self.buckets = {}
+        self.recent = deque(maxlen=RECENT)
+
+    def add(self, _ns: int, /) -> None:
+        self.count += 1
+        self.total += _ns
+        idx = int(math.log(_ns, BUCKET_GROWTH)) if _ns > 0 else 0
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+        self.recent.append(_ns)
+
+    def percentile(self, _share: float, /) -> float:
+        "ns under which share of all samples fall, from the buckets"
+        if self.count == 0:
+            return 0.0
+        rank = _share * self.count
+        seen = 0
+        for idx_ in sorted(self.buckets):
+            seen += self.buckets[idx_]
+            if seen >= rank:
+                return BUCKET_GROWTH ** (idx_ + 0.5)
+        return BUCKET_GROWTH ** (max(self.buckets) + 0.5)
+
+    def recent_percentile(self, _share: float, /) -> float:
+        recent = sorted(self.recent)
+        if not recent:
+            return 0.0
+        return recent[min(len(recent) - 1, int(_share * len(recent)))]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ns": self.total / self.count if self.count else 0,
+            "p50_ns": self.percentile(0.5),
+            "p90_ns": self.percentile(0.9),
+            "p99_ns": self.percentile(0.99),
+            "max_ns": BUCKET_GROWTH ** (max(self.buckets) + 1) if self.buckets else 0,
+        }
+
+
+class Metrics:
+    "named spans and counters of one process, shared by every thread"
+
+    def __init__(self) -> None:
+        self.spans = {}
+        self.counters = {}
+        self.started = time.time()
+        # bumped on every sample, tells a reader whether anything moved
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def observe(self, _name: str, _ns: int, /) -> None:
+        with self._lock:
+            span = self.spans.get(_name)
+            if span is None:
+                span = self.spans[_name] = Histogram()
+            span.add(_ns)
+            self.version += 1
+
+    def count(self, _name: str, _amount: int = 1, /) -> None:
+        with self._lock:
+            self.counters[_name] = self.counters.get(_name, 0) + _amount
+            self.version += 1
+
+    def timed(self, _name: str, /) -> Callable[[Callable], Callable]:
+        "decorator, every call of the function is one sample of the span"
+
+        def decorate(_func: Callable) -> Callable:
+            @wraps(_func)
+            def timed_call(*_args: Any, **_kwargs: Any) -> Any:
+                start = time.perf_counter_ns()
+                try:
+                    return _func(*_args, **_kwargs)
+                finally:
+                    self.observe(_name, time.perf_counter_ns() - start)
+
+            return timed_call
+
+        return decorate
+
+    def hud(self, _names: tuple[str, ...], /) -> str:
+        "one line of recent p50/p99 per span and the counters"
+        parts = []
+        with self._lock:
+            for name_ in _names:
+                span = self.spans.get(name_)
+                if span is None:
+                    continue
+                parts.append(
+                    f"{name_} {human_ns(span.recent_percentile(0.5))}"
+                    f"/{human_ns(span.recent_percentile(0.99))}"
+                )
+            parts.extend(f"{name_} {value_}" for name_, value_ in self.counters.items())
+        return " | ".join(parts)
+
+    def to_json(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "started": self.started,
+                "exported": time.time(),
+                "spans": {name_: span_.to_json() for name_, span_ in self.spans.items()},
+                "counters": dict(self.counters),
+            }
+
+    def export(self, _path: str | pathlib.Path, /) -> None:
+        pathlib.Path(_path).write_text(json.dumps(self.to_json(), indent=2))
+
+
+def human_ns(_ns: float, /) -> str:
+    if _ns < 1_000:
+        return f"{_ns:.0f}ns"
+    if _ns < 1_000_000:
+        return f"{_ns / 1_000:.0f}us"
+    if _ns < 1_000_000_000:
+        return f"{_ns / 1_000_000:.1f}ms"
+    return f"{_ns / 1_000_000_000:.2f}s"
+
+
+# the one the app records into
+metrics = Metrics()
+
+
+if __name__ == "__main__":
+    bench = Metrics()
+
+    @bench.timed("noop")
+    def noop() -> None:
+        pass
+
+    rounds = 100_000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        noop()
+    took = (time.perf_counter() - start) / rounds * 1e9
+    print(f"{took:.0f} ns per timed call")
+    print(bench.hud(("noop",)))
+    print(bench.to_json()["spans"]["noop"])
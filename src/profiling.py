@@ -0,0 +1,189 @@
+import sys
+import time
+import pstats
+import cProfile
+import pathlib
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable
+
+# seconds between two looks at the main thread's stack
+SAMPLE_INTERVAL = 0.005
+# stacks deeper than this are cut at the root end
+MAX_DEPTH = 64
+# lines of the text summaries, by cost
+TOP = 40
+
+# where profiles and memory snapshots go, main.py points it at --profile-dir
+output = pathlib.Path(".")
+
+
+def frame_name(_code: Any, /) -> str:
+    # no spaces, flamegraph tools split a collapsed line on its last one
+    return f"{pathlib.Path(_code.co_filename).name}:{_code.co_name}:{_code.co_firstlineno}"
+
+
+def pstats_name(_func: tuple[str, int, str], /) -> str:
+    file, line, name = _func
+    return f"{pathlib.Path(file).name}:{name}:{line}".replace(" ", "_")
+
+
+class Sampler:
+    "a thread that records where the main thread is every interval, no tracing hooks"
+
+    def __init__(self, _interval: float = SAMPLE_INTERVAL, /) -> None:
+        self.interval = _interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(frame_name(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def summary(self) -> str:
+        "frames by samples spent in them, then by samples anywhere below them"
+        own, below = Counter(), Counter()
+        for stack_, count_ in self.stacks.items():
+            frames = stack_.split(";")
+            own[frames[-1]] += count_
+            for frame_ in set(frames):
+                below[frame_] += count_
+        lines = [f"{self.samples} samples every {self.interval * 1000:g} ms", "", "own"]
+        lines += [f"{count_:8} {frame_}" for frame_, count_ in own.most_common(TOP)]
+        lines += ["", "total"]
+        lines += [f"{count_:8} {frame_}" for frame_, count_ in below.most_common(TOP)]
+        return "\n".join(lines) + "\n"
+
+
+def collapse_stats(_stats: pstats.Stats, /) -> Counter:
+    """
+    collapsed stacks in us from a deterministic profile. cProfile keeps only
+    caller -> callee edges, so the time of a function is split down its
+    callees in the share each edge took of it
+    """
+    stats = _stats.stats
+    callees = {}
+    for func_, (_, _, _, _, callers_) in stats.items():
+        for caller_, edge_ in callers_.items():
+            callees.setdefault(caller_, []).append((func_, edge_[3]))
+    stacks = Counter()
+
+    def walk(_func: tuple, _path: list[str], _amount: float, /) -> None:
+        _, _, own, total, _ = stats[_func]
+        path = [*_path, pstats_name(_func)]
+        if total <= 0 or len(path) > MAX_DEPTH:
+            stacks[";".join(path)] += round(_amount * 1e6)
+            return
+        stacks[";".join(path)] += round(_amount * own / total * 1e6)
+        for callee_, edge_ in callees.get(_func, ()):
+            share = _amount * edge_ / total
+            # recursion and slivers stay with the caller
+            if share * 1e6 < 1 or pstats_name(callee_) in path:
+                continue
+            walk(callee_, path, share)
+
+    for func_, (_, _, _, total_, callers_) in stats.items():
+        if not callers_:
+            walk(func_, [], total_)
+    return +stacks
+
+
+def write_collapsed(_stacks: Counter, _path: pathlib.Path, /) -> None:
+    with _path.open("w") as _cf:
+        for stack_, count_ in sorted(_stacks.items()):
+            _cf.write(f"{stack_} {count_}\n")
+
+
+def profile(_run: Callable[[], Any], _mode: str, /) -> Any:
+    """
+    run a whole session under cProfile or the sampler. cprofile leaves
+    session.pstats, both leave session.collapsed and a session.txt summary
+    """
+    output.mkdir(parents=True, exist_ok=True)
+    if _mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(_run)
+        finally:
+            profiler.create_stats()
+            profiler.dump_stats(output / "session.pstats")
+            write_collapsed(collapse_stats(pstats.Stats(profiler)), output / "session.collapsed")
+            with (output / "session.txt").open("w") as _tf:
+                pstats.Stats(profiler, stream=_tf).sort_stats("cumulative").print_stats(TOP)
+    if _mode == "sample":
+        sampler = Sampler()
+        sampler.start()
+        try:
+            return _run()
+        finally:
+            sampler.stop()
+            write_collapsed(sampler.stacks, output / "session.collapsed")
+            (output / "session.txt").write_text(sampler.summary())
+    raise ValueError(f"error: unknown profile mode {_mode!r}")
+
+
+def trace_memory(_frames: int = 16, /) -> None:
+    "record allocations from now on, snapshot_memory() saves where they came from"
+    tracemalloc.start(_frames)
+
+
+def snapshot_memory(_label: str, /) -> pathlib.Path | None:
+    "dump what is allocated right now and a summary by line, None when not tracing"
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+    )
+    output.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%H%M%S")
+    path = output / f"memory-{_label}-{stamp}.snapshot"
+    snapshot.dump(path)
+    sites = snapshot.statistics("lineno")
+    lines = [f"{sum(st_.size for st_ in sites) / 1024:.1f} KiB in {len(sites)} lines"]
+    lines += [str(st_) for st_ in sites[:TOP]]
+    path.with_suffix(".txt").write_text("\n".join(lines) + "\n")
+    return path
+
+
+if __name__ == "__main__":
+
+    def fib(_n: int, /) -> int:
+        return _n if _n < 2 else fib(_n - 1) + fib(_n - 2)
+
+    def work() -> None:
+        start = time.perf_counter()
+        while time.perf_counter() - start < 0.5:
+            fib(18)
+            sorted(range(20_000), key=lambda x_: -x_)
+
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as _tmp:
+        output = pathlib.Path(_tmp)
+        for mode_ in ("cprofile", "sample"):
+            profile(work, mode_)
+            stacks = (output / "session.collapsed").read_text().splitlines()
+            print(f"{mode_}: {len(stacks)} stacks, heaviest:")
+            for line_ in sorted(stacks, key=lambda ln_: -int(ln_.rsplit(" ", 1)[1]))[:3]:
+                print("   ", line_[-100:])
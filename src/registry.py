@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import hashlib
+import hmac
+import re
+import pathlib
+from typing import Any
+from durable import Durability, FileLock, write_file
+
+# cost of one login check, constant no matter how big the accounts are.
+# around 40 ms, which every headless run pays once and on purpose: fewer
+# rounds make every guess against a copied registry.json cheaper, and a
+# process that checks one password and exits has nothing to cache it in
+VERIFIER_ROUNDS = 100_000
+# what make_verifier() returns, salt then digest in hex
+VERIFIER = re.compile(r"[0-9a-f]{32}\$[0-9a-f]{64}")
+
+
+class Registry:
+    "account name -> path, credential verifier, item counts and last save"
+
+    def __init__(
+        self, _path: pathlib.Path, _durability: Durability = Durability.Atomic, /
+    ) -> None:
+        self.path = _path
+        self.durability = _durability
+        self._entries = None
+        self._mtime = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @property
+    def entries(self) -> dict[str, dict[str, Any]]:
+        # re-read only when another process rewrote the file
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if self._entries is None or mtime != self._mtime:
+            self._entries = {}
+            if mtime is not None:
+                with self.path.open() as _rf:
+                    self._entries = json.load(_rf)["accounts"]
+            self._mtime = mtime
+        return self._entries
+
+    def get(self, _name: str, /) -> dict[str, Any] | None:
+        return self.entries.get(_name)
+
+    def names(self) -> tuple[str, ...]:
+        return tuple(sorted(self.entries))
+
+    def locked(self) -> FileLock:
+        "other sessions write the same file, changes are read fresh under it"
+        self._entries = None
+        return FileLock(self.path.with_suffix(".lock"))
+
+    def put(self, _name: str, _entry: dict[str, Any], /) -> None:
+        with self.locked():
+            self.entries[_name] = _entry
+            self.write()
+
+    def update(self, _name: str, /, **_fields: Any) -> None:
+        with self.locked():
+            entry = self.entries.get(_name)
+            if entry is None:
+                return
+            entry.update(_fields)
+            self.write()
+
+    def remove(self, _name: str, /) -> None:
+        with self.locked():
+            if self.entries.pop(_name, None) is not None:
+                self.write()
+
+    def replace(self, _entries: dict[str, dict[str, Any]], /) -> None:
+        with self.locked():
+            self._entries = _entries
+            self.write()
+
+    def write(self) -> None:
+        write_file(
+            self.path,
+            json.dumps({"version": 1, "accounts": self._entries}),
+            self.durability,
+        )
+        self._mtime = self.path.stat().st_mtime_ns
+
+
+def make_entry(
+    _path: pathlib.Path, _verifier: str | None, _tasks: int, _todos: int, /
+) -> dict[str, Any]:
+    return {
+        "path": _path.name,
+        "verifier": _verifier,
+        "tasks": _tasks,
+        "todos": _todos,
+        "modified": time.time(),
+    }
+
+
+def make_verifier(_password: str | None, /) -> str | None:
+    if _password is None:
+        return None
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", _password.encode(), salt, VERIFIER_ROUNDS)
+    return f"{salt.hex()}${digest.hex()}"
+
+
+def check_verifier(_verifier: str | None, _password: str, /) -> bool:
+    if _verifier is None:
+        return False
+    salt, _, expected = _verifier.partition("$")
+    digest = hashlib.pbkdf2_hmac(
+        "sha256", _password.encode(), bytes.fromhex(salt), VERIFIER_ROUNDS
+    )
+    return hmac.compare_digest(digest.hex(), expected)
+
+
+def as_verifier(_stored: str | None, /) -> str | None:
+    "what an account keeps for its password, older files still hold it in plain"
+    if _stored is None or VERIFIER.fullmatch(_stored):
+        return _stored
+    return make_verifier(_stored)
+
+
+def check_password(_stored: str | None, _password: str | None, /) -> bool:
+    if _stored is None or _password is None:
+        return False
+    if VERIFIER.fullmatch(_stored):
+        return check_verifier(_stored, _password)
+    return hmac.compare_digest(_stored.encode(), _password.encode())
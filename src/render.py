@@ -0,0 +1,44 @@
+from typing import Any
+
+
+class Renderer:
+    "keeps the last frame per screen line and rewrites only the lines that changed"
+
+    def __init__(self, _stdscr: Any, /) -> None:
+        self.stdscr = _stdscr
+        # y -> [(x, text, attr), ...] of what is on screen and what comes next
+        self.shown = {}
+        self.frame = {}
+        self.lines_written = 0
+
+    def put(self, _y: int, _x: int, _text: str, _attr: int = 0, /) -> None:
+        self.frame.setdefault(_y, []).append((_x, _text, _attr))
+
+    def flush(self, _cursor: tuple[int, int] | None = None, /) -> int:
+        "draw the pending frame in one doupdate, return the lines rewritten"
+        height, width = self.stdscr.getmaxyx()
+        changed = 0
+        for y_ in sorted(self.shown.keys() | self.frame.keys()):
+            segments = self.frame.get(y_)
+            if segments == self.shown.get(y_) or y_ >= height:
+                continue
+            self.stdscr.move(y_, 0)
+            self.stdscr.clrtoeol()
+            for x_, text_, attr_ in segments or ():
+                # the bottom right cell can not be written without an error
+                if x_ < width - 1:
+                    self.stdscr.addnstr(y_, x_, text_, width - x_ - 1, attr_)
+            changed += 1
+        self.shown = self.frame
+        self.frame = {}
+        if _cursor is not None:
+            self.stdscr.move(*_cursor)
+        self.stdscr.noutrefresh()
+        self.stdscr.doupdate()
+        self.lines_written += changed
+        return changed
+
+    def invalidate(self) -> None:
+        "something else drew on the screen, the next flush starts from blank"
+        self.stdscr.erase()
+        self.shown = {}
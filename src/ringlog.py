@@ -0,0 +1,104 @@
+import sys
+import logging
+import pathlib
+from collections import deque
+from typing import Any, TextIO
+import config
+
+# nothing here touches the root logger, stderr or the terminal curses draws on
+FORMAT = "[%(asctime)s - %(levelname)s] -> %(filename)r : [:%(lineno)d:] : %(message)s"
+DATEFMT = "%H:%M:%S"
+
+
+class RingHandler(logging.Handler):
+    "keeps the newest records in memory, formatted only when dumped"
+
+    def __init__(self, _size: int, /) -> None:
+        super().__init__()
+        self.records = deque(maxlen=_size)
+        self.setFormatter(logging.Formatter(FORMAT, DATEFMT))
+
+    def emit(self, _record: logging.LogRecord, /) -> None:
+        if _record.exc_info:
+            # a traceback holds every frame it passed, keep its text instead
+            _record.exc_text = self.formatter.formatException(_record.exc_info)
+            _record.msg, _record.args = _record.getMessage(), None
+            _record.exc_info = None
+        self.records.append(_record)
+
+    def dump(self, _out: TextIO, /) -> int:
+        "write every kept record, oldest first, return how many"
+        records = list(self.records)
+        for rec_ in records:
+            _out.write(self.format(rec_) + "\n")
+        return len(records)
+
+
+logger = logging.getLogger("taskman")
+logger.propagate = False
+logger.setLevel(config.log_level.upper())
+ring = RingHandler(config.log_size)
+logger.addHandler(ring)
+
+
+def poslog(
+    _message: str, /, *_args: Any, level: int = logging.DEBUG, exc_info: Any = None
+) -> None:
+    """
+    log with the calling file and line, message % args is only built on a dump.
+    disabled levels cost one check, the caller's frame is only read past it
+    """
+    if not logger.isEnabledFor(level):
+        return
+    frame = sys._getframe(1)
+    logger.handle(
+        logger.makeRecord(
+            logger.name,
+            level,
+            frame.f_code.co_filename,
+            frame.f_lineno,
+            _message,
+            _args,
+            exc_info,
+            frame.f_code.co_name,
+        )
+    )
+
+
+def dump_log(_path: str | pathlib.Path | None = None, /) -> int:
+    "write the ring to a file, appending, or to stderr without one"
+    path = _path if _path is not None else config.log_file
+    if not path:
+        return ring.dump(sys.stderr)
+    with open(path, "a") as _lf:
+        return ring.dump(_lf)
+
+
+def dump_on_signal() -> None:
+    """
+    SIGUSR1 dumps the ring to the log file while the app keeps running.
+    without a log file nothing is installed, stderr is the curses terminal
+    """
+    import signal
+
+    if config.log_file and hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda _sig, _frame: dump_log())
+
+
+if __name__ == "__main__":
+    import time
+
+    logger.setLevel(logging.INFO)
+    rounds = 200_000
+    start = time.perf_counter()
+    for idx_ in range(rounds):
+        poslog("item %d of %s", idx_, "bench")
+    off = (time.perf_counter() - start) / rounds * 1e9
+    logger.setLevel(logging.DEBUG)
+    start = time.perf_counter()
+    for idx_ in range(rounds):
+        poslog("item %d of %s", idx_, "bench")
+    on = (time.perf_counter() - start) / rounds * 1e9
+    print(f"disabled {off:.0f} ns, enabled {on:.0f} ns per call, {len(ring.records)} kept")
+    ring.records = deque(list(ring.records)[-3:])
+    ring.dump(sys.stdout)
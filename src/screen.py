@@ -0,0 +1,377 @@
+import curses
+from abc import ABC, abstractmethod
+from collections import deque
+from curses.textpad import rectangle
+from typing import Any
+
+# what a blank cell holds, a character and its attributes
+BLANK = (" ", 0)
+
+
+class ScriptEnd(Exception):
+    "a virtual screen was asked for a key after its scripted input ran out"
+
+
+class Screen(ABC):
+    """
+    what the interface draws on and reads keys from. window calls (addstr,
+    addnstr, move, getch, get_wch, ...) keep their curses signatures, the
+    calls curses makes on the whole terminal are methods here as well
+    """
+
+    @abstractmethod
+    def newwin(self, _height: int, _width: int, _y: int, _x: int, /) -> "Screen":
+        ...
+
+    @abstractmethod
+    def rectangle(self, _uly: int, _ulx: int, _lry: int, _lrx: int, /) -> None:
+        ...
+
+    @abstractmethod
+    def echo(self) -> None:
+        ...
+
+    @abstractmethod
+    def noecho(self) -> None:
+        ...
+
+    @abstractmethod
+    def curs_set(self, _visible: int, /) -> None:
+        ...
+
+    @abstractmethod
+    def napms(self, _ms: int, /) -> None:
+        ...
+
+    @abstractmethod
+    def doupdate(self) -> None:
+        ...
+
+    @abstractmethod
+    def start_color(self) -> None:
+        ...
+
+    @abstractmethod
+    def init_pair(self, _pair: int, _fg: int, _bg: int, /) -> None:
+        ...
+
+    @abstractmethod
+    def color_pair(self, _pair: int, /) -> int:
+        ...
+
+
+class CursesScreen(Screen):
+    "a real curses window, anything not defined here goes straight to it"
+
+    def __init__(self, _win: Any, /) -> None:
+        self.win = _win
+
+    def __getattr__(self, _name: str) -> Any:
+        # kept on the instance, the next call skips this lookup
+        value = getattr(self.win, _name)
+        setattr(self, _name, value)
+        return value
+
+    def newwin(self, _height: int, _width: int, _y: int, _x: int, /) -> Screen:
+        return CursesScreen(curses.newwin(_height, _width, _y, _x))
+
+    def rectangle(self, _uly: int, _ulx: int, _lry: int, _lrx: int, /) -> None:
+        rectangle(self.win, _uly, _ulx, _lry, _lrx)
+
+    def echo(self) -> None:
+        curses.echo()
+
+    def noecho(self) -> None:
+        curses.noecho()
+
+    def curs_set(self, _visible: int, /) -> None:
+        curses.curs_set(_visible)
+
+    def napms(self, _ms: int, /) -> None:
+        curses.napms(_ms)
+
+    def doupdate(self) -> None:
+        curses.doupdate()
+
+    def start_color(self) -> None:
+        curses.start_color()
+        curses.use_default_colors()
+
+    def init_pair(self, _pair: int, _fg: int, _bg: int, /) -> None:
+        curses.init_pair(_pair, _fg, _bg)
+
+    def color_pair(self, _pair: int, /) -> int:
+        return curses.color_pair(_pair)
+
+
+class VirtualScreen(Screen):
+    """
+    a terminal in memory. like curses every window writes into its own cells
+    and a refresh copies the lines it touched onto the terminal. keys come
+    from a script: characters, key codes, None for a moment without a key,
+    (height, width) for a resize. past the script getch raises ScriptEnd
+    """
+
+    def __init__(self, _height: int = 24, _width: int = 80, /, keys: Any = ()) -> None:
+        self._window(self, _height, _width, 0, 0)
+        self.terminal = blank(_height, _width)
+        self.script = deque()
+        self.echoing = True
+        self.cursor_visible = 1
+        self.cells_written = 0
+        self.updates = 0
+        self.pairs = {}
+        self.feed(*keys)
+
+    def _window(
+        self, _root: "VirtualScreen", _height: int, _width: int, _y: int, _x: int, /
+    ) -> None:
+        self.root = _root
+        self.origin = (_y, _x)
+        self.height, self.width = _height, _width
+        self.cells = blank(_height, _width)
+        # rows written since the last refresh, only those reach the terminal
+        self.touched = set()
+        self.y = self.x = 0
+        self.delay = -1
+
+    def feed(self, *_keys: Any) -> None:
+        "queue input, strings go in one character at a time"
+        for key_ in _keys:
+            if isinstance(key_, str):
+                self.root.script.extend(key_)
+            else:
+                self.root.script.append(key_)
+
+    def lines(self) -> list[str]:
+        "what the terminal shows, a row per line, for snapshots"
+        return ["".join(ch_ for ch_, _ in row_) for row_ in self.root.terminal]
+
+    def attr_at(self, _y: int, _x: int, /) -> int:
+        return self.root.terminal[_y][_x][1]
+
+    def resize(self, _height: int, _width: int, /) -> None:
+        "what the terminal does on its own, the screen follows and windows stay"
+        root = self.root
+        root.terminal = fit(root.terminal, _height, _width)
+        root.cells = fit(root.cells, _height, _width)
+        root.height, root.width = _height, _width
+        root.y, root.x = min(root.y, _height - 1), min(root.x, _width - 1)
+
+    # the window calls taskman makes, with the argument forms curses takes
+
+    def newwin(self, _height: int, _width: int, _y: int, _x: int, /) -> Screen:
+        win = object.__new__(VirtualScreen)
+        win._window(self.root, _height, _width, _y, _x)
+        return win
+
+    def getmaxyx(self) -> tuple[int, int]:
+        return self.height, self.width
+
+    def getyx(self) -> tuple[int, int]:
+        return self.y, self.x
+
+    def move(self, _y: int, _x: int, /) -> None:
+        if not (0 <= _y < self.height and 0 <= _x < self.width):
+            raise curses.error("move() returned ERR")
+        self.y, self.x = _y, _x
+
+    def _at(self, _args: tuple, _rest: int, /) -> tuple:
+        # the leading y, x a curses call may have, told apart by the count
+        # like curses does, the cursor moves there
+        if len(_args) >= _rest + 2:
+            self.move(_args[0], _args[1])
+            return _args[2:]
+        return _args
+
+    def _row(self, _y: int, /) -> list[tuple[str, int]]:
+        self.touched.add(_y)
+        return self.cells[_y]
+
+    def _put(self, _text: str, _attr: int, /) -> None:
+        for ch_ in _text:
+            if ch_ == "\n":
+                self.clrtoeol()
+                self.x, self.y = 0, self.y + 1
+            else:
+                self._row(self.y)[self.x] = (ch_, _attr)
+                self.root.cells_written += 1
+                self.x += 1
+                if self.x == self.width:
+                    self.x, self.y = 0, self.y + 1
+            if self.y == self.height:
+                # curses can not move past the bottom right cell either
+                self.y, self.x = self.height - 1, self.width - 1
+                raise curses.error("addstr() returned ERR")
+
+    def addstr(self, *_args: Any) -> None:
+        text, *attr = self._at(_args, 1)
+        self._put(text, attr[0] if attr else 0)
+
+    def addnstr(self, *_args: Any) -> None:
+        text, length, *attr = self._at(_args, 2)
+        self._put(text[:length], attr[0] if attr else 0)
+
+    def addch(self, *_args: Any) -> None:
+        char, *attr = self._at(_args, 1)
+        if not isinstance(char, str):
+            char = chr(char & 0xFF)
+        self._put(char, attr[0] if attr else 0)
+
+    def inch(self, *_args: Any) -> int:
+        self._at(_args, 0)
+        char, attr = self.cells[self.y][self.x]
+        return ord(char) | attr
+
+    def delch(self, *_args: Any) -> None:
+        self._at(_args, 0)
+        row = self._row(self.y)
+        row[self.x :] = [*row[self.x + 1 :], BLANK]
+
+    def clrtoeol(self) -> None:
+        self._row(self.y)[self.x :] = [BLANK] * (self.width - self.x)
+
+    def hline(self, *_args: Any) -> None:
+        char, length = self._at(_args, 2)
+        row = self._row(self.y)
+        for x_ in range(self.x, min(self.x + length, self.width)):
+            row[x_] = (chr(char & 0xFF), 0)
+
+    def vline(self, *_args: Any) -> None:
+        char, length = self._at(_args, 2)
+        for y_ in range(self.y, min(self.y + length, self.height)):
+            self._row(y_)[self.x] = (chr(char & 0xFF), 0)
+
+    def insertln(self) -> None:
+        self.cells[self.y : self.height] = [[BLANK] * self.width, *self.cells[self.y : -1]]
+        self.touched.update(range(self.y, self.height))
+
+    def deleteln(self) -> None:
+        self.cells[self.y : self.height] = [*self.cells[self.y + 1 :], [BLANK] * self.width]
+        self.touched.update(range(self.y, self.height))
+
+    def erase(self) -> None:
+        self.cells = blank(self.height, self.width)
+        self.touched.update(range(self.height))
+        self.y = self.x = 0
+
+    clear = erase
+
+    def noutrefresh(self) -> None:
+        terminal, (top, left) = self.root.terminal, self.origin
+        for y_ in self.touched:
+            if top + y_ >= len(terminal):
+                continue
+            line = terminal[top + y_]
+            width = max(0, min(self.width, len(line) - left))
+            line[left : left + width] = self.cells[y_][:width]
+        self.touched.clear()
+
+    def refresh(self) -> None:
+        self.noutrefresh()
+        self.doupdate()
+
+    def keypad(self, _flag: bool, /) -> None:
+        pass
+
+    def timeout(self, _delay: int, /) -> None:
+        self.delay = _delay
+
+    def _next_key(self) -> Any:
+        script = self.root.script
+        if not script:
+            raise ScriptEnd("error: the scripted input ran out")
+        key = script.popleft()
+        if isinstance(key, tuple):
+            self.resize(*key)
+            return curses.KEY_RESIZE
+        return key
+
+    def getch(self) -> int:
+        key = self._next_key()
+        if key is None:
+            return -1
+        if isinstance(key, str):
+            key = ord(key)
+        if self.root.echoing and 32 <= key < 127:
+            # what the terminal would have echoed at the cursor
+            try:
+                self._put(chr(key), 0)
+            except curses.error:
+                pass
+            self.refresh()
+        return key
+
+    def get_wch(self) -> int | str:
+        key = self._next_key()
+        if key is None:
+            raise curses.error("no input")
+        return key
+
+    # the terminal wide calls
+
+    def rectangle(self, _uly: int, _ulx: int, _lry: int, _lrx: int, /) -> None:
+        self.vline(_uly + 1, _ulx, ord("|"), _lry - _uly - 1)
+        self.hline(_uly, _ulx + 1, ord("-"), _lrx - _ulx - 1)
+        self.hline(_lry, _ulx + 1, ord("-"), _lrx - _ulx - 1)
+        self.vline(_uly + 1, _lrx, ord("|"), _lry - _uly - 1)
+        for y_, x_ in ((_uly, _ulx), (_uly, _lrx), (_lry, _ulx), (_lry, _lrx)):
+            self._row(y_)[x_] = ("+", 0)
+
+    def echo(self) -> None:
+        self.root.echoing = True
+
+    def noecho(self) -> None:
+        self.root.echoing = False
+
+    def curs_set(self, _visible: int, /) -> None:
+        self.root.cursor_visible = int(_visible)
+
+    def napms(self, _ms: int, /) -> None:
+        pass
+
+    def doupdate(self) -> None:
+        self.root.updates += 1
+
+    def start_color(self) -> None:
+        pass
+
+    def init_pair(self, _pair: int, _fg: int, _bg: int, /) -> None:
+        self.root.pairs[_pair] = (_fg, _bg)
+
+    def color_pair(self, _pair: int, /) -> int:
+        # the same bits curses puts a pair number in
+        return (_pair or 0) << 8
+
+
+def blank(_height: int, _width: int, /) -> list[list[tuple[str, int]]]:
+    return [[BLANK] * _width for _ in range(_height)]
+
+
+def fit(_cells: list[list[tuple[str, int]]], _height: int, _width: int, /) -> list:
+    "the same cells cut or padded to a new size"
+    rows = [(row_ + [BLANK] * _width)[:_width] for row_ in _cells[:_height]]
+    return rows + blank(_height - len(rows), _width)
+
+
+if __name__ == "__main__":
+    import time
+    import pathlib
+    import tempfile
+    import account
+    from storage import open_storage
+    import taskman
+
+    with tempfile.TemporaryDirectory() as _tmp:
+        account.Account.storage = open_storage("json", pathlib.Path(_tmp))
+        acc = account.Account("demo", "demo")
+        with acc:
+            for idx_ in range(40):
+                acc.add_todo(f"todo {idx_}", idx_ % 3 == 0)
+        # the same session at two sizes, a resize in between
+        screen = VirtualScreen(16, 72, keys=["goto 30\n", None, (12, 48), 27])
+        start = time.perf_counter()
+        taskman.interface_tasktodo(screen, acc)
+        took = time.perf_counter() - start
+        print("\n".join(line_.rstrip() for line_ in screen.lines()))
+        print(f"scripted session in {took * 1000:.1f} ms, {screen.cells_written} cells written")
@@ -0,0 +1,395 @@
+import re
+import json
+import math
+import heapq
+import pathlib
+from array import array
+from bisect import bisect_left
+from operator import itemgetter
+from collections import Counter
+from typing import Any, Generator, Iterator
+from durable import Durability, write_file
+
+WORD = re.compile(r"\w+")
+# one word of a name weighs as much as this many words of a body
+NAME_WEIGHT = 3
+# bm25 term saturation and length normalisation
+K1 = 1.2
+B = 0.75
+# a word in more than this share of the items only ranks what rarer words found
+COMMON_SHARE = 0.25
+# keys or terms per line of a saved index, one line is parsed per load step
+LOAD_SLICE = 4096
+
+
+def tokenize(_text: str, /) -> list[str]:
+    return WORD.findall(_text.lower())
+
+
+class SearchIndex:
+    """
+    inverted index over item names and task bodies, hits ranked with bm25.
+    postings saved last time stay packed in one array, later changes go to
+    a small overlay and deleted items are only marked until the next save
+    """
+
+    def __init__(self, _path: pathlib.Path | None = None, /) -> None:
+        self.path = _path
+        self.seq = 0
+        self.account = None
+        # the rebuild a reset asked for, run a slice at a time by catch_up()
+        self.pending = None
+        self.clear()
+        self.dirty = False
+
+    def clear(self) -> None:
+        "forget every item, the path, account and seq stay"
+        # doc id -> (kind, name), None once the item is gone
+        self.keys = []
+        self.ids = {}
+        self.lengths = array("I")
+        self.total = 0
+        # term -> (start, count) in packed, ids first then their counts
+        self.base = {}
+        self.packed = array("I")
+        self.delta = {}
+        self.dirty = True
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, _kind: str, _name: str, _content: str = "", /) -> None:
+        "index an item, replacing whatever was indexed under its name"
+        terms = Counter(tokenize(_content))
+        for term_ in tokenize(_name):
+            terms[term_] += NAME_WEIGHT
+        self.remove(_kind, _name)
+        doc = len(self.keys)
+        self.keys.append((_kind, _name))
+        self.ids[(_kind, _name)] = doc
+        self.lengths.append(sum(terms.values()))
+        self.total += self.lengths[doc]
+        for term_, count_ in terms.items():
+            self.delta.setdefault(term_, {})[doc] = count_
+        self.dirty = True
+
+    def remove(self, _kind: str, _name: str, /) -> None:
+        doc = self.ids.pop((_kind, _name), None)
+        if doc is None:
+            return
+        self.keys[doc] = None
+        self.total -= self.lengths[doc]
+        self.dirty = True
+
+    def content_of(self, _kind: str, _name: str, /) -> str:
+        if _kind != "task" or self.account is None:
+            return ""
+        return self.account.get_task_content(_name) or ""
+
+    def postings(self, _term: str, /) -> tuple[Any, Any, dict[int, int]]:
+        "saved ids, their counts and the overlay of one term, dead ids included"
+        start, count = self.base.get(_term, (0, 0))
+        packed = memoryview(self.packed)
+        return (
+            packed[start : start + count],
+            packed[start + count : start + 2 * count],
+            self.delta.get(_term, {}),
+        )
+
+    def search(self, _query: str, /, limit: int = 100) -> list[tuple[str, str]]:
+        "(kind, name) of the best matches, best first"
+        # asked before the idle slices got to it, the rest of a rebuild runs now
+        for _ in self.catch_up():
+            pass
+        if not self.ids:
+            return []
+        count = len(self.ids)
+        avg_len = self.total / count
+        keys, lengths = self.keys, self.lengths
+        terms = []
+        for term_ in set(tokenize(_query)):
+            ids, hits, delta = self.postings(term_)
+            if len(ids) + len(delta) > 0:
+                terms.append((len(ids) + len(delta), ids, hits, delta))
+        terms.sort(key=lambda tm_: tm_[0])
+
+        # bm25 with the per document part folded into two constants
+        k_flat, k_len = K1 * (1 - B), K1 * B / avg_len
+        scores = {}
+        for df_, ids_, hits_, delta_ in terms:
+            idf = math.log(1 + (count - min(df_, count) + 0.5) / (df_ + 0.5))
+            scale = idf * (K1 + 1)
+            if scores and df_ > count * COMMON_SHARE:
+                # only look up the candidates, ids are stored in ascending order
+                for doc_ in scores:
+                    pos = bisect_left(ids_, doc_)
+                    if pos < len(ids_) and ids_[pos] == doc_:
+                        hit = hits_[pos]
+                    elif doc_ in delta_:
+                        hit = delta_[doc_]
+                    else:
+                        continue
+                    scores[doc_] += scale * hit / (hit + k_flat + k_len * lengths[doc_])
+                continue
+            for doc_, hit_ in (*zip(ids_, hits_), *delta_.items()):
+                if keys[doc_] is not None:
+                    scores[doc_] = scores.get(doc_, 0.0) + scale * hit_ / (
+                        hit_ + k_flat + k_len * lengths[doc_]
+                    )
+        best = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+        return [keys[doc_] for doc_, _ in best]
+
+    def apply(self, _record: dict[str, Any], /) -> None:
+        "follow one account record, the same records the journal keeps"
+        op, _, kind = _record["op"].partition("-")
+        match op:
+            case "reset":
+                # no body is read here, catch_up() builds it again in slices
+                self.pending = self.rebuild_slices()
+                return
+            case "add" | "edit":
+                self.add(kind, _record[f"{kind}-name"], _record.get("task-content", ""))
+            case "delete":
+                self.remove(kind, _record[f"{kind}-name"])
+            case "rename":
+                # the record has no body, the item already sits under its new name
+                new_name = _record["new-name"]
+                self.remove(kind, _record[f"{kind}-name"])
+                self.add(kind, new_name, self.content_of(kind, new_name))
+        if "seq" in _record:
+            self.seq = _record["seq"]
+
+    def attach(self, _account: Any, /) -> None:
+        self.account = _account
+        _account.subscribe(self.apply)
+
+    def detach(self) -> None:
+        if self.account is not None:
+            self.account.unsubscribe(self.apply)
+            self.account = None
+
+    def rebuild(self) -> None:
+        "index every item again, bodies come in through the account's lru"
+        for _ in self.rebuild_slices():
+            pass
+
+    def rebuild_slices(self, _size: int = 256, /) -> Iterator[None]:
+        "rebuild() a slice of items per step, changes in between come through apply"
+        account = self.account
+        self.clear()
+        for kind_, items_ in (("task", account.tasks), ("todo", account.todos)):
+            names = list(items_)
+            for start_ in range(0, len(names), _size):
+                for name_ in names[start_ : start_ + _size]:
+                    # gone or renamed since the list was taken, apply saw to it
+                    if name_ in items_:
+                        self.add(kind_, name_, self.content_of(kind_, name_))
+                yield
+        self.seq = account.seq
+
+    def catch_up(self) -> Iterator[None]:
+        "run the rebuild a reset asked for a slice per step, a newer reset starts over"
+        while self.pending is not None:
+            pending = self.pending
+            try:
+                next(pending)
+            except StopIteration:
+                if self.pending is pending:
+                    self.pending = None
+                continue
+            yield
+
+    def pack(self) -> None:
+        "fold the overlay into the packed postings, dropping ids of gone items"
+        old_keys = self.keys
+        renumber = None
+        # like the item index, dead ids are only squeezed out once they pile up
+        if len(old_keys) - len(self.ids) > max(64, len(self.ids) // 4):
+            renumber, self.keys = {}, []
+            lengths = array("I")
+            for doc_, key_ in enumerate(old_keys):
+                if key_ is not None:
+                    renumber[doc_] = len(self.keys)
+                    self.keys.append(key_)
+                    lengths.append(self.lengths[doc_])
+            self.lengths = lengths
+            self.ids = {key_: doc_ for doc_, key_ in enumerate(self.keys)}
+        base, packed = {}, array("I")
+        for term_ in self.base.keys() | self.delta.keys():
+            ids, hits, delta = self.postings(term_)
+            if renumber is None:
+                base[term_] = (len(packed), len(ids) + len(delta))
+                packed.extend(ids)
+                packed.extend(delta)
+                packed.extend(hits)
+                packed.extend(delta.values())
+                continue
+            alive = [
+                (renumber[doc_], hit_)
+                for doc_, hit_ in (*zip(ids, hits), *delta.items())
+                if old_keys[doc_] is not None
+            ]
+            if alive:
+                base[term_] = (len(packed), len(alive))
+                packed.extend(doc_ for doc_, _ in alive)
+                packed.extend(hit_ for _, hit_ in alive)
+        self.base, self.packed, self.delta = base, packed, {}
+
+    def save(self) -> None:
+        """
+        a header line, then the keys and the terms LOAD_SLICE to a line so
+        a load can be spread over idle moments, then the arrays as bytes
+        """
+        if not self.dirty or self.path is None or self.pending is not None:
+            # half rebuilt it matches nothing, the older file can still catch up
+            return
+        self.pack()
+        terms = list(self.base.items())
+        key_lines = [
+            json.dumps(self.keys[start_ : start_ + LOAD_SLICE])
+            for start_ in range(0, len(self.keys), LOAD_SLICE)
+        ]
+        term_lines = [
+            json.dumps(dict(terms[start_ : start_ + LOAD_SLICE]))
+            for start_ in range(0, len(terms), LOAD_SLICE)
+        ]
+        header = {
+            "version": 2,
+            "seq": self.seq,
+            "keys": len(key_lines),
+            "terms": len(term_lines),
+            "packed": len(self.packed),
+        }
+        text = "".join(line_ + "\n" for line_ in (json.dumps(header), *key_lines, *term_lines))
+        write_file(
+            self.path,
+            text.encode() + self.packed.tobytes() + self.lengths.tobytes(),
+            Durability.Atomic,
+        )
+        self.dirty = False
+
+    @classmethod
+    def load(cls, _path: pathlib.Path, /) -> "SearchIndex | None":
+        steps = cls.load_slices(_path)
+        while True:
+            try:
+                next(steps)
+            except StopIteration as _done:
+                return _done.value
+
+    @classmethod
+    def load_slices(cls, _path: pathlib.Path, /) -> Generator[None, None, "SearchIndex | None"]:
+        "load() a line of keys or terms per step, the index or None is returned at the end"
+        try:
+            raw = _path.read_bytes()
+        except FileNotFoundError:
+            return None
+        end = raw.find(b"\n")
+        try:
+            header = json.loads(raw[:end])
+            seq = header["seq"]
+            if header.get("version") == 1:
+                # everything on the header line, one step
+                key_lines, term_lines = [header["keys"]], [header["terms"]]
+            else:
+                key_lines, term_lines = [None] * header["keys"], [None] * header["terms"]
+        except (json.JSONDecodeError, AttributeError, KeyError):
+            return None
+        index = cls(_path)
+        index.seq = seq
+        for lines_, read_ in ((key_lines, index._read_keys), (term_lines, index._read_terms)):
+            for part_ in lines_:
+                if part_ is None:
+                    start, end = end + 1, raw.find(b"\n", end + 1)
+                    try:
+                        part_ = json.loads(raw[start:end])
+                    except json.JSONDecodeError:
+                        return None
+                read_(part_)
+                yield
+        split = end + 1 + header["packed"] * index.packed.itemsize
+        index.packed.frombytes(raw[end + 1 : split])
+        index.lengths.frombytes(raw[split:])
+        if len(index.lengths) != len(index.keys):
+            return None
+        index.total = sum(
+            index.lengths[doc_] for doc_, key_ in enumerate(index.keys) if key_
+        )
+        return index
+
+    def _read_keys(self, _keys: list, /) -> None:
+        for key_ in _keys:
+            key = tuple(key_) if key_ else None
+            if key is not None:
+                self.ids[key] = len(self.keys)
+            self.keys.append(key)
+
+    def _read_terms(self, _terms: dict[str, list[int]], /) -> None:
+        for term_, pos_ in _terms.items():
+            self.base[term_] = tuple(pos_)
+
+
+def open_index(_account: Any, /) -> SearchIndex:
+    "the saved index when it is current or can catch up, otherwise a fresh build"
+    for index_ in open_index_slices(_account):
+        pass
+    return index_
+
+
+def open_index_slices(_account: Any, /) -> Iterator[SearchIndex | None]:
+    "open_index() a step at a time, None between the steps and the index last"
+    path = _account.storage.index_of(_account.name)
+    index = yield from SearchIndex.load_slices(path)
+    if index is not None and index.seq != _account.seq:
+        # saved ones from the disk, then what is only in memory so far,
+        # so nothing waits for queued saves to land
+        changes = _account.storage.changes_since(_account.name, index.seq)
+        unwritten = _account.unwritten()
+        if changes is None or index.seq + len(changes) + len(unwritten) != _account.seq:
+            index = None
+        else:
+            index.account = _account
+            for rec_ in (*changes, *unwritten):
+                index.apply(rec_)
+    if index is None:
+        yield
+        index = SearchIndex(path)
+        index.account = _account
+        # attached first, so whatever changes while it builds is followed
+        index.attach(_account)
+        try:
+            yield from index.rebuild_slices()
+        except GeneratorExit:
+            # given up half way, it must not follow the account any longer
+            index.detach()
+            raise
+    else:
+        index.attach(_account)
+    yield index
+
+
+if __name__ == "__main__":
+    import time
+    import random
+    import tempfile
+
+    words = [f"w{idx_}" for idx_ in range(20_000)]
+    rnd = random.Random(0)
+    with tempfile.TemporaryDirectory() as _tmp:
+        index = SearchIndex(pathlib.Path(_tmp) / "bench.index")
+        start = time.perf_counter()
+        for idx_ in range(100_000):
+            index.add("task", f"task {idx_}", " ".join(rnd.choices(words, k=30)))
+        print(f"indexed {len(index)} items in {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        index.save()
+        print(f"saved in {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        index = SearchIndex.load(index.path)
+        print(f"loaded in {time.perf_counter() - start:.2f}s")
+        for query_ in ("w1", "w1 w42", "w1 w42 task", "task"):
+            start = time.perf_counter()
+            for _ in range(20):
+                found = index.search(query_)
+            took = (time.perf_counter() - start) / 20 * 1000
+            print(f"{query_!r:<15} {took:7.2f} ms, {len(found)} hits")
@@ -0,0 +1,890 @@
+import os
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from enum import Enum, auto
+from typing import Any
+from journal import Journal, read_records
+from itemindex import ItemIndex
+from item import Task, Todo, PREVIEW_LEN, make_preview
+from registry import Registry, make_entry, as_verifier, check_password, check_verifier
+from durable import Durability, FileLock, write_file
+
+
+class StorageMode(Enum):
+    Snapshot = auto()
+    Journal = auto()
+
+
+class Storage(ABC):
+    "where accounts are kept, Account and the account functions only use this"
+
+    durability = Durability.Atomic
+    # whether append() walks the items of _data, or only reads the records
+    append_reads_items = True
+
+    @abstractmethod
+    def exists(self, _name: str, /) -> bool:
+        ...
+
+    @abstractmethod
+    def load(self, _name: str, /) -> tuple[dict[str, Any], int] | None:
+        "return the indexed account data and its seq, None when missing"
+
+    def load_item(self, _name: str, _kind: str, _item: str, /) -> Task | Todo | None:
+        data = self.load(_name)
+        if data is None:
+            return None
+        return data[0]["acc-data"][_kind].get(_item)
+
+    @abstractmethod
+    def load_body(self, _name: str, _task: Task, /) -> str:
+        "fetch the content of a task that was loaded as a header only"
+
+    @abstractmethod
+    def create(self, _name: str, _data: dict[str, Any], _seq: int, /) -> int:
+        "write a whole account, return the bytes written"
+
+    @abstractmethod
+    def append(
+        self,
+        _name: str,
+        _changes: list[dict[str, Any]],
+        _data: dict[str, Any],
+        _seq: int,
+        /,
+    ) -> int:
+        "persist a change set, _data is the state with the changes applied"
+
+    @abstractmethod
+    def delete(self, _name: str, /) -> None:
+        ...
+
+    @abstractmethod
+    def names(self) -> tuple[str, ...]:
+        ...
+
+    def verify(self, _name: str, _password: str, /) -> bool:
+        loaded = self.load(_name)
+        return loaded is not None and check_password(loaded[0]["acc-pass"], _password)
+
+    def info(self, _name: str, /) -> dict[str, Any] | None:
+        "item counts of an account without handing out its items"
+        loaded = self.load(_name)
+        if loaded is None:
+            return None
+        return {
+            "tasks": len(loaded[0]["acc-data"]["task"]),
+            "todos": len(loaded[0]["acc-data"]["todo"]),
+        }
+
+    def rebuild_index(self) -> int:
+        "recover whatever index the backend keeps, return the account count"
+        return len(self.names())
+
+    @abstractmethod
+    def path_of(self, _name: str, /) -> pathlib.Path:
+        ...
+
+    def index_of(self, _name: str, /) -> pathlib.Path:
+        "where the search index of an account is kept, beside its data"
+        return self.path_of(_name).parent / f"acc_{_name}.index"
+
+    def changes_since(self, _name: str, _seq: int, /) -> list[dict[str, Any]] | None:
+        "records after seq in order, None when the backend no longer has them"
+        return None
+
+    def last_seq(self, _name: str, /) -> int:
+        "seq of the newest record saved, by any session"
+        loaded = self.load(_name)
+        return loaded[1] if loaded is not None else 0
+
+    def upgrade(self, _name: str, _data: dict[str, Any], /) -> None:
+        "an interactive session opened the account, older layouts may be rewritten"
+
+    def checkpoint(self, _name: str, _data: dict[str, Any], /) -> None:
+        "a session saved into the account and ended, bring any summary kept up to date"
+
+    def lock_of(self, _name: str, /) -> pathlib.Path:
+        return self.path_of(_name).with_name(f"acc_{_name}.lock")
+
+    def lock(self, _name: str, /) -> FileLock:
+        "held around a save, so sessions sharing an account take turns"
+        return FileLock(self.lock_of(_name))
+
+    def flush(self) -> None:
+        "wait for background work to land on disk"
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JsonStorage(Storage):
+    "acc_<name>.json snapshot of item headers, its journal and a bodies file"
+
+    # garbage a bodies file may collect before it gets rewritten
+    vacuum_slack = 1024 * 1024
+
+    def __init__(
+        self,
+        _db_path: pathlib.Path,
+        /,
+        mode: StorageMode = StorageMode.Journal,
+        journal_threshold: int = 256 * 1024,
+        durability: Durability = Durability.Atomic,
+    ) -> None:
+        self.db_path = _db_path
+        self.mode = mode
+        # journal size in bytes before it gets folded back into the snapshot
+        self.journal_threshold = journal_threshold
+        self._compactors = {}
+        # name -> (stats of its files, last seq), saves rewrite nothing shared
+        self._seqs = {}
+        # name -> (stats of its snapshot, task name -> body ref in it)
+        self._refs = {}
+        self.registry = Registry(_db_path / "registry.json", durability)
+        self.durability = durability
+
+    @property
+    def durability(self) -> Durability:
+        return self._durability
+
+    @durability.setter
+    def durability(self, _durability: Durability) -> None:
+        # the registry is written at the same level as the accounts
+        self._durability = _durability
+        self.registry.durability = _durability
+
+    @property
+    def append_reads_items(self) -> bool:
+        # a snapshot rewrite serialises every item, a journal only the records
+        return self.mode is StorageMode.Snapshot
+
+    def path_of(self, _name: str, /) -> pathlib.Path:
+        if _name.strip() == "":
+            raise ValueError("error: file name cannot be empty")
+        return self.db_path / f"acc_{_name}.json"
+
+    def journal_of(self, _name: str, /) -> Journal:
+        return Journal(self.path_of(_name).with_suffix(".journal"))
+
+    def bodies_of(self, _name: str, _gen: int, /) -> pathlib.Path:
+        return self.db_path / f"acc_{_name}.{_gen}.bodies"
+
+    def exists(self, _name: str, /) -> bool:
+        try:
+            return self.path_of(_name).stat().st_size > 0
+        except FileNotFoundError:
+            return False
+
+    def load(self, _name: str, /) -> tuple[dict[str, Any], int] | None:
+        # journals are read before the snapshot, a compaction finishing in
+        # between leaves a newer snapshot whose seq filters the stale records
+        records = list(self.journal_of(_name).replay())
+        try:
+            with self.path_of(_name).open() as _acf:
+                raw = _acf.read()
+        except FileNotFoundError:
+            return None
+        if raw == "":
+            return None
+        data = load_data(json.loads(raw))
+        seq = data.pop("acc-seq", 0)
+        for rec_ in records:
+            if rec_["seq"] > seq:
+                apply_record(data, rec_)
+                seq = rec_["seq"]
+        return data, seq
+
+    def upgrade(self, _name: str, _data: dict[str, Any], /) -> None:
+        if "acc-bodies" not in _data and self.mode is StorageMode.Journal:
+            # an older snapshot with inline contents, split it in the background
+            self.compact(_name, force=True)
+
+    def load_body(self, _name: str, _task: Task, /) -> str:
+        if _task.ref is True:
+            # saved through the journal only, read back by name
+            fresh = self.load_item(_name, "task", _task.name)
+            if fresh is None:
+                raise KeyError(_task.name)
+            if not fresh.loaded:
+                _task.ref = fresh.ref
+                return self.load_body(_name, fresh)
+            return fresh.content
+        gen, offset, length = _task.ref
+        try:
+            with self.bodies_of(_name, gen).open("rb") as _bf:
+                _bf.seek(offset)
+                return _bf.read(length).decode()
+        except FileNotFoundError:
+            # a later vacuum dropped that generation, ask the current snapshot
+            ref = self.ref_of(_name, _task.name)
+            if ref is not None and ref != _task.ref:
+                _task.ref = ref
+                return self.load_body(_name, _task)
+            fresh = self.load_item(_name, "task", _task.name)
+            if fresh is None:
+                raise
+            _task.ref = fresh.ref
+            return fresh.content if fresh.loaded else self.load_body(_name, fresh)
+
+    def ref_of(self, _name: str, _task_name: str, /) -> tuple[int, int, int] | None:
+        "where the current snapshot keeps a body, its refs are read once per snapshot"
+        path = self.path_of(_name)
+        stamp = file_stamps((path,))
+        cached = self._refs.get(_name)
+        if cached is None or cached[0] != stamp:
+            try:
+                with path.open() as _acf:
+                    tasks = json.load(_acf)["acc-data"]["task"]
+            except FileNotFoundError:
+                return None
+            refs = {
+                tsk_["task-name"]: tuple(tsk_["task-body"])
+                for tsk_ in tasks
+                if "task-body" in tsk_
+            }
+            cached = self._refs[_name] = (stamp, refs)
+        return cached[1].get(_task_name)
+
+    def create(self, _name: str, _data: dict[str, Any], _seq: int, /) -> int:
+        written = self.write_snapshot(_name, _data, _seq)
+        # everything up to _seq now lives in the snapshot
+        self.journal_of(_name).unlink()
+        self._registered()
+        self.registry.put(_name, self.entry_of(_name, _data, _seq))
+        return written
+
+    def write_snapshot(self, _name: str, _data: dict[str, Any], _seq: int, /) -> int:
+        "store new bodies, then atomically swap in the header snapshot"
+        tasks = list(_data["acc-data"]["task"].values())
+        gen = _data.get("acc-bodies", 0)
+        bodies = self.bodies_of(_name, gen)
+        # a ref of True is a body only the journal holds so far
+        stored = sum(tsk_.ref[2] for tsk_ in tasks if isinstance(tsk_.ref, tuple))
+        try:
+            vacuum = bodies.stat().st_size > 2 * stored + self.vacuum_slack
+        except FileNotFoundError:
+            vacuum = False
+        if vacuum:
+            gen += 1
+            bodies = self.bodies_of(_name, gen)
+        written = 0
+        with bodies.open("ab") as _bf:
+            for tsk_ in tasks:
+                if isinstance(tsk_.ref, tuple) and not vacuum:
+                    continue
+                if tsk_.loaded:
+                    body = tsk_.content.encode()
+                else:
+                    body = self.load_body(_name, tsk_).encode()
+                tsk_.ref = (gen, _bf.tell(), len(body))
+                _bf.write(body)
+                written += len(body)
+            if self.durability is Durability.Fsync and written:
+                # bodies must be on disk before a snapshot points at them
+                _bf.flush()
+                os.fsync(_bf.fileno())
+        _data["acc-bodies"] = gen
+        # a plain password from an older file is never written again
+        _data["acc-pass"] = as_verifier(_data["acc-pass"])
+        raw = json.dumps(dump_headers(_data, _seq))
+        write_file(self.path_of(_name), raw, self.durability)
+        if vacuum:
+            # keep the previous generation for sessions still holding its refs
+            self.bodies_of(_name, gen - 2).unlink(missing_ok=True)
+        return written + len(raw)
+
+    def entry_of(self, _name: str, _data: dict[str, Any], _seq: int, /) -> dict[str, Any]:
+        return make_entry(
+            self.path_of(_name),
+            as_verifier(_data["acc-pass"]),
+            len(_data["acc-data"]["task"]),
+            len(_data["acc-data"]["todo"]),
+        )
+
+    def append(
+        self,
+        _name: str,
+        _changes: list[dict[str, Any]],
+        _data: dict[str, Any],
+        _seq: int,
+        /,
+    ) -> int:
+        if self.mode is StorageMode.Snapshot:
+            written = self.write_snapshot(_name, _data, _seq)
+            # the snapshot holds them already, the journal only keeps them for
+            # changes_since() and is retired whole once it gets long
+            journal = self.journal_of(_name)
+            journal.append(_changes, Durability.Buffered)
+            if journal.size() > self.journal_threshold:
+                journal.retire(journal.path)
+        else:
+            journal = self.journal_of(_name)
+            written = journal.append(_changes, self.durability)
+            if journal.size() > self.journal_threshold:
+                self.compact(_name)
+        # the registry is shared by every account, only a login change goes
+        # there per save. counts wait for checkpoint() at the end of a session
+        if any(rec_["op"] == "set-pass" for rec_ in _changes):
+            self._registered()
+            self.registry.update(_name, verifier=as_verifier(_data["acc-pass"]))
+        return written
+
+    def checkpoint(self, _name: str, _data: dict[str, Any], /) -> None:
+        self._registered()
+        self.registry.update(
+            _name,
+            tasks=len(_data["acc-data"]["task"]),
+            todos=len(_data["acc-data"]["todo"]),
+            modified=time.time(),
+        )
+
+    def compact(self, _name: str, /, *, wait: bool = False, force: bool = False) -> None:
+        "fold the journal into a fresh snapshot on a background thread"
+        running = self._compactors.get(_name)
+        if running is not None and running.is_alive():
+            return
+        journal = self.journal_of(_name)
+        journal.rotate()
+        if not journal.old_path.exists() and not force:
+            return
+        self._compactors[_name] = threading.Thread(
+            target=self.fold_journal,
+            args=(_name, journal.old_path),
+            kwargs={"force": force},
+            name=f"compact-{_name}",
+        )
+        self._compactors[_name].start()
+        if wait:
+            self.wait_compaction(_name)
+
+    def wait_compaction(self, _name: str, /) -> None:
+        running = self._compactors.pop(_name, None)
+        if running is not None:
+            running.join()
+
+    def flush(self) -> None:
+        for name_ in list(self._compactors):
+            self.wait_compaction(name_)
+
+    def changes_since(self, _name: str, _seq: int, /) -> list[dict[str, Any]] | None:
+        # no waiting for a compaction, it holds the lock a saving caller may hold.
+        # one that deletes the old journal under the replay shows up as a gap
+        changes = [
+            rec_ for rec_ in self.journal_of(_name).history() if rec_["seq"] > _seq
+        ]
+        # a gap means the missing records were folded away twice already
+        if any(rec_["seq"] != _seq + 1 + idx_ for idx_, rec_ in enumerate(changes)):
+            return None
+        # so does no record at all when newer ones were saved
+        if not changes and self.last_seq(_name) > _seq:
+            return None
+        return changes
+
+    def last_seq(self, _name: str, /) -> int:
+        # every save grows the journal or swaps the snapshot, so until their
+        # stats change the seq read last time still holds
+        journal, snapshot = self.journal_of(_name), self.path_of(_name)
+        paths = (journal.path, journal.old_path, snapshot)
+        while True:
+            stamp = file_stamps(paths)
+            cached = self._seqs.get(_name)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            seq = journal.last_seq()
+            if seq is None or self.mode is StorageMode.Snapshot:
+                # a snapshot save lands before its records, the journal may lag
+                snap = snapshot_seq(snapshot)
+                seq = None if snap is None else max(seq or 0, snap)
+            if seq is None:
+                seq = super().last_seq(_name)
+            # a save landing while reading, look again
+            if file_stamps(paths) == stamp:
+                self._seqs[_name] = (stamp, seq)
+                return seq
+
+    def delete(self, _name: str, /) -> None:
+        self.wait_compaction(_name)
+        # a session saving or a compaction folding finishes first
+        with self.lock(_name):
+            self.path_of(_name).unlink(missing_ok=False)
+            self.journal_of(_name).unlink()
+            for bodies_ in self.db_path.glob(f"acc_{_name}.*.bodies"):
+                bodies_.unlink()
+            self.index_of(_name).unlink(missing_ok=True)
+            self._registered()
+            self.registry.remove(_name)
+        self._seqs.pop(_name, None)
+        self._refs.pop(_name, None)
+        # last, whoever waited on it finds the account gone
+        self.lock_of(_name).unlink(missing_ok=True)
+
+    def names(self) -> tuple[str, ...]:
+        self._registered()
+        return self.registry.names()
+
+    def verify(self, _name: str, _password: str, /) -> bool:
+        self._registered()
+        entry = self.registry.get(_name)
+        return entry is not None and check_verifier(entry["verifier"], _password)
+
+    def info(self, _name: str, /) -> dict[str, Any] | None:
+        self._registered()
+        return self.registry.get(_name)
+
+    def _registered(self) -> None:
+        # older account folders have no registry yet, build it once
+        if not self.registry.exists():
+            self.rebuild_index()
+
+    def rebuild_index(self) -> int:
+        "scan every account file, the recovery path when registry.json is lost"
+        entries = {}
+        for file_ in sorted(self.db_path.glob("acc_*.json")):
+            name_ = file_.stem.removeprefix("acc_")
+            loaded = self.load(name_)
+            if loaded is not None:
+                entries[name_] = self.entry_of(name_, *loaded)
+                entries[name_]["modified"] = file_.stat().st_mtime
+        self.registry.replace(entries)
+        return len(entries)
+
+    def fold_journal(
+        self, _name: str, _journal: pathlib.Path, /, force: bool = False
+    ) -> None:
+        "compaction worker, only reads the files so it never races the live account"
+        # another session may be folding or appending bodies at the same time
+        with self.lock(_name):
+            if not _journal.exists() and not force:
+                return
+            with self.path_of(_name).open() as _acf:
+                data = load_data(json.load(_acf))
+            seq = data.pop("acc-seq", 0)
+            for rec_ in read_records(_journal):
+                if rec_["seq"] > seq:
+                    apply_record(data, rec_)
+                    seq = rec_["seq"]
+            self.write_snapshot(_name, data, seq)
+            if _journal.exists():
+                self.journal_of(_name).retire(_journal)
+
+
+class SqliteStorage(Storage):
+    "every account in one sqlite database, items are rows keyed by name"
+
+    append_reads_items = False
+    # records kept per account for changes_since(), older ones are dropped
+    keep_changes = 4096
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS account (
+            name TEXT PRIMARY KEY,
+            password TEXT,
+            seq INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS item (
+            account TEXT NOT NULL REFERENCES account(name) ON DELETE CASCADE,
+            kind TEXT NOT NULL,
+            name TEXT NOT NULL,
+            pos INTEGER NOT NULL,
+            content TEXT,
+            finished INTEGER,
+            PRIMARY KEY (account, kind, name)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS item_order ON item (account, kind, pos);
+        CREATE TABLE IF NOT EXISTS change (
+            account TEXT NOT NULL REFERENCES account(name) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            record TEXT NOT NULL,
+            PRIMARY KEY (account, seq)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(
+        self, _db_file: pathlib.Path, /, durability: Durability = Durability.Atomic
+    ) -> None:
+        self.db_file = _db_file
+        # the connection is shared, the lock keeps it to one thread at a time
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            _db_file, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.schema)
+        self.durability = durability
+
+    @property
+    def durability(self) -> Durability:
+        return self._durability
+
+    @durability.setter
+    def durability(self, _durability: Durability) -> None:
+        # in wal mode NORMAL is already atomic, FULL also syncs every commit
+        synchronous = {
+            Durability.Buffered: "OFF",
+            Durability.Atomic: "NORMAL",
+            Durability.Fsync: "FULL",
+        }[_durability]
+        with self._lock:
+            self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._durability = _durability
+
+    def path_of(self, _name: str, /) -> pathlib.Path:
+        return self.db_file
+
+    def exists(self, _name: str, /) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM account WHERE name = ?", (_name,)
+            ).fetchone()
+        return row is not None
+
+    def load(self, _name: str, /) -> tuple[dict[str, Any], int] | None:
+        with self._lock:
+            acc = self._conn.execute(
+                "SELECT password, seq FROM account WHERE name = ?", (_name,)
+            ).fetchone()
+            if acc is None:
+                return None
+            # bodies stay in their rows, only a preview of each is read
+            tasks = self._conn.execute(
+                "SELECT name, substr(content, 1, ?) FROM item"
+                " WHERE account = ? AND kind = 'task' ORDER BY pos",
+                (PREVIEW_LEN, _name),
+            ).fetchall()
+            todos = self._conn.execute(
+                "SELECT name, finished FROM item"
+                " WHERE account = ? AND kind = 'todo' ORDER BY pos",
+                (_name,),
+            ).fetchall()
+        data = {
+            "acc-name": f"acc_{_name}",
+            "acc-pass": acc[0],
+            "acc-data": {
+                "task": ItemIndex(
+                    Task(row_[0], None, preview=make_preview(row_[1]), ref=True)
+                    for row_ in tasks
+                ),
+                "todo": ItemIndex(Todo(row_[0], bool(row_[1])) for row_ in todos),
+            },
+        }
+        return data, acc[1]
+
+    def load_item(self, _name: str, _kind: str, _item: str, /) -> Task | Todo | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, finished FROM item"
+                " WHERE account = ? AND kind = ? AND name = ?",
+                (_name, _kind, _item),
+            ).fetchone()
+        if row is None:
+            return None
+        return Task(_item, row[0]) if _kind == "task" else Todo(_item, bool(row[1]))
+
+    def load_body(self, _name: str, _task: Task, /) -> str:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM item"
+                " WHERE account = ? AND kind = 'task' AND name = ?",
+                (_name, _task.name),
+            ).fetchone()
+        if row is None:
+            raise KeyError(_task.name)
+        return row[0]
+
+    def create(self, _name: str, _data: dict[str, Any], _seq: int, /) -> int:
+        tasks = list(_data["acc-data"]["task"].values())
+        todos = list(_data["acc-data"]["todo"].values())
+        # replacing the account row drops its items, read lazy bodies first
+        bodies = [
+            tsk_.content if tsk_.loaded else self.load_body(_name, tsk_)
+            for tsk_ in tasks
+        ]
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO account (name, password, seq) VALUES (?, ?, ?)",
+                (_name, as_verifier(_data["acc-pass"]), _seq),
+            )
+            self._conn.executemany(
+                "INSERT INTO item (account, kind, name, pos, content)"
+                " VALUES (?, 'task', ?, ?, ?)",
+                (
+                    (_name, tsk_.name, pos_, body_)
+                    for pos_, (tsk_, body_) in enumerate(zip(tasks, bodies))
+                ),
+            )
+            self._conn.executemany(
+                "INSERT INTO item (account, kind, name, pos, finished)"
+                " VALUES (?, 'todo', ?, ?, ?)",
+                ((_name, tdo_.name, pos_, tdo_.finished) for pos_, tdo_ in enumerate(todos)),
+            )
+        return sum(len(tsk_.name) + len(body_) for tsk_, body_ in zip(tasks, bodies)) + sum(
+            len(tdo_.name) + 1 for tdo_ in todos
+        )
+
+    def append(
+        self,
+        _name: str,
+        _changes: list[dict[str, Any]],
+        _data: dict[str, Any],
+        _seq: int,
+        /,
+    ) -> int:
+        written = 0
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            for rec_ in _changes:
+                written += self._apply(_name, rec_)
+            self._conn.execute(
+                "UPDATE account SET seq = ? WHERE name = ?", (_seq, _name)
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO change (account, seq, record) VALUES (?, ?, ?)",
+                (
+                    (_name, rec_["seq"], json.dumps(rec_, separators=(",", ":")))
+                    for rec_ in _changes
+                ),
+            )
+            self._conn.execute(
+                "DELETE FROM change WHERE account = ? AND seq <= ?",
+                (_name, _seq - self.keep_changes),
+            )
+        return written
+
+    def _apply(self, _name: str, _record: dict[str, Any], /) -> int:
+        "translate one change record into a row level statement"
+        op, _, kind = _record["op"].partition("-")
+        item = _record.get(f"{kind}-name")
+        match _record["op"]:
+            case "set-pass":
+                self._conn.execute(
+                    "UPDATE account SET password = ? WHERE name = ?",
+                    (_record["acc-pass"], _name),
+                )
+            case "add-task" | "add-todo":
+                # a replaced item keeps its position, like ItemIndex.add
+                self._conn.execute(
+                    "INSERT INTO item (account, kind, name, pos, content, finished)"
+                    " VALUES (?, ?, ?, (SELECT COALESCE(MAX(pos), -1) + 1 FROM item"
+                    " WHERE account = ? AND kind = ?), ?, ?)"
+                    " ON CONFLICT (account, kind, name) DO UPDATE"
+                    " SET content = excluded.content, finished = excluded.finished",
+                    (
+                        _name,
+                        kind,
+                        item,
+                        _name,
+                        kind,
+                        _record.get("task-content"),
+                        _record.get("finished?"),
+                    ),
+                )
+            case "delete-task" | "delete-todo":
+                self._conn.execute(
+                    "DELETE FROM item WHERE account = ? AND kind = ? AND name = ?",
+                    (_name, kind, item),
+                )
+            case "rename-task" | "rename-todo":
+                self._conn.execute(
+                    "UPDATE item SET name = ? WHERE account = ? AND kind = ? AND name = ?",
+                    (_record["new-name"], _name, kind, item),
+                )
+            case "edit-task":
+                self._conn.execute(
+                    "UPDATE item SET content = ?"
+                    " WHERE account = ? AND kind = 'task' AND name = ?",
+                    (_record["task-content"], _name, item),
+                )
+            case "check-todo":
+                self._conn.execute(
+                    "UPDATE item SET finished = ?"
+                    " WHERE account = ? AND kind = 'todo' AND name = ?",
+                    (_record["finished?"], _name, item),
+                )
+            case _:
+                raise ValueError(f"error: unknown journal record {_record['op']!r}")
+        return len(json.dumps(_record, separators=(",", ":")))
+
+    def delete(self, _name: str, /) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            found = self._conn.execute(
+                "DELETE FROM account WHERE name = ?", (_name,)
+            ).rowcount
+        if found == 0:
+            raise FileNotFoundError(f"error: no account named {_name!r}")
+        self.index_of(_name).unlink(missing_ok=True)
+        self.lock_of(_name).unlink(missing_ok=True)
+
+    def names(self) -> tuple[str, ...]:
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM account ORDER BY name").fetchall()
+        return tuple(row_[0] for row_ in rows)
+
+    def verify(self, _name: str, _password: str, /) -> bool:
+        # the account table already is the registry, one indexed row
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT password FROM account WHERE name = ?", (_name,)
+            ).fetchone()
+        return row is not None and check_password(row[0], _password)
+
+    def changes_since(self, _name: str, _seq: int, /) -> list[dict[str, Any]] | None:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record FROM change WHERE account = ? AND seq > ? ORDER BY seq",
+                (_name, _seq),
+            ).fetchall()
+            last = self._conn.execute(
+                "SELECT seq FROM account WHERE name = ?", (_name,)
+            ).fetchone()
+        changes = [json.loads(row_[0]) for row_ in rows]
+        # the first ones were dropped already, or the account was created anew
+        if _seq + len(changes) != (last[0] if last is not None else 0):
+            return None
+        if changes and changes[0]["seq"] != _seq + 1:
+            return None
+        return changes
+
+    def last_seq(self, _name: str, /) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq FROM account WHERE name = ?", (_name,)
+            ).fetchone()
+        return row[0] if row is not None else 0
+
+    def info(self, _name: str, /) -> dict[str, Any] | None:
+        if not self.exists(_name):
+            return None
+        with self._lock:
+            counts = dict(
+                self._conn.execute(
+                    "SELECT kind, COUNT(*) FROM item WHERE account = ? GROUP BY kind",
+                    (_name,),
+                ).fetchall()
+            )
+        return {"tasks": counts.get("task", 0), "todos": counts.get("todo", 0)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_storage(
+    _kind: str,
+    _db_path: pathlib.Path,
+    /,
+    durability: Durability = Durability.Atomic,
+) -> Storage:
+    match _kind:
+        case "json":
+            return JsonStorage(_db_path, durability=durability)
+        case "json-snapshot":
+            return JsonStorage(_db_path, mode=StorageMode.Snapshot, durability=durability)
+        case "sqlite":
+            return SqliteStorage(_db_path / "accounts.sqlite3", durability=durability)
+        case _:
+            raise ValueError(f"error: unknown storage backend {_kind!r}")
+
+
+def file_stamps(_paths: tuple[pathlib.Path, ...], /) -> tuple:
+    "what changes when any of the files is written, replaced or removed"
+    stamps = []
+    for path_ in _paths:
+        try:
+            stat = path_.stat()
+        except FileNotFoundError:
+            stamps.append(None)
+            continue
+        stamps.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    return tuple(stamps)
+
+
+def snapshot_seq(_path: pathlib.Path, /, tail: int = 4096) -> int | None:
+    """
+    acc-seq of a header snapshot from its last bytes, dump_headers() puts it
+    at the end. 0 when there is no snapshot, None when it has to be loaded
+    """
+    try:
+        with _path.open("rb") as _sf:
+            _sf.seek(max(0, _sf.seek(0, os.SEEK_END) - tail))
+            raw = _sf.read()
+    except FileNotFoundError:
+        return 0
+    # a key, inside a string the quotes would be escaped
+    found = raw.rfind(b'"acc-seq": ')
+    if found < 0:
+        return None
+    digits = raw[found + len(b'"acc-seq": ') :].split(b",")[0].split(b"}")[0]
+    return int(digits) if digits.strip().isdigit() else None
+
+
+def load_data(_raw: dict[str, Any], /) -> dict[str, Any]:
+    "index the item lists of a json document by name"
+    _raw["acc-data"] = {
+        "task": ItemIndex(map(Task.from_json, _raw["acc-data"]["task"])),
+        "todo": ItemIndex(map(Todo.from_json, _raw["acc-data"]["todo"])),
+    }
+    return _raw
+
+
+def dump_headers(_data: dict[str, Any], _seq: int, /) -> dict[str, Any]:
+    return {
+        "acc-name": _data["acc-name"],
+        "acc-pass": _data["acc-pass"],
+        "acc-data": {
+            "task": [tsk_.to_header() for tsk_ in _data["acc-data"]["task"].values()],
+            "todo": [tdo_.to_json() for tdo_ in _data["acc-data"]["todo"].values()],
+        },
+        "acc-seq": _seq,
+        "acc-bodies": _data.get("acc-bodies", 0),
+    }
+
+
+def dump_data(_data: dict[str, Any], _seq: int, /) -> dict[str, Any]:
+    "the single document form, every task body has to be loaded"
+    return {
+        "acc-name": _data["acc-name"],
+        "acc-pass": _data["acc-pass"],
+        "acc-data": {
+            "task": [tsk_.to_json() for tsk_ in _data["acc-data"]["task"].values()],
+            "todo": [tdo_.to_json() for tdo_ in _data["acc-data"]["todo"].values()],
+        },
+        "acc-seq": _seq,
+    }
+
+
+def apply_record(_data: dict[str, Any], _record: dict[str, Any], /) -> None:
+    "replay one journal record on top of indexed account data"
+    if _record["op"] == "set-pass":
+        _data["acc-pass"] = _record["acc-pass"]
+        return
+    _, _, kind = _record["op"].partition("-")
+    items = _data["acc-data"].get(kind)
+    name = _record.get(f"{kind}-name")
+    match _record["op"]:
+        case "add-task":
+            items.add(Task(name, _record["task-content"]))
+        case "add-todo":
+            items.add(Todo(name, _record["finished?"]))
+        case "delete-task" | "delete-todo":
+            if name in items:
+                items.remove(name)
+        case "rename-task" | "rename-todo":
+            if name in items and _record["new-name"] not in items:
+                items.rename(name, _record["new-name"])
+        case "edit-task":
+            if (itm_ := items.get(name)) is not None:
+                itm_.content = _record["task-content"]
+                itm_.ref = None
+        case "check-todo":
+            if (itm_ := items.get(name)) is not None:
+                itm_.finished = _record["finished?"]
+        case _:
+            raise ValueError(f"error: unknown journal record {_record['op']!r}")
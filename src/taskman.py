@@ -1,40 +1,63 @@
 import string
-from typing import Any, NewType
+from typing import Any, Callable, Iterator, NewType
 from enum import Enum, auto
 import os
+import sys
 import time
 
 try:
     import curses
     from curses import wrapper
-    from curses.textpad import Textbox, rectangle
+    from curses.textpad import Textbox
 except ModuleNotFoundError as _:
     print("'curses' module not found")
     quit()
 
-from account import Account, create_account, get_account, delete_account, verify_account
-from maid import shortened_content, poslog, divide_list, convert_todo_check
+from account import (
+    Account,
+    create_account,
+    get_account,
+    delete_account,
+    list_account,
+    verify_account,
+)
+from item import Task, Todo
+from commander import commands, command_parser, run_commands
+from ringlog import poslog, dump_log, dump_on_signal
+from viewport import Viewport
+from layout import TITLE, Layout, layout_for
+from render import Renderer
+from screen import Screen, CursesScreen
+from gapbuffer import GapBuffer
+from itemview import ItemView, FoundView
+from searchindex import open_index_slices
+from completion import Completer
+from eventloop import EventLoop
+from metrics import metrics
+from profiling import snapshot_memory
+import config
 
 limit_char = 20
 debug = False
 esc_info = "'esc' to exit"
 enter_info = "'enter' to continue"
 warn_no_input = "no input get caught"
+unsaved_info = " unsaved "
+# sessions whose changes could not be saved, told once the terminal is back
+save_errors = []
 Warning_Color = None
-commands = [
-    "task",
-    "todo",
-    "check",
-    "uncheck",
-    "edit",
-    "logout",
-    "delete",
-    "exit",
-    "quit",
-]
-
-_stdscr = NewType("_stdscr", Any)
-# _stdscr = NewType("_stdscr", curses._CursesWindow)
+# one line message shown above the command box on the next redraw
+notice = None
+# every key is read through it, timers and idle work run in between
+events = EventLoop()
+# seconds between looks at what other sessions saved and what is still unsaved
+SYNC_EVERY = 0.25
+# spans the performance line shows, toggled with f2
+HUD_SPANS = ("parse", "command", "approve", "write", "draw")
+HUD_KEY = curses.KEY_F2
+
+# a curses window in the terminal, a VirtualScreen in memory
+_stdscr = NewType("_stdscr", Screen)
 
 
 class GetType(Enum):
@@ -47,19 +70,21 @@ def centerize(_size_width: int, _object_width: int) -> tuple[int, int]:
 
 
 def write_info(stdscr: _stdscr, _info: str, /) -> None:
-    stdscr.addstr(curses.LINES - 1, (curses.COLS - 1) - len(_info), _info)
+    lines, cols = stdscr.getmaxyx()
+    stdscr.addstr(lines - 1, (cols - 1) - len(_info), _info)
 
 
 def write_info_on_command_box(stdscr: _stdscr, _info: str, /) -> None:
-    stdscr.addstr(curses.LINES - 4, 1, _info)
+    stdscr.addstr(stdscr.getmaxyx()[0] - 4, 1, _info)
 
 
 def write_warning(stdscr: _stdscr, _warning: str, /) -> None:
+    lines, cols = stdscr.getmaxyx()
     stdscr.addstr(
-        curses.LINES - 4,
-        (curses.COLS - 1) - len(_warning),
+        lines - 4,
+        (cols - 1) - len(_warning),
         _warning,
-        curses.color_pair(Warning_Color),
+        stdscr.color_pair(Warning_Color),
     )
 
 
@@ -76,17 +101,17 @@ def curse_input(
     cpos = 0
 
     if type is GetType.Normal:
-        curses.echo()
+        stdscr.echo()
     if type is GetType.Password:
-        curses.noecho()
+        stdscr.noecho()
 
     while True:
         if type is GetType.Normal:
             stdscr.move(_fy, _fx + cpos)
         if type is GetType.Password:
             stdscr.move(_fy, _fx)
-            curses.curs_set(False)
-        ch = stdscr.getch()
+            stdscr.curs_set(False)
+        ch = events.getch(stdscr)
 
         if ch == curses.KEY_ENTER or ch == ord("\n"):
             break
@@ -113,8 +138,8 @@ def curse_input(
         if cpos >= _limit:
             cpos = _limit
 
-    curses.echo()
-    curses.curs_set(True)
+    stdscr.echo()
+    stdscr.curs_set(True)
     output = "".join(word).strip()
     if output == "":
         return None
@@ -127,14 +152,14 @@ def curse_yesno(stdscr: _stdscr, _fy: int, _fx: int, /) -> str | None:
     cpos = 0
     limit_ask = 1
 
-    curses.echo()
+    stdscr.echo()
 
     while True:
         stdscr.move(_fy, _fx + cpos)
-        ch = stdscr.getch()
+        ch = events.getch(stdscr)
 
         if ch == curses.KEY_ENTER or ch == ord("\n"):
-            curses.echo()
+            stdscr.echo()
             if word == "n":
                 return False
             if word == "y":
@@ -175,14 +200,14 @@ def curse_num(
     cpos = 0
     limit_ask = 1
 
-    curses.echo()
+    stdscr.echo()
 
     while True:
         stdscr.move(_fy, _fx + cpos)
-        ch = stdscr.getch()
+        ch = events.getch(stdscr)
 
         if ch == curses.KEY_ENTER or ch == ord("\n"):
-            curses.echo()
+            stdscr.echo()
             if any(num == n for n in num_required):
                 return int(chr(ch))
         if ch == curses.KEY_BACKSPACE or ch == ord("\b"):
@@ -218,21 +243,56 @@ def curse_gen_list(stdscr: _stdscr, _fx: int, _fy: int, _items: list[Any], /) ->
         stdscr.addstr(_fy + idx_, _fx, itm_)
 
 
-def curse_interactive(stdscr: _stdscr, limit: str = None) -> str:
-    curses.noecho()
-    curses.napms(50)
-    curses.curs_set(True)
+def curse_interactive(
+    stdscr: _stdscr,
+    limit: str = None,
+    on_key: Callable[[int], bool] = None,
+    complete: Callable[[str], str] = None,
+) -> str:
+    "on_key sees every key first, returning True swallows it, tab calls complete"
+    stdscr.noecho()
+    stdscr.napms(50)
+    stdscr.curs_set(True)
     stdscr.keypad(True)
-    rectangle(stdscr, curses.LINES - 3, 1, curses.LINES - 1, curses.COLS - 2)
-    stdscr.refresh()
-    win = curses.newwin(1, curses.COLS - 2, curses.LINES - 1, 1)
-    win.refresh()
-    box = Textbox(win, insert_mode=True)
+
+    def open_box(_typed: str) -> tuple[Any, Textbox]:
+        lines, cols = stdscr.getmaxyx()
+        stdscr.rectangle(lines - 3, 1, lines - 1, cols - 2)
+        stdscr.refresh()
+        win = stdscr.newwin(1, cols - 2, lines - 1, 1)
+        win.keypad(True)
+        win.addnstr(_typed, cols - 3)
+        win.refresh()
+        return win, Textbox(win, insert_mode=True)
+
+    win, box = open_box("")
     text = ""
 
     while True:
-        char = win.getch()
-
+        char = events.getch(win)
+
+        if char == curses.KEY_RESIZE:
+            # the box moves with the bottom of the screen, what was typed stays
+            typed = box.gather().rstrip()
+            if on_key is not None:
+                on_key(char)
+            win, box = open_box(typed)
+            continue
+        if on_key is not None and on_key(char):
+            win.refresh()
+            continue
+        if char == 9 and complete is not None:  # tab
+            # only the text left of the cursor is completed, the rest stays
+            cursor = win.getyx()[1]
+            typed = box.gather().rstrip("\n")
+            before, after = typed.ljust(cursor)[:cursor], typed[cursor:]
+            before = complete(before)
+            width = win.getmaxyx()[1]
+            win.erase()
+            win.addnstr(before + after, width - 1)
+            win.move(0, min(len(before), width - 2))
+            win.refresh()
+            continue
         if char == ord("\n"):  # enter
             text = box.gather()
             break
@@ -256,279 +316,153 @@ def curse_interactive(stdscr: _stdscr, limit: str = None) -> str:
 
 
 def curse_editable(stdscr: _stdscr, past_text: str = None) -> str | None:
-    curses.noecho()
+    "full screen editor, ctrl+q keeps the text, esc drops it"
+    stdscr.noecho()
     stdscr.keypad(True)
-    stdscr.clear()
-    stdscr.refresh()
-    # win = curses.newwin(
-    #     curses.LINES - ((curses.LINES // 2) - 10) - 4,
-    #     curses.COLS - 1,
-    #     (curses.LINES // 2) - 10,
-    #     1,
-    # )
-    hgh, wdh = stdscr.getmaxyx()
-    rectangle(stdscr, 3, 1, hgh - 10, wdh - 10)
-    win = curses.newwin(
-        curses.LINES - 8,
-        curses.COLS - 1,
-        4,
-        1,
-    )
-    win.scrollok(True)
-    win.idlok(True)
-
-    if past_text is not None:
-        win.addstr(past_text)
-
+    buffer = GapBuffer(past_text if past_text is not None else "")
+    # first visible line and column, the window follows the cursor
+    top = left = 0
+    win = frame = None
+    info = "'ctrl+q' save, 'esc' cancel"
+
+    def open_window() -> None:
+        nonlocal win, frame
+        hgh, wdh = stdscr.getmaxyx()
+        stdscr.erase()
+        stdscr.rectangle(3, 1, hgh - 3, wdh - 2)
+        stdscr.addnstr(hgh - 2, 2, info, wdh - 4)
+        stdscr.refresh()
+        win = stdscr.newwin(max(1, hgh - 7), max(1, wdh - 4), 4, 2)
+        win.keypad(True)
+        frame = Renderer(win)
+
+    def redraw() -> None:
+        nonlocal top, left
+        height, width = win.getmaxyx()
+        line, column = buffer.line, buffer.column
+        top = min(max(top, line - height + 1), line)
+        left = min(max(left, column - width + 2), column)
+        # only the visible slice of each visible line is read from the buffer
+        for row_ in range(min(height, buffer.lines - top)):
+            frame.put(row_, 0, buffer.line_text(top + row_, left, width - 1))
+        frame.flush((line - top, column - left))
+
+    open_window()
     text = None
-    box = Textbox(win, insert_mode=True)
-    per_text = []
-
-    if past_text is not None:
-        per_text.append([l_ for l_ in past_text.strip()])
-
-    per_lines = []
-    cur_pos = 0
-
     while True:
-        char = win.getch()
+        redraw()
+        # get_wch hands over whole characters, not the bytes of one
+        key = events.get_wch(win)
+        char = ord(key) if isinstance(key, str) else key
+        height = win.getmaxyx()[0]
 
         if char == 27:  # esc
             break
         elif char == 17:  # ctrl + q
-            per_text.append(per_lines)
-            text = "".join(["".join(lines_) for lines_ in per_text])
-            if text == "":
-                text = past_text
+            text = buffer.text()
             break
-        elif char == 8:  # backspace
-            if cur_pos > 0 and len(per_lines) > 0:
-                cur_pos -= 1
-                per_lines.pop()
-            if cur_pos == 0 and len(per_lines) == 0:
-                if len(per_text) != 0:
-                    per_lines = per_text.pop()
-                    cur_pos = len(per_lines) - 1
-            box.do_command(char)
-        elif char == ord("\n"):  # enter
-            per_lines.append("\n")
-            per_text.append(per_lines)
-            per_lines = []
-            box.do_command(char)
+        elif char == curses.KEY_RESIZE:
+            open_window()
+        elif char in (8, 127, curses.KEY_BACKSPACE):
+            buffer.backspace()
+        elif char == curses.KEY_DC:
+            buffer.delete()
+        elif char in (ord("\n"), curses.KEY_ENTER):
+            buffer.insert("\n")
+        elif char == curses.KEY_LEFT:
+            buffer.move(-1)
+        elif char == curses.KEY_RIGHT:
+            buffer.move(1)
+        elif char == curses.KEY_UP:
+            buffer.goto_line(buffer.line - 1, buffer.column)
+        elif char == curses.KEY_DOWN:
+            buffer.goto_line(buffer.line + 1, buffer.column)
+        elif char == curses.KEY_PPAGE:
+            buffer.goto_line(buffer.line - height, buffer.column)
+        elif char == curses.KEY_NPAGE:
+            buffer.goto_line(buffer.line + height, buffer.column)
+        elif char == curses.KEY_HOME:
+            buffer.goto_line(buffer.line, 0)
+        elif char == curses.KEY_END:
+            buffer.move_to(buffer.line_end(buffer.line))
         elif char == 3:
             continue
-        elif char == 1:
-            char2 = win.getch()
-
-            if char2 == 127 or char2 == 8:
-                per_lines = []
-                per_text = []
-                cur_pos = 0
-                win.clear()
-        else:
-            cur_pos += 1
-            per_lines.append(chr(char))
-            box.do_command(char)
-    curses.echo()
+        elif char == 1:  # ctrl + a, then backspace clears everything
+            char2 = events.getch(win)
+
+            if char2 in (8, 127, curses.KEY_BACKSPACE):
+                buffer.clear()
+                top = left = 0
+        elif isinstance(key, str) and key.isprintable():
+            buffer.insert(key)
+    stdscr.echo()
     stdscr.keypad(False)
-    win.scrollok(False)
-    win.idlok(False)
     return text
 
 
-def command_parser(_command: str, /, commands: list[str]) -> dict[str, Any] | None:
-    parser = {}
-    _command = _command.split()
-    command_name = None
-    if _command[0] not in commands:
-        return None
-    for com_ in _command:
-        if com_ not in parser:
-            if com_ in commands:
-                parser[com_] = []
-                command_name = com_
-            else:
-                if command_name is not None:
-                    parser[command_name].append(com_)
-    return parser if parser != {} else None
-
-
+@metrics.timed("command")
 def process_command(
-    stdscr: _stdscr, _commands: dict[str, str], _on_acc: Account, /
+    stdscr: _stdscr, _commands: dict[str, list[str]] | None, _on_acc: Account, /
 ) -> int | None:
-    acc_todo = [td_["todo-name"] for td_ in _on_acc.todo]
-    acc_task = [ts_["task-name"] for ts_ in _on_acc.task]
-    for com_, targ_ in _commands.items():
-        with _on_acc as _acc:
-            match com_:
-                case "exit" | "quit":
-                    return -1
-                case "logout":
-                    return None
-                case "check":
-                    if len(targ_) < 1:
-                        return 2
-                    for td_ in targ_:
-                        if td_ in acc_todo:
-                            _acc.check_todo(td_, True)
-                        if td_.replace("-", " ") in acc_todo:
-                            # poslog("has been checked")
-                            # poslog(_on_acc.todo)
-                            _acc.check_todo(td_.replace("-", " "), True)
-                            # poslog(_on_acc.todo)
-                case "uncheck":
-                    if len(targ_) < 1:
-                        return 2
-                    for td_ in targ_:
-                        if td_ in acc_todo:
-                            _acc.check_todo(td_.replace("-", " "), False)
-                        if td_.replace("-", " ") in acc_todo:
-                            _acc.check_todo(td_.replace("-", " "), False)
-                case "task":
-                    if len(targ_) < 1:
-                        return 2
-                    for ts_ in targ_:
-                        if ts_ in acc_task:
-                            _acc.add_task(ts_, "")
-                        if ts_.replace("-", " ") in acc_task:
-                            _acc.add_task(ts_.replace("-", " "), "")
-                case "todo":
-                    if len(targ_) < 1:
-                        return 2
-                    for td_ in targ_:
-                        if td_ in acc_task:
-                            _acc.add_todo(td_, False)
-                        if td_.replace("-", " ") in acc_task:
-                            _acc.add_todo(td_.replace("-", " "), False)
-                case "delete":
-                    if len(targ_) < 1:
-                        return 2
-                    for itm_ in targ_:
-                        if itm_ in acc_task:
-                            _acc.delete_task(itm_)
-                        if itm_.replace("-", " ") in acc_task:
-                            _acc.delete_task(itm_.replace("-", " "))
-                        if itm_ in acc_todo:
-                            _acc.delete_todo(itm_)
-                        if itm_.replace("-", " ") in acc_todo:
-                            _acc.delete_todo(itm_.replace("-", " "))
-                case "edit":
-                    if len(targ_) < 1:
-                        return 2
-                    subwin_height, subwin_width = stdscr.getmaxyx()
-                    subwin = curses.newwin(subwin_height, subwin_width, 0, 0)
-                    for tsk_ in targ_:
-                        if tsk_ in acc_task:
-                            # poslog("not space")
-                            subwin.touchwin()
-                            stdscr.clear()
-                            subwin.clear()
-                            new_content = curse_editable(
-                                stdscr, _acc.get_task_content(tsk_)
-                            )
-                            _acc.edit_task(tsk_, new_content)
-                        if tsk_.replace("-", " ") in acc_task:
-                            # poslog("spacing")
-                            # poslog(tsk_)
-                            subwin.touchwin()
-                            stdscr.clear()
-                            subwin.clear()
-                            new_content = curse_editable(
-                                stdscr,
-                                _acc.get_task_content(tsk_.replace("-", " ")),
-                            )
-                            _acc.edit_task(tsk_.replace("-", " "), new_content)
-                    del subwin
-                case _:
-                    return -2
-    return 1
-    # TODO: just implement the rest of the command
-
+    def edit(_name: str, _content: str) -> str | None:
+        stdscr.clear()
+        # the editor owns the screen, nothing else draws until it is done
+        with events.hold():
+            return curse_editable(stdscr, _content)
 
-def interface_dict_item(
-    stdscr: _stdscr, desc: str, items: list[dict[str, str]] = None
-) -> None:
-    title = "Task/ToDo Terminal"
-    column_spacing = 4
-    max_len_title = 10
-    left_margin = 4
-    coll_desc = []
-    right_margin = curses.COLS - left_margin
-    desc_left_margin = len(title) + left_margin + 5
-    desc_field_len = right_margin - desc_left_margin
-    copy_desc = desc[::]
-    title_lines = 2
-    # screen_lim = 10 # this variable is unused
-    items_in_screen_lim = 2
-    desc_len_limit = 3
-    last_lines = title_lines + desc_len_limit
-
-    if len(desc) > desc_field_len:
-        stt = 0
-        for idx_ in range(len(copy_desc)):
-            if idx_ % desc_field_len == 0:
-                coll_desc.append(desc[stt:idx_])
-                stt = idx_
-            elif idx_ == len(copy_desc) - 1:
-                coll_desc.append(desc[stt : idx_ + 1])
-    else:
-        coll_desc.append(desc)
-    del copy_desc
+    def report(_message: str) -> None:
+        global notice
+        notice = _message
 
-    coll_desc = [dsc_ for dsc_ in coll_desc if not dsc_.isspace()]
-    coll_desc = [dsc_ for dsc_ in coll_desc if dsc_ != ""]
+    return run_commands(_commands, _on_acc, edit=edit, report=report)
 
-    if len(coll_desc) > desc_len_limit:
-        raise ValueError("description is too long")
 
-    stdscr.clear()
-    stdscr.scrollok(True)
-    stdscr.idlok(True)
-    curses.echo()
+def draw_item_rows(
+    frame: Renderer, items: ItemView, view: Viewport, layout: Layout, /
+) -> None:
+    "draw only what the viewport shows, cost follows the screen not the list"
+    metrics.count("rows drawn", len(view.visible()))
+    for idx_ in view.visible():
+        row, column = view.place(idx_)
+        frame.put(
+            layout.list_y + row,
+            layout.column_x[column],
+            items[idx_].text(layout.title_len, layout.content_len),
+        )
+    # position in the list, just under the last row, when the screen has room
+    position = f" {view} "
+    if view.lines > view.rows and layout.position_y < layout.status_y:
+        frame.put(layout.position_y, layout.cols - len(position) - 2, position)
+
+
+@metrics.timed("draw")
+def interface_dict_item(
+    stdscr: _stdscr,
+    desc: str,
+    items: ItemView = None,
+    view: Viewport = None,
+    frame: Renderer = None,
+) -> None:
+    "anything already put on the frame is drawn along, unchanged lines are skipped"
+    layout = layout_for(*stdscr.getmaxyx())
 
-    stdscr.addstr(title_lines, left_margin, title)
+    if frame is None:
+        frame = Renderer(stdscr)
+        frame.invalidate()
 
-    # this is broken when you want to poslog more than one sentence the first sentence will poslog
-    # ~ on 3rd line instead beside the title 2nd (fixed)
-    for idx_, dp_ in enumerate(coll_desc):
-        stdscr.addstr(title_lines + idx_, desc_left_margin, dp_)
-    # divided into `n` parts
+    frame.put(layout.title_y, layout.left_margin, TITLE)
+    # a narrow screen cuts the description instead of refusing to draw
+    for idx_, dp_ in enumerate(layout.wrap_desc(desc)[: layout.desc_lines]):
+        frame.put(layout.title_y + idx_, layout.desc_x, dp_)
     if items is not None:
-        items = divide_list(items, items_in_screen_lim)
-        for idx_, itm_ in enumerate(items):
-            for idx__, itm__ in enumerate(itm_):
-                if idx_ % items_in_screen_lim == 0:
-                    shortened_title = shortened_content(itm__["title"], max_len_title)
-                    spaces = " " * (max_len_title - len(shortened_title) + 1)
-                    max_len_content = (
-                        (curses.COLS // 2 - column_spacing)
-                        - (left_margin + max_len_title + 3)
-                        - 2
-                    )
-                    stdscr.addstr(
-                        last_lines + idx__,
-                        left_margin,
-                        f"{shortened_title}{spaces}: {shortened_content(itm__['content'], max_len_content)}",
-                    )
-                else:
-                    shortened_title = shortened_content(itm__["title"], max_len_title)
-                    spaces = " " * (max_len_title - len(shortened_title) + 1)
-                    max_len_content = (
-                        (curses.COLS // 2 - column_spacing)
-                        - (left_margin + max_len_title + 3)
-                        - 2
-                    )
-                    stdscr.addstr(
-                        last_lines + idx__,
-                        (curses.COLS // 2) - column_spacing,
-                        f"{shortened_title}{spaces}: {shortened_content(itm__['content'], max_len_content)}",
-                    )
+        if view is None:
+            view = Viewport()
+        view.resize(layout.rows, layout.columns, len(items))
+        draw_item_rows(frame, items, view, layout)
     else:
-        stdscr.addstr(last_lines, left_margin, "...")
+        frame.put(layout.list_y, layout.left_margin, "...")
 
-    stdscr.idlok(False)
-    stdscr.scrollok(False)
-    stdscr.refresh()
+    metrics.count("lines written", frame.flush())
 
 
 def interface_greet(stdscr: _stdscr, /) -> int:
@@ -537,7 +471,7 @@ def interface_greet(stdscr: _stdscr, /) -> int:
         "1. Log In",
         "2. Register",
     ]
-    title_x_pos = centerize(curses.COLS, len(title))
+    title_x_pos = centerize(stdscr.getmaxyx()[1], len(title))
     textbx_input = None
 
     # stdscr.clear()
@@ -547,25 +481,27 @@ def interface_greet(stdscr: _stdscr, /) -> int:
     write_info_on_command_box(stdscr, f"{esc_info}, {enter_info}")
     textbx_input = curse_interactive(stdscr, limit="123")
     stdscr.refresh()
-    curses.echo()
+    stdscr.echo()
     if textbx_input == "":
         return None
     return int(textbx_input)
 
 
-def interface_login(stdscr: _stdscr, /) -> Account | None:
+def interface_login(stdscr: _stdscr, /) -> dict[str, str] | None:
+    "the name and password typed in, for verify_account(), None on esc"
     menu = {
         "title": "Task/ToDo Terminal",
         "cre_name": "username : ",
         "cre_pass": "password : ",
     }
     usr_name = usr_pass = ""
-    user_name_pos = 4, centerize(curses.COLS, len(menu["cre_name"]) + limit_char)
-    user_pass_pos = 5, centerize(curses.COLS, len(menu["cre_pass"]) + limit_char)
+    cols = stdscr.getmaxyx()[1]
+    user_name_pos = 4, centerize(cols, len(menu["cre_name"]) + limit_char)
+    user_pass_pos = 5, centerize(cols, len(menu["cre_pass"]) + limit_char)
 
     stdscr.clear()
-    curses.echo()
-    stdscr.addstr(2, centerize(curses.COLS, len(menu["title"])), menu["title"])
+    stdscr.echo()
+    stdscr.addstr(2, centerize(cols, len(menu["title"])), menu["title"])
     stdscr.addstr(*user_name_pos, menu["cre_name"])
     stdscr.addstr(*user_pass_pos, menu["cre_pass"])
     write_info(stdscr, "press 'esc' to quit")
@@ -588,11 +524,7 @@ def interface_login(stdscr: _stdscr, /) -> Account | None:
     )
     if usr_pass is None:
         return None
-
-    result = Account(usr_name, usr_pass)
-    if not result.is_exist():
-        return None
-    return result
+    return {"_username": usr_name, "_password": usr_pass}
 
 
 def interface_yesno(stdscr: _stdscr, _question: str, _detail: str = None, /) -> bool:
@@ -602,16 +534,17 @@ def interface_yesno(stdscr: _stdscr, _question: str, _detail: str = None, /) ->
     }
     _detail = _detail if _detail is not None else ""
     question_line = 4
+    cols = stdscr.getmaxyx()[1]
 
     stdscr.clear()
-    curses.echo()
-    stdscr.addstr(2, centerize(curses.COLS, len(menu["title"])), menu["title"])
+    stdscr.echo()
+    stdscr.addstr(2, centerize(cols, len(menu["title"])), menu["title"])
     if _detail is not None:
         question_line = 5
-        stdscr.addstr(4, centerize(curses.COLS, len(_detail)), _detail)
+        stdscr.addstr(4, centerize(cols, len(_detail)), _detail)
     stdscr.addstr(
         question_line,
-        centerize(curses.COLS, len(menu["question"]) + (limit_char // 2)),
+        centerize(cols, len(menu["question"]) + (limit_char // 2)),
         menu["question"],
     )  # I still don't know what is this mean I forgor
     write_info(stdscr, "press 'esc' to quit")
@@ -620,7 +553,7 @@ def interface_yesno(stdscr: _stdscr, _question: str, _detail: str = None, /) ->
     yesno = curse_yesno(
         stdscr,
         question_line,
-        centerize(curses.COLS, len(menu["question"]) + (limit_char // 2))
+        centerize(cols, len(menu["question"]) + (limit_char // 2))
         + len(menu["question"]),
     )
 
@@ -636,15 +569,16 @@ def interface_register(stdscr: _stdscr, /, debug: bool = False) -> Account | Non
     }
 
     usr_name = usr_pass = ""
-    user_name_pos = 6, centerize(curses.COLS, len(menu["cre_name"]) + limit_char)
-    user_pass_pos = 7, centerize(curses.COLS, len(menu["cre_pass"]) + limit_char)
+    cols = stdscr.getmaxyx()[1]
+    user_name_pos = 6, centerize(cols, len(menu["cre_name"]) + limit_char)
+    user_pass_pos = 7, centerize(cols, len(menu["cre_pass"]) + limit_char)
     result = None
 
     stdscr.clear()
-    curses.echo()
-    stdscr.addstr(2, centerize(curses.COLS, len(menu["title"])), menu["title"])
+    stdscr.echo()
+    stdscr.addstr(2, centerize(cols, len(menu["title"])), menu["title"])
     stdscr.addstr(
-        3, centerize(curses.COLS, len(menu["desc"])), menu["desc"], curses.A_UNDERLINE
+        3, centerize(cols, len(menu["desc"])), menu["desc"], curses.A_UNDERLINE
     )
     stdscr.addstr(*user_name_pos, menu["cre_name"])
     stdscr.addstr(*user_pass_pos, menu["cre_pass"])
@@ -676,93 +610,238 @@ def interface_register(stdscr: _stdscr, /, debug: bool = False) -> Account | Non
 
 
 def interface_tasktodo(stdscr: _stdscr, _account: Account, /) -> None:
-    commands = [
-        "task",
-        "todo",
-        "check",
-        "uncheck",
-        "edit",
-        "logout",
-        "delete",
-        "exit",
-        "quit",
-    ]
+    global notice
     command = None
-    acc_itms = []
-    acc_task = []
-    acc_todo = []
-
-    def recalc_itm():
-        nonlocal acc_itms, acc_task, acc_todo
-        acc_itms = []
-        acc_task = [
-            {
-                "title" if nn == "task-name" else "content": nnn
-                for nn, nnn in tsk.items()
-            }
-            for tsk in _account.task
-        ]
-        acc_todo = [
-            {
-                "title"
-                if nn == "todo-name"
-                else "content": nnn
-                if not isinstance(nnn, bool)
-                else convert_todo_check(nnn)
-                for nn, nnn in tdo.items()
-            }
-            for tdo in _account.todo
-        ]
-        acc_itms.extend(acc_task)
-        acc_itms.extend(acc_todo)
-
-    desc = f"| Task: {len(_account.task)} - Todo: {len(_account.todo)}"
+    acc_itms = ItemView(_account)
+    # the search index opens in idle slices, found holds the results of a find
+    search = None
+    catching = None
+    found = None
+    completer = Completer(_account, [*commands, "goto"])
+    view = Viewport()
+    frame = Renderer(stdscr)
+    # what the status line shows until the next command
+    status = {
+        "notice": None,
+        "warning": None,
+        "unsaved": False,
+        "save_error": None,
+        "hud": None,
+    }
+    warning = None
+    scroll_keys = {
+        curses.KEY_UP: lambda: view.scroll(-1),
+        curses.KEY_DOWN: lambda: view.scroll(1),
+        curses.KEY_PPAGE: lambda: view.scroll_page(-1),
+        curses.KEY_NPAGE: lambda: view.scroll_page(1),
+        curses.KEY_HOME: view.home,
+        curses.KEY_END: view.end,
+    }
 
-    while True:
-        recalc_itm()
-        stdscr.clear()
-        stdscr.refresh()
-        if 0 < len(acc_itms):
-            interface_dict_item(stdscr, desc, acc_itms)
+    def on_key(_char: int) -> bool:
+        if _char == curses.KEY_RESIZE:
+            # reflow from the rows already in memory, the account is not read
+            frame.invalidate()
+            redraw()
+            return True
+        if _char == HUD_KEY:
+            status["hud"] = None if status["hud"] is not None else -1
+            redraw()
+            return True
+        if _char not in scroll_keys or len(shown()) == 0:
+            return False
+        top = view.top
+        scroll_keys[_char]()
+        if view.top != top:
+            redraw()
+        return True
+
+    def shown() -> ItemView | FoundView:
+        return found if found is not None else acc_itms
+
+    def redraw() -> None:
+        layout = layout_for(*stdscr.getmaxyx())
+        right = layout.cols - 1
+        if status["hud"] is not None:
+            frame.put(0, 1, metrics.hud(HUD_SPANS)[: layout.cols - 2], curses.A_DIM)
+        status["unsaved"] = _account.unflushed
+        status["save_error"] = _account.save_error
+        if status["save_error"] is not None:
+            # the autosave thread keeps retrying, the records stay queued
+            failed = f" not saved : {status['save_error']} "[: layout.cols // 2]
+            right -= len(failed)
+            frame.put(layout.status_y, right, failed, stdscr.color_pair(Warning_Color))
+        elif status["unsaved"]:
+            # the autosave thread has not landed every change yet
+            right -= len(unsaved_info)
+            frame.put(layout.status_y, right, unsaved_info, curses.A_REVERSE)
+        if status["notice"] is not None:
+            frame.put(layout.status_y, 1, status["notice"])
+        if status["warning"] is not None:
+            frame.put(
+                layout.status_y,
+                right - len(status["warning"]),
+                status["warning"],
+                stdscr.color_pair(Warning_Color),
+            )
+        interface_dict_item(stdscr, shown().desc, shown() or None, view, frame)
+        if status["hud"] is not None:
+            # what drawing this recorded itself is no reason to draw again
+            status["hud"] = metrics.version
+
+    def goto(_targets: list[str]) -> bool:
+        "jump to an item by name or by its position in the list"
+        if len(_targets) < 1:
+            return False
+        target = " ".join(_targets)
+        if target.isdigit():
+            view.jump(int(target) - 1)
+            return True
+        for name_ in (target, target.replace("-", " ")):
+            if (idx := shown().index(name_)) is not None:
+                view.jump(idx)
+                return True
+        return False
+
+    def complete(_before: str) -> str:
+        completed, choices = completer.complete(_before)
+        if len(choices) > 1:
+            # the ambiguous choices go up on the status line
+            status["notice"] = "  ".join(choices)
+            status["warning"] = None
+            redraw()
+        return completed
+
+    def find(_query: str) -> None:
+        "show only the items matching the query, best first, or all again"
+        nonlocal found
+        if _query.strip() == "":
+            found = None
         else:
-            interface_dict_item(stdscr, desc, None)
-
-        stdscr.refresh()
-        command = curse_interactive(stdscr)
-        stdscr.refresh()
-        # poslog(f"commands : '{command}'")
-        if command == -1:
-            return -1
-        if command != "":
-            command = command_parser(command, commands)
-            # poslog(command)
-            result = process_command(stdscr, command, _account)
-
-            if result == -2:
-                write_warning(stdscr, warn_no_input)
-                continue
-            elif result == -1:
+            # a find before the idle slices are done finishes them now
+            for _ in opening:
+                pass
+            found = FoundView(acc_itms, _query, search.search(_query))
+        view.home()
+
+    def open_search() -> Iterator[None]:
+        nonlocal search
+        # the index catches up from the disk and the unwritten records,
+        # nothing waits for the autosave thread
+        steps = open_index_slices(_account)
+        try:
+            for index_ in steps:
+                if index_ is None:
+                    yield
+                else:
+                    search = index_
+        finally:
+            steps.close()
+        catch_up_later()
+
+    def catch_up_later() -> None:
+        "a reset left the index to build again, the idle slices do that too"
+        nonlocal catching
+        if search is None or search.pending is None or catching is not None:
+            return
+
+        def steps() -> Iterator[None]:
+            nonlocal catching
+            try:
+                yield from search.catch_up()
+            finally:
+                catching = None
+
+        catching = steps()
+        events.idle(catching)
+
+    def sync() -> None:
+        "merge what other sessions saved, the marker goes once autosave caught up"
+        nonlocal found
+        merged = _account.poll()
+        catch_up_later()
+        if merged and found is not None:
+            found = FoundView(acc_itms, found.query, search.search(found.query))
+        hud_stale = status["hud"] not in (None, metrics.version)
+        if (
+            merged
+            or hud_stale
+            or status["unsaved"] != _account.unflushed
+            or status["save_error"] is not _account.save_error
+        ):
+            redraw()
+
+    opening = open_search()
+    events.idle(opening)
+    synced = events.call_every(SYNC_EVERY, sync)
+
+    # the screen before this one is still up, start from blank once
+    frame.invalidate()
+    try:
+        while True:
+            status["notice"], status["warning"] = notice, warning
+            notice = warning = None
+            redraw()
+
+            command = curse_interactive(stdscr, on_key=on_key, complete=complete)
+            stdscr.refresh()
+            # poslog(f"commands : '{command}'")
+            if command == -1:
                 return -1
-            elif result == 1:
+            if command.split()[:1] == ["goto"]:
+                if not goto(command.split()[1:]):
+                    notice = "no such item"
                 continue
-            elif result == 2:
-                write_warning(stdscr, "no target applied at command")
+            if command.split()[:1] == ["find"]:
+                find(command.strip()[len("find") :])
                 continue
-            elif result is None:
-                return None
-        else:
-            write_warning(stdscr, warn_no_input)
-            continue
+            if command != "":
+                command = command_parser(command, commands)
+                # poslog(command)
+                result = process_command(stdscr, command, _account)
+                catch_up_later()
+                if found is not None:
+                    # the index followed the command, ask it again
+                    found = FoundView(acc_itms, found.query, search.search(found.query))
+                if command is not None and "edit" in command:
+                    # the editor took over the whole screen
+                    frame.invalidate()
+
+                if result == -2:
+                    warning = warn_no_input
+                    continue
+                elif result == -1:
+                    return -1
+                elif result == 1:
+                    continue
+                elif result == 2:
+                    warning = "no target applied at command"
+                    continue
+                elif result is None:
+                    return None
+            else:
+                warning = warn_no_input
+                continue
+    finally:
+        # the account outlives this screen, stop patching rows for it
+        acc_itms.close()
+        completer.close()
+        synced.cancel()
+        opening.close()
+        if catching is not None:
+            catching.close()
+        if search is not None:
+            search.detach()
+            search.save()
     # poslog(command)
 
 
 def motherterminal(stdscr: _stdscr, /) -> None:
     global Warning_Color
-    curses.start_color()
-    curses.use_default_colors()
+    stdscr.start_color()
 
-    curses.init_pair(1, curses.COLOR_YELLOW, curses.COLOR_BLACK)
-    Warning_Color = curses.color_pair(1)
+    stdscr.init_pair(1, curses.COLOR_YELLOW, curses.COLOR_BLACK)
+    Warning_Color = stdscr.color_pair(1)
 
     terminal_run = True
     _usr = False
@@ -771,30 +850,31 @@ def motherterminal(stdscr: _stdscr, /) -> None:
 
     while terminal_run:
         stdscr.clear()
-        curses.curs_set(False)
+        stdscr.curs_set(False)
         stdscr.refresh()
         chooser = interface_greet(stdscr)
 
-        curses.curs_set(True)
+        stdscr.curs_set(True)
         match chooser:
             case 1:
                 cred = interface_login(stdscr)
                 if cred is None:
                     return None
-                if isinstance(cred, Account):
-                    if chooser == 1 and not verify_account(cred):
-                        _usr = interface_yesno(
-                            stdscr, "create new account ?", "you have no account"
-                        )
-                        if _usr:
-                            chooser = 2
+                # the typed password is checked against the stored verifier
+                if verify_account(**cred):
+                    cred = get_account(cred["_username"])
+                elif cred["_username"] in list_account():
+                    if not interface_yesno(stdscr, "try again ?", "wrong password"):
+                        return None
+                    continue
                 else:
-                    if chooser == 1 and not verify_account(**cred):
-                        _usr = interface_yesno(
-                            stdscr, "create new account ?", "you have no account"
-                        )
-                        if _usr:
-                            chooser = 2
+                    if not interface_yesno(
+                        stdscr, "create new account ?", "you have no account"
+                    ):
+                        continue
+                    cred = interface_register(stdscr, debug=debug)
+                    if cred is None:
+                        return None
             case 2:
                 cred = interface_register(stdscr, debug=debug)
                 if cred is None:
@@ -819,7 +899,18 @@ def motherterminal(stdscr: _stdscr, /) -> None:
                 stdscr.clear()
                 write_warning(stdscr, warn_no_input)
                 continue
-        edit_inter_command = interface_tasktodo(stdscr, cred)
+        cred.upgrade()
+        # saves go to a writer thread while the account is open, landed on the way out
+        cred.start_autosave(config.autosave)
+        try:
+            edit_inter_command = interface_tasktodo(stdscr, cred)
+        finally:
+            # a failed save must not take the terminal down with it
+            if (error := cred.stop_autosave()) is not None:
+                save_errors.append(f"error: changes of {cred.name} not saved : {error}")
+            cred.close()
+        # what the open account holds, when the session traces allocations
+        snapshot_memory(cred.name)
         if edit_inter_command == -1:
             terminal_run = False
         elif edit_inter_command is None:
@@ -829,8 +920,22 @@ def motherterminal(stdscr: _stdscr, /) -> None:
 def run() -> None:
     os.system("cls")
     time.sleep(1)
-    wrapper(motherterminal)
+    start()
+
+
+def start() -> None:
+    "the curses ui, the log ring goes to the log file once the screen is closed"
+    dump_on_signal()
+    try:
+        wrapper(lambda _win: motherterminal(CursesScreen(_win)))
+    finally:
+        for error_ in save_errors:
+            print(error_, file=sys.stderr)
+        if config.log_file:
+            dump_log()
+        if config.metrics_file:
+            metrics.export(config.metrics_file)
 
 
 if __name__ == "__main__":
-    wrapper(motherterminal)
+    start()
@@ -0,0 +1,152 @@
+import csv
+import json
+import time
+import pathlib
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+from account import Account
+from item import Task, Todo
+
+# items added per commit while importing
+BATCH_SIZE = 5000
+CSV_FIELDS = ["item-type", "name", "content", "finished?"]
+
+
+class TransferStats:
+    "how many items moved and how fast, and how many were left alone"
+
+    __slots__ = ("count", "skipped", "seconds")
+
+    def __init__(self) -> None:
+        self.count = 0
+        # imported names the account already had, those keep their content
+        self.skipped = 0
+        self.seconds = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.count / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        text = f"{self.count} items in {self.seconds:.2f}s ({self.rate:,.0f} items/s)"
+        if self.skipped:
+            text += f", {self.skipped} already there skipped"
+        return text
+
+
+def format_of(_path: pathlib.Path, /) -> str:
+    match _path.suffix.lower():
+        case ".ndjson" | ".jsonl":
+            return "ndjson"
+        case ".csv":
+            return "csv"
+        case _:
+            raise ValueError(f"error: cannot tell the format of {_path.name!r}")
+
+
+def read_ndjson(_stream: TextIO, /) -> Iterator[Task | Todo]:
+    for line_ in _stream:
+        if line_.strip() == "":
+            continue
+        item = None
+        # the full form only, a header would point into another account's bodies
+        match json.loads(line_):
+            case {"item-type": "task", "task-name": str(name), "task-content": str(body)}:
+                item = Task(name, body)
+            case {"item-type": "todo", "todo-name": str(name), "finished?": bool(done)}:
+                item = Todo(name, done)
+        if item is None or item.name == "":
+            raise ValueError(f"error: not an item : {line_.strip()!r}")
+        yield item
+
+
+def read_csv(_stream: TextIO, /) -> Iterator[Task | Todo]:
+    reader = csv.DictReader(_stream)
+    for row_ in reader:
+        # a short row has None in the columns it lacks
+        kind, name = row_.get("item-type"), row_.get("name")
+        if not name:
+            raise ValueError(f"error: row {reader.line_num} has no name")
+        match kind:
+            case "task":
+                yield Task(name, row_.get("content") or "")
+            case "todo":
+                finished = row_.get("finished?")
+                if finished is None:
+                    raise ValueError(f"error: row {reader.line_num} has no finished? value")
+                yield Todo(name, finished.lower() in ("1", "true", "x"))
+            case _:
+                raise ValueError(f"error: row {reader.line_num} is not an item : {kind!r}")
+
+
+def write_ndjson(_stream: TextIO, _items: Iterable[Task | Todo], /) -> int:
+    count = 0
+    for itm_ in _items:
+        _stream.write(json.dumps(itm_.to_json()) + "\n")
+        count += 1
+    return count
+
+
+def write_csv(_stream: TextIO, _items: Iterable[Task | Todo], /) -> int:
+    count = 0
+    writer = csv.DictWriter(_stream, CSV_FIELDS)
+    writer.writeheader()
+    for itm_ in _items:
+        if isinstance(itm_, Task):
+            writer.writerow({"item-type": "task", "name": itm_.name, "content": itm_.content})
+        else:
+            writer.writerow(
+                {"item-type": "todo", "name": itm_.name, "finished?": str(itm_.finished).lower()}
+            )
+        count += 1
+    return count
+
+
+def import_items(
+    _account: Account, _items: Iterable[Task | Todo], /, batch: int = BATCH_SIZE
+) -> TransferStats:
+    "add items from a stream, committing once per batch. names already there are skipped"
+    stats = TransferStats()
+    start = time.perf_counter()
+    items = iter(_items)
+    while chunk := list(islice(items, batch)):
+        with _account as _acc:
+            for itm_ in chunk:
+                if isinstance(itm_, Task):
+                    if _acc.has_task(itm_.name):
+                        stats.skipped += 1
+                        continue
+                    _acc.add_task(itm_.name, itm_.content)
+                else:
+                    if _acc.has_todo(itm_.name):
+                        stats.skipped += 1
+                        continue
+                    _acc.add_todo(itm_.name, itm_.finished)
+                stats.count += 1
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def export_items(_account: Account, /) -> Iterator[Task | Todo]:
+    "full items one at a time, bodies come through the account's lru"
+    for tsk_ in list(_account.tasks):
+        content = _account.get_task_content(tsk_)
+        if content is not None:
+            yield Task(tsk_, content)
+    yield from list(_account.todos.values())
+
+
+def import_file(_account: Account, _path: pathlib.Path, /) -> TransferStats:
+    reader = read_ndjson if format_of(_path) == "ndjson" else read_csv
+    with _path.open(newline="") as _stream:
+        return import_items(_account, reader(_stream))
+
+
+def export_file(_account: Account, _path: pathlib.Path, /) -> TransferStats:
+    writer = write_ndjson if format_of(_path) == "ndjson" else write_csv
+    stats = TransferStats()
+    start = time.perf_counter()
+    with _path.open("w", newline="") as _stream:
+        stats.count = writer(_stream, export_items(_account))
+    stats.seconds = time.perf_counter() - start
+    return stats
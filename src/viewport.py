@@ -0,0 +1,82 @@
+class Viewport:
+    "the rows of a long item list that fit on screen, items laid out row by row"
+
+    __slots__ = ("total", "rows", "columns", "top")
+
+    def __init__(self, _rows: int = 1, _columns: int = 1, /) -> None:
+        self.total = 0
+        self.rows = max(1, _rows)
+        self.columns = max(1, _columns)
+        # first visible line, one line holds `columns` items
+        self.top = 0
+
+    @property
+    def lines(self) -> int:
+        return -(-self.total // self.columns)
+
+    @property
+    def page(self) -> int:
+        return self.rows * self.columns
+
+    def resize(self, _rows: int, _columns: int, _total: int, /) -> None:
+        "keep the first visible item in view when the shape changes"
+        first = self.top * self.columns
+        self.rows = max(1, _rows)
+        self.columns = max(1, _columns)
+        self.total = max(0, _total)
+        self.top = first // self.columns
+        self.clamp()
+
+    def clamp(self) -> None:
+        self.top = max(0, min(self.top, self.lines - self.rows))
+
+    def scroll(self, _lines: int, /) -> None:
+        self.top += _lines
+        self.clamp()
+
+    def scroll_page(self, _pages: int, /) -> None:
+        self.scroll(_pages * self.rows)
+
+    def home(self) -> None:
+        self.top = 0
+
+    def end(self) -> None:
+        self.top = self.lines
+        self.clamp()
+
+    def jump(self, _index: int, /) -> None:
+        "scroll the least amount that brings the item into view"
+        line = min(max(0, _index), max(0, self.total - 1)) // self.columns
+        if line < self.top:
+            self.top = line
+        elif line >= self.top + self.rows:
+            self.top = line - self.rows + 1
+        self.clamp()
+
+    def visible(self) -> range:
+        start = self.top * self.columns
+        return range(start, min(self.total, start + self.page))
+
+    def place(self, _index: int, /) -> tuple[int, int]:
+        "(row, column) on screen of a visible item"
+        line, column = divmod(_index, self.columns)
+        return line - self.top, column
+
+    def __str__(self) -> str:
+        shown = self.visible()
+        if len(shown) == 0:
+            return f"0 / {self.total}"
+        return f"{shown.start + 1}-{shown.stop} / {self.total}"
+
+
+if __name__ == "__main__":
+    view = Viewport(10, 2)
+    view.resize(10, 2, 1_000_001)
+    view.end()
+    print(view, view.place(view.visible().start))
+    view.jump(500_000)
+    print(view)
+    view.scroll_page(-1)
+    print(view)
+    view.resize(10, 2, 3)
+    print(view, [view.place(idx_) for idx_ in view.visible()])
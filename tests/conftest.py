@@ -0,0 +1,24 @@
+import sys
+import pathlib
+import pytest
+
+# the modules import each other flat, like main.py runs them
+SRC = pathlib.Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import account  # noqa: E402
+from storage import open_storage  # noqa: E402
+
+
+@pytest.fixture(params=["json", "json-snapshot", "sqlite"])
+def storage(request: pytest.FixtureRequest, tmp_path: pathlib.Path):
+    "every backend in a fresh folder, src/account_db is never opened"
+    # read from the class dict, a getattr would open the default storage
+    default = account.Account.__dict__["storage"]
+    storage = open_storage(request.param, tmp_path)
+    account.Account.storage = storage
+    try:
+        yield storage
+    finally:
+        storage.close()
+        account.Account.storage = default
@@ -0,0 +1,75 @@
+import time
+import threading
+from typing import Any
+from autosave import Autosaver
+
+
+class Disk:
+    "an account stand in, every write lands in order unless it is failing"
+
+    name = "stub"
+
+    def __init__(self, _failing: int = 0, /) -> None:
+        self.bytes_written = 0
+        self.failing = _failing
+        self.landed = []
+        self.tries = []
+        self.lock = threading.Lock()
+
+    def write_changes(self, _changes: list[dict[str, Any]], /) -> int:
+        with self.lock:
+            self.tries.append(time.monotonic())
+            if self.failing:
+                self.failing -= 1
+                raise OSError("disk full")
+            self.landed.extend(rec_["seq"] for rec_ in _changes)
+        return len(_changes)
+
+
+def records(*_seqs: int) -> list[dict[str, Any]]:
+    return [{"op": "check-todo", "seq": seq_} for seq_ in _seqs]
+
+
+def test_requests_close_together_land_in_one_write():
+    disk = Disk()
+    saver = Autosaver(disk, 0.05)
+    for seq_ in range(1, 11):
+        saver.request(records(seq_))
+    assert saver.flush() is None
+    assert saver.close() == []
+    assert disk.landed == list(range(1, 11))
+    assert saver.writes == 1
+    assert disk.bytes_written == 10
+
+
+def test_failed_records_stay_queued_in_order():
+    disk = Disk(1_000)
+    saver = Autosaver(disk, 0.01, max_delay=0.05)
+    saver.request(records(1, 2))
+    error = saver.flush()
+    assert isinstance(error, OSError)
+    assert saver.error is error and saver.failures >= 1
+    saver.request(records(3))
+    assert [rec_["seq"] for rec_ in saver.queued()] == [1, 2, 3]
+    assert saver.unflushed
+    # the disk comes back, the next try lands everything and clears the error
+    with disk.lock:
+        disk.failing = 0
+    assert saver.flush() is None
+    assert disk.landed == [1, 2, 3]
+    assert saver.error is None
+    assert saver.close() == []
+
+
+def test_a_failing_disk_is_retried_after_a_back_off():
+    disk = Disk(1_000)
+    saver = Autosaver(disk, 0.01, max_delay=0.1)
+    saver.request(records(1))
+    time.sleep(0.35)
+    with disk.lock:
+        tries = list(disk.tries)
+    # one try per max_delay at most, not one per loop
+    assert 2 <= len(tries) <= 5
+    assert all(b_ - a_ >= 0.09 for a_, b_ in zip(tries, tries[1:]))
+    # closing gives back what never landed
+    assert [rec_["seq"] for rec_ in saver.close()] == [1]
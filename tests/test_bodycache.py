@@ -0,0 +1,57 @@
+from account import Account
+from bodycache import BodyCache
+from item import Task
+
+
+def test_least_recently_used_bodies_are_unloaded():
+    cache = BodyCache(10)
+    tasks = [Task(f"t{idx_}", "abcd", ref=(0, idx_ * 4, 4)) for idx_ in range(3)]
+    for task_ in tasks[:2]:
+        cache.put(task_)
+    cache.touch(tasks[0])
+    cache.put(tasks[2])
+    # t1 was used least lately
+    assert not tasks[1].loaded
+    assert tasks[0].loaded and tasks[2].loaded
+    assert (cache.size, len(cache)) == (8, 2)
+    # the newest one stays even when it alone is over the budget
+    big = Task("big", "x" * 50, ref=(0, 12, 50))
+    cache.put(big)
+    assert big.loaded and len(cache) == 1 and cache.size == 50
+
+
+def test_unsaved_bodies_count_but_stay():
+    cache = BodyCache(10)
+    unsaved = Task("edited", "12345678")
+    cache.put(unsaved)
+    stored = Task("stored", "abcd", ref=(0, 0, 4))
+    cache.put(stored)
+    assert unsaved.loaded and stored.loaded
+    assert cache.size == 12
+    cache.put(Task("newest", "xy", ref=(0, 4, 2)))
+    # the saved one goes, the unsaved one has no copy anywhere else
+    assert not stored.loaded and unsaved.loaded
+    assert cache.size == 10
+    cache.clear()
+    assert unsaved.loaded and cache.size == 0
+
+
+def test_saved_bodies_are_read_back_after_eviction(storage, monkeypatch):
+    monkeypatch.setattr(Account, "body_budget", 64)
+    acc = Account("bodies", "bodies")
+    with acc:
+        for idx_ in range(10):
+            acc.add_task(f"task {idx_}", f"{idx_} " + "x" * 30)
+    # once saved they are unloaded down to the budget
+    assert acc.bodies.size <= 64
+    with acc:
+        for idx_ in range(10):
+            acc.edit_task(f"task {idx_}", f"edited {idx_} " + "y" * 30)
+        # not saved yet, none of the edits can be let go
+        assert acc.bodies.size > 64
+    assert acc.bodies.size <= 64
+    assert sum(tsk_.loaded for tsk_ in acc.tasks.values()) < 10
+    for idx_ in range(10):
+        assert acc.get_task_content(f"task {idx_}").startswith(f"edited {idx_} ")
+    fresh = Account("bodies")
+    assert fresh.get_task_content("task 3").startswith("edited 3 ")
@@ -0,0 +1,111 @@
+import time
+import pytest
+
+pytest.importorskip("curses")
+
+from eventloop import EventLoop  # noqa: E402
+
+
+class Window:
+    "hands out a key once the given number of reads found nothing"
+
+    def __init__(self, _empty_reads: int, _key: int, /) -> None:
+        self.empty_reads = _empty_reads
+        self.key = _key
+        self.timeouts = []
+        self.refreshed = 0
+
+    def timeout(self, _ms: int, /) -> None:
+        self.timeouts.append(_ms)
+
+    def getch(self) -> int:
+        if self.empty_reads > 0:
+            self.empty_reads -= 1
+            # a blocking read waits out its timeout before giving up
+            if self.timeouts[-1] > 0:
+                time.sleep(self.timeouts[-1] / 1000)
+            return -1
+        return self.key
+
+    def refresh(self) -> None:
+        self.refreshed += 1
+
+
+def test_timers_run_in_due_order_and_repeat():
+    loop = EventLoop()
+    ran = []
+    loop.call_later(0.02, lambda: ran.append("late"))
+    loop.call_later(0.0, lambda: ran.append("now"))
+    ticker = loop.call_every(0.01, lambda: ran.append("tick"))
+    cancelled = loop.call_later(0.0, lambda: ran.append("never"))
+    cancelled.cancel()
+    assert loop.run_timers()
+    assert ran == ["now"]
+    time.sleep(0.03)
+    loop.run_timers()
+    assert ran[1:] == ["tick", "late"]
+    ticker.cancel()
+    time.sleep(0.02)
+    assert not loop.run_timers()
+    # nothing left to wait for, a key wait may block
+    assert loop.wait() == -1
+
+
+def test_held_timers_wait():
+    loop = EventLoop()
+    ran = []
+    loop.call_later(0.0, lambda: ran.append(1))
+    with loop.hold():
+        assert not loop.run_timers()
+        assert loop.wait() == -1
+    assert loop.run_timers()
+    assert ran == [1]
+
+
+def test_idle_tasks_take_turns_a_step_at_a_time():
+    loop = EventLoop()
+    steps = []
+
+    def task(_name: str, _count: int, /):
+        for idx_ in range(_count):
+            steps.append(f"{_name}{idx_}")
+            yield
+
+    loop.idle(task("a", 3))
+    loop.idle(task("b", 1))
+    assert loop.busy and loop.wait() == 0
+    while loop.run_idle():
+        pass
+    assert steps == ["a0", "b0", "a1", "a2"]
+    assert not loop.busy
+
+
+def test_getch_runs_idle_work_until_a_key_comes():
+    loop = EventLoop()
+    steps = []
+
+    def task():
+        for idx_ in range(100):
+            steps.append(idx_)
+            yield
+
+    loop.idle(task())
+    win = Window(5, ord("q"))
+    assert loop.getch(win) == ord("q")
+    # one step per empty read, the reads did not block while work was queued
+    assert steps == [0, 1, 2, 3, 4]
+    assert win.timeouts[:5] == [0] * 5
+    # the window is left blocking again
+    assert win.timeouts[-1] == -1
+
+
+def test_getch_wakes_up_for_a_timer():
+    loop = EventLoop()
+    ran = []
+    loop.call_later(0.02, lambda: ran.append(time.monotonic()))
+    win = Window(3, ord("q"))
+    start = time.monotonic()
+    assert loop.getch(win) == ord("q")
+    assert len(ran) == 1 and ran[0] - start >= 0.02
+    assert win.refreshed == 1
+    assert 0 < win.timeouts[0] <= 21
@@ -0,0 +1,63 @@
+import random
+from gapbuffer import GapBuffer
+
+
+def test_edits_at_the_cursor():
+    buffer = GapBuffer("hello world")
+    buffer.move_to(5)
+    buffer.insert(",")
+    assert buffer.text() == "hello, world"
+    assert buffer.backspace()
+    assert buffer.delete()
+    assert buffer.text() == "helloworld"
+    buffer.move_to(0)
+    assert not buffer.backspace()
+    buffer.move_to(len(buffer))
+    assert not buffer.delete()
+    buffer.clear()
+    assert buffer.text() == "" and buffer.lines == 1
+
+
+def test_lines_follow_the_cursor_both_ways():
+    buffer = GapBuffer("one\ntwo\n\nfour")
+    assert buffer.lines == 4
+    assert [buffer.line_text(line_) for line_ in range(4)] == ["one", "two", "", "four"]
+    buffer.goto_line(3, 2)
+    assert (buffer.line, buffer.column, buffer.cursor) == (3, 2, 11)
+    # a shorter line puts the cursor at its end
+    buffer.goto_line(2, 3)
+    assert (buffer.line, buffer.column) == (2, 0)
+    buffer.insert("3\nthree")
+    assert buffer.text() == "one\ntwo\n3\nthree\nfour"
+    assert buffer.line_text(3, 1, 3) == "hre"
+    assert buffer.line_text(4) == "four"
+
+
+def test_random_edits_match_a_plain_string():
+    rnd = random.Random(7)
+    text, cursor = "ab\ncd\n", 0
+    buffer = GapBuffer(text)
+    for _ in range(2000):
+        match rnd.randrange(4):
+            case 0:
+                piece = rnd.choice(["x", "\n", "yz", "\n\n"])
+                buffer.insert(piece)
+                text = text[:cursor] + piece + text[cursor:]
+                cursor += len(piece)
+            case 1:
+                if buffer.backspace():
+                    text = text[: cursor - 1] + text[cursor:]
+                    cursor -= 1
+            case 2:
+                if buffer.delete():
+                    text = text[:cursor] + text[cursor + 1 :]
+            case 3:
+                cursor = max(0, min(len(text), cursor + rnd.randint(-5, 5)))
+                buffer.move_to(cursor)
+        assert buffer.cursor == cursor
+        assert buffer.line == text.count("\n", 0, cursor)
+    lines = text.split("\n")
+    assert buffer.text() == text
+    assert buffer.lines == len(lines)
+    assert [buffer.line_text(line_) for line_ in range(len(lines))] == lines
+    assert buffer.slice(3, 17) == text[3:17]
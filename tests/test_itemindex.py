@@ -0,0 +1,47 @@
+from item import Todo
+from itemindex import ItemIndex
+
+
+def names(_index: ItemIndex, /) -> list[str]:
+    return list(_index)
+
+
+def test_a_restored_item_comes_back_in_place():
+    index = ItemIndex(Todo(f"t{idx_}") for idx_ in range(4))
+    gone = index.remove("t1")
+    assert names(index) == ["t0", "t2", "t3"]
+    assert "t1" not in index and index.get("t1") is None and len(index) == 3
+    index.restore("t1", gone)
+    assert names(index) == ["t0", "t1", "t2", "t3"] and len(index) == 4
+
+
+def test_a_new_item_under_a_removed_name_goes_last():
+    index = ItemIndex(Todo(f"t{idx_}") for idx_ in range(3))
+    index.remove("t0")
+    index.add(Todo("t0", True))
+    assert names(index) == ["t1", "t2", "t0"]
+    # an existing name is replaced where it stands
+    index.add(Todo("t1", True))
+    assert names(index) == ["t1", "t2", "t0"] and index["t1"].finished
+    index.discard("t2")
+    assert names(index) == ["t1", "t0"] and len(index) == 2
+
+
+def test_rename_keeps_the_position():
+    index = ItemIndex(Todo(f"t{idx_}") for idx_ in range(3))
+    index.rename("t1", "one")
+    assert names(index) == ["t0", "one", "t2"]
+    assert index["one"].name == "one"
+
+
+def test_purge_keeps_the_order_and_only_runs_once_tombstones_pile_up():
+    index = ItemIndex(Todo(f"t{idx_}") for idx_ in range(400))
+    for idx_ in range(0, 400, 2):
+        index.remove(f"t{idx_}")
+        if idx_ < 120:
+            index.purge()
+            # under max(64, live // 4) the tombstones stay
+            assert len(index._items) == 400
+    index.purge()
+    assert len(index._items) == len(index) == 200
+    assert names(index) == [f"t{idx_}" for idx_ in range(1, 400, 2)]
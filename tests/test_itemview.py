@@ -0,0 +1,46 @@
+import random
+from account import Account
+from item import Todo
+from itemview import Row, Rows, ItemView
+
+
+def test_positions_follow_deletes():
+    rows = [Row(Todo(f"todo {idx_}")) for idx_ in range(500)]
+    tree, alive = Rows(rows), list(rows)
+    rnd = random.Random(3)
+    for step_ in range(450):
+        if step_ % 5 == 0:
+            row = Row(Todo(f"added {step_}"))
+            tree.append(row)
+            alive.append(row)
+        row = alive.pop(rnd.randrange(len(alive)))
+        tree.kill(row)
+        assert len(tree) == len(alive)
+        for idx_ in rnd.sample(range(len(alive)), min(10, len(alive))):
+            assert tree[idx_] is alive[idx_]
+            assert tree.index(alive[idx_]) == idx_
+    # past the tombstone limit the slots were squeezed
+    assert len(tree.slots) - len(tree) <= max(64, len(tree) // 4)
+    assert [tree[idx_] for idx_ in range(len(tree))] == alive
+
+
+def test_the_view_patches_rows_from_records(storage):
+    acc = Account("view", "view")
+    with acc:
+        for idx_ in range(6):
+            acc.add_todo(f"todo {idx_}", False)
+        acc.add_task("task", "body")
+    view = ItemView(acc)
+    with acc:
+        acc.delete_todo("todo 1")
+        acc.rename_todo("todo 4", "renamed")
+        acc.add_todo("new", True)
+        acc.check_todo("todo 0", True)
+    names = [view[idx_].item.name for idx_ in range(len(view))]
+    assert names == ["task", "todo 0", "todo 2", "todo 3", "renamed", "todo 5", "new"]
+    assert view.index("renamed") == 4
+    assert view.index("todo 1") is None
+    assert view[1].text(10, 10) == "todo 0     : [x]"
+    # patched, not built again
+    assert view.rebuilds == 1
+    view.close()
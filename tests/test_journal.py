@@ -0,0 +1,77 @@
+import pytest
+from account import Account
+from journal import Journal, last_record, read_records
+from storage import JsonStorage, StorageMode
+
+
+def records(_first: int, _count: int, /) -> list[dict]:
+    return [{"op": "add-todo", "seq": seq_} for seq_ in range(_first, _first + _count)]
+
+
+def test_replay_gives_back_what_was_appended(tmp_path):
+    journal = Journal(tmp_path / "acc_j.json.journal")
+    assert journal.append([]) == 0
+    journal.append(records(1, 3))
+    journal.append(records(4, 2))
+    assert [rec_["seq"] for rec_ in journal.replay()] == [1, 2, 3, 4, 5]
+    assert journal.last_seq() == 5
+    # the rotated journal replays before the live one
+    journal.rotate()
+    journal.append(records(6, 1))
+    assert [rec_["seq"] for rec_ in journal.replay()] == [1, 2, 3, 4, 5, 6]
+    assert journal.last_seq() == 6
+
+
+def test_a_torn_tail_is_not_replayed_and_not_kept(tmp_path):
+    journal = Journal(tmp_path / "acc_j.json.journal")
+    journal.append(records(1, 2))
+    with journal.path.open("a") as _jf:
+        # a crash in the middle of the third record
+        _jf.write('{"op":"add-todo","se')
+    assert [rec_["seq"] for rec_ in journal.replay()] == [1, 2]
+    assert last_record(journal.path)["seq"] == 2
+    journal.append(records(3, 1))
+    assert [rec_["seq"] for rec_ in read_records(journal.path)] == [1, 2, 3]
+    assert journal.path.read_text().count("\n") == 3
+
+
+def test_a_torn_first_record_leaves_nothing(tmp_path):
+    journal = Journal(tmp_path / "acc_j.json.journal")
+    journal.path.write_text('{"op":')
+    assert list(journal.replay()) == [] and journal.last_seq() is None
+    journal.append(records(1, 1))
+    assert [rec_["seq"] for rec_ in journal.replay()] == [1]
+
+
+def test_last_record_reads_past_its_first_chunk(tmp_path):
+    path = tmp_path / "acc_j.json.journal"
+    journal = Journal(path)
+    journal.append([{"op": "add-task", "seq": 1, "task-content": "x" * 10000}])
+    journal.append([{"op": "add-task", "seq": 2, "task-content": "y" * 10000}])
+    assert last_record(path, chunk=64)["seq"] == 2
+
+
+@pytest.mark.parametrize("mode", [StorageMode.Journal, StorageMode.Snapshot])
+def test_compaction_changes_nothing_a_load_sees(tmp_path, monkeypatch, mode):
+    storage = JsonStorage(tmp_path, mode=mode)
+    monkeypatch.setattr(Account, "storage", storage)
+    acc = Account("fold", "fold")
+    for idx_ in range(30):
+        with acc:
+            acc.add_todo(f"todo {idx_}", idx_ % 2 == 0)
+            acc.add_task(f"task {idx_}", f"body {idx_}")
+            if idx_ % 3 == 0:
+                acc.delete_todo(f"todo {idx_}")
+                acc.rename_task(f"task {idx_}", f"renamed {idx_}")
+    before = Account("fold")
+    storage.compact("fold", wait=True, force=True)
+    after = Account("fold")
+    assert after.content == before.content == acc.content
+    assert after.seq == before.seq == acc.seq == storage.last_seq("fold")
+    assert not storage.journal_of("fold").path.exists()
+    assert after.get_task_content("renamed 9") == "body 9"
+    # and it keeps taking changes on top
+    with acc:
+        acc.add_todo("later", False)
+    assert Account("fold").content == acc.content
+    storage.close()
@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip("curses")
+
+import taskman  # noqa: E402
+from account import Account  # noqa: E402
+from layout import Layout  # noqa: E402
+from screen import Screen, VirtualScreen, ScriptEnd  # noqa: E402
+
+
+def run(_screen: VirtualScreen, /) -> list[str]:
+    "one session over a small account until the script runs out"
+    acc = Account("demo", "demo")
+    with acc:
+        for idx_ in range(12):
+            acc.add_todo(f"todo {idx_}", idx_ % 3 == 0)
+        acc.add_task("plan", "write the plan\nsecond line")
+    with pytest.raises(ScriptEnd):
+        taskman.interface_tasktodo(_screen, acc)
+    return [line_.rstrip() for line_ in _screen.lines()]
+
+
+def test_screen_is_abstract():
+    with pytest.raises(TypeError):
+        Screen()
+
+
+def test_snapshot_after_a_command(storage):
+    lines = run(VirtualScreen(14, 64, keys=["check todo-1\n"]))
+    assert lines == [
+        "",
+        "",
+        "    Task/ToDo Terminal     | Task: 1 - Todo: 12",
+        "",
+        "",
+        "    plan       : write the plan",
+        "    todo 0     : [x]",
+        "    todo 1     : [x]",
+        "    todo 2     : [ ]",
+        "                                                     1-4 / 13",
+        "",
+        " +------------------------------------------------------------+",
+        " |                                                            |",
+        " +------------------------------------------------------------+",
+    ]
+
+
+def test_snapshot_after_a_resize(storage):
+    screen = VirtualScreen(14, 64, keys=["check todo-1\n", "goto 6\n", (10, 44), None])
+    lines = run(screen)
+    assert screen.getmaxyx() == (10, 44)
+    assert lines == [
+        "",
+        "",
+        "    Task/ToDo Terminal     | Task: 1 -",
+        "                           Todo: 12",
+        "    todo 1     : [x]",
+        "                                 3-3 / 13",
+        "",
+        " +----------------------------------------+",
+        " |                                        |",
+        " +----------------------------------------+",
+    ]
+
+
+def test_short_screens_keep_the_lines_apart():
+    for lines_ in range(8, 30):
+        layout = Layout(lines_, 44)
+        assert layout.title_y + layout.desc_lines == layout.list_y
+        assert layout.list_y + layout.rows == layout.position_y
+        # the status line, then the three lines of the command box
+        assert layout.position_y < layout.status_y == lines_ - 4
@@ -0,0 +1,91 @@
+from account import Account
+from searchindex import SearchIndex, open_index
+import searchindex
+
+
+def test_bm25_ranks_rare_words_and_names_higher():
+    index = SearchIndex()
+    index.add("task", "groceries", "milk bread eggs")
+    index.add("task", "report", "write the quarterly report, milk the numbers")
+    index.add("todo", "call bob")
+    for idx_ in range(20):
+        index.add("task", f"filler {idx_}", "the the the numbers")
+    # the name counts more than a body mention of the same word
+    assert index.search("report")[0] == ("task", "report")
+    assert index.search("milk")[:2] == [("task", "groceries"), ("task", "report")]
+    # the rare word decides, the common one only adds to what it found
+    assert index.search("the quarterly")[0] == ("task", "report")
+    assert index.search("bob") == [("todo", "call bob")]
+    index.remove("todo", "call bob")
+    assert index.search("bob") == []
+    assert index.search("nothing here") == []
+
+
+def test_saved_index_loads_back_in_slices(tmp_path, monkeypatch):
+    # a line per two keys or terms, so the load takes many steps
+    monkeypatch.setattr(searchindex, "LOAD_SLICE", 2)
+    index = SearchIndex(tmp_path / "acc_x.index")
+    for idx_ in range(9):
+        index.add("task", f"task {idx_}", f"body word{idx_ % 3}")
+    index.remove("task", "task 4")
+    index.seq = 42
+    index.save()
+    steps = SearchIndex.load_slices(index.path)
+    count = 0
+    while True:
+        try:
+            next(steps)
+            count += 1
+        except StopIteration as _done:
+            loaded = _done.value
+            break
+    assert count > 4
+    assert loaded.seq == 42 and len(loaded) == 8
+    for query_ in ("word1", "task 4", "body", "task 7 word0"):
+        assert loaded.search(query_) == index.search(query_)
+    index.path.write_text("not an index")
+    assert SearchIndex.load(index.path) is None
+
+
+def test_a_saved_index_catches_up_without_a_rebuild(storage, monkeypatch):
+    acc = Account("find", "find")
+    with acc:
+        acc.add_task("alpha", "first body")
+    index = open_index(acc)
+    index.detach()
+    index.save()
+    with acc:
+        acc.add_task("beta", "second body")
+        acc.rename_task("alpha", "gamma")
+    if hasattr(storage, "compact"):
+        storage.compact("find", wait=True)
+    # every backend hands out the records saved since, a fold included
+    rebuilds = []
+    monkeypatch.setattr(SearchIndex, "rebuild_slices", lambda *_: rebuilds.append(1))
+    index = open_index(Account("find"))
+    assert rebuilds == []
+    assert index.search("body") == [("task", "beta"), ("task", "gamma")]
+    assert index.search("alpha") == []
+
+
+def test_a_reset_rebuilds_later_in_slices(storage):
+    acc = Account("reset", "reset")
+    with acc:
+        for idx_ in range(5):
+            acc.add_task(f"task {idx_}", "body")
+    index = open_index(acc)
+    try:
+        with acc:
+            acc.add_task("doomed", "body")
+            raise KeyError("undo it")
+    except KeyError:
+        pass
+    # nothing read on the spot, the rebuild waits for catch_up()
+    assert index.pending is not None
+    assert index.search("doomed") == []
+    assert index.pending is None and len(index) == 5
+    # a rollback with nothing to undo does not ask for one
+    acc.begin()
+    acc.rollback()
+    assert index.pending is None
+    index.detach()
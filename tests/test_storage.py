@@ -0,0 +1,70 @@
+import pytest
+from account import Account, create_account, get_account, delete_account, verify_account
+from storage import open_storage
+
+
+def make_account(_name: str = "store", /) -> Account:
+    with create_account(_name, "secret") as _acc:
+        _acc.add_task("task 1", "first line\nsecond line")
+        _acc.add_task("task 2", "")
+        _acc.add_todo("todo 1", False)
+        _acc.add_todo("todo 2", True)
+    return _acc
+
+
+def test_an_account_loads_back_the_same(storage):
+    acc = make_account()
+    loaded = get_account("store")
+    assert loaded.content == acc.content
+    assert loaded.seq == acc.seq
+    assert storage.last_seq("store") == acc.seq
+    # bodies come in on demand, the list only needs the first line
+    assert loaded.tasks["task 1"].summary == "first line"
+    assert loaded.get_task_content("task 1") == "first line\nsecond line"
+    assert storage.load_item("store", "todo", "todo 2").finished
+    assert storage.load_item("store", "todo", "missing") is None
+    info = storage.info("store")
+    assert (info["tasks"], info["todos"]) == (2, 2)
+
+
+def test_saved_changes_reach_a_fresh_load(storage):
+    acc = make_account()
+    with acc:
+        acc.edit_task("task 2", "now with a body")
+        acc.rename_task("task 1", "renamed")
+        acc.delete_todo("todo 1")
+        acc.check_todo("todo 2", False)
+        acc.add_todo("todo 3", True)
+    loaded = get_account("store")
+    assert loaded.content == acc.content
+    assert [tsk_.name for tsk_ in loaded.list_task()] == ["renamed", "task 2"]
+    assert [tdo_.name for tdo_ in loaded.list_todo()] == ["todo 2", "todo 3"]
+    assert loaded.get_task_content("renamed") == "first line\nsecond line"
+
+
+def test_names_verify_and_delete(storage):
+    make_account("b")
+    make_account("a")
+    assert storage.names() == ("a", "b")
+    assert verify_account("a", "secret")
+    assert not verify_account("a", "wrong")
+    assert not verify_account("nobody", "secret")
+    with pytest.raises(ValueError):
+        create_account("a")
+    delete_account(get_account("a"))
+    assert storage.names() == ("b",)
+    assert not storage.exists("a")
+    with pytest.raises(ValueError):
+        get_account("a")
+
+
+def test_the_password_is_never_stored(storage):
+    make_account()
+    assert "secret" not in repr(storage.load("store")[0]["acc-pass"])
+    for path_ in storage.path_of("store").parent.iterdir():
+        assert b"secret" not in path_.read_bytes()
+
+
+def test_an_unknown_backend_is_refused(tmp_path):
+    with pytest.raises(ValueError, match="unknown storage"):
+        open_storage("csv", tmp_path)
@@ -0,0 +1,85 @@
+import time
+import threading
+import pytest
+from account import Account, create_account, delete_account
+from storage import JsonStorage, StorageMode
+
+
+def make_admin() -> Account:
+    with create_account("admin", "admin123") as _acc:
+        _acc.add_todo("todo 1", False)
+        _acc.add_task("task 1", "body")
+    return _acc
+
+
+def test_two_sessions_see_each_other(storage):
+    make_admin()
+    first, second = Account("admin"), Account("admin")
+    with first:
+        first.add_todo("from first", False)
+    with second:
+        second.add_todo("from second", False)
+        second.check_todo("todo 1", True)
+    # saving merged what the first session wrote before it
+    assert second.has_todo("from first")
+    assert first.poll()
+    assert first.has_todo("from second")
+    assert first.todos["todo 1"].finished
+
+
+def test_last_save_wins_in_both_sessions(storage):
+    make_admin()
+    first, second = Account("admin"), Account("admin")
+    with first:
+        first.check_todo("todo 1", True)
+    with second:
+        second.check_todo("todo 1", True)
+        second.check_todo("todo 1", False)
+    first.poll()
+    second.poll()
+    fresh = Account("admin")
+    assert not fresh.todos["todo 1"].finished
+    assert not first.todos["todo 1"].finished
+    assert not second.todos["todo 1"].finished
+    assert len(fresh.todos) == len(first.todos) == len(second.todos)
+
+
+def test_compaction_gap_reloads(storage):
+    if not (isinstance(storage, JsonStorage) and storage.mode is StorageMode.Journal):
+        pytest.skip("only a journal can be folded away under a session")
+    make_admin()
+    first, second, third = Account("admin"), Account("admin"), Account("admin")
+    # the records the others have not seen yet end up in the snapshot only,
+    # the journal keeps what one fold took out, not what two did
+    for round_ in range(2):
+        with first:
+            for idx_ in range(10):
+                first.add_todo(f"folded {round_ * 10 + idx_}", False)
+        storage.compact("admin", wait=True)
+    assert storage.changes_since("admin", second.disk_seq) is None
+    # a save across the gap reads everything again, its own change on top
+    with second:
+        second.add_task("kept", "saved across the gap")
+    assert second.has_todo("folded 19")
+    assert second.has_task("kept")
+    # and so does a session that only looks
+    assert third.poll()
+    assert third.has_todo("folded 19")
+    assert third.has_task("kept")
+    assert third.seq == second.seq == Account("admin").seq
+
+
+def test_delete_waits_for_a_save_and_removes_the_lock(storage):
+    acc = make_admin()
+    lock = storage.lock("admin")
+    deleter = threading.Thread(target=delete_account, args=(acc,))
+    with lock:
+        deleter.start()
+        time.sleep(0.1)
+        if isinstance(storage, JsonStorage):
+            assert deleter.is_alive()
+            assert storage.exists("admin")
+    deleter.join()
+    assert not storage.exists("admin")
+    assert not storage.lock_of("admin").exists()
+    assert "admin" not in storage.names()
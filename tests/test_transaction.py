@@ -0,0 +1,71 @@
+import pytest
+from account import Account
+
+
+def make_account() -> Account:
+    acc = Account("tx", "tx")
+    with acc:
+        acc.add_todo("todo 1", False)
+        acc.add_task("task 1", "body")
+    return acc
+
+
+def test_an_error_rolls_the_whole_block_back(storage):
+    acc = make_account()
+    with pytest.raises(KeyError):
+        with acc:
+            acc.check_todo("todo 1", True)
+            acc.delete_task("task 1")
+            acc.add_todo("todo 2", False)
+            raise KeyError("no")
+    assert not acc.todos["todo 1"].finished
+    assert acc.has_task("task 1") and not acc.has_todo("todo 2")
+    assert not acc.dirty
+    assert Account("tx").content == acc.content
+
+
+def test_a_nested_rollback_dooms_the_outer_commit(storage):
+    acc = make_account()
+    seq = acc.seq
+    with pytest.raises(ValueError, match="nested transaction"):
+        with acc:
+            acc.add_todo("outer", False)
+            with pytest.raises(KeyError):
+                with acc:
+                    acc.add_todo("inner", False)
+                    raise KeyError("inner fails")
+            # the outer block goes on, its commit is what refuses
+            acc.add_todo("after", False)
+    for name_ in ("outer", "inner", "after"):
+        assert not acc.has_todo(name_)
+    assert acc.seq == seq
+    assert Account("tx").seq == seq
+    # the account is usable again afterwards
+    with acc:
+        acc.add_todo("later", False)
+    assert Account("tx").has_todo("later")
+
+
+def test_nested_commits_only_save_at_the_outermost(storage):
+    acc = make_account()
+    with acc:
+        with acc:
+            acc.add_todo("inner", False)
+        assert acc.dirty
+        assert not Account("tx").has_todo("inner")
+    assert not acc.dirty
+    assert Account("tx").has_todo("inner")
+
+
+def test_a_commit_without_changes_writes_nothing(storage):
+    acc = make_account()
+    written, seq = acc.bytes_written, acc.seq
+    with acc:
+        pass
+    with acc:
+        # the same values again are no change at all
+        acc.check_todo("todo 1", False)
+        acc.edit_task("task 1", "body")
+        acc.delete_todo("missing")
+    assert acc.bytes_written == written
+    assert acc.seq == seq == storage.last_seq("tx")
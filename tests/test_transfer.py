@@ -0,0 +1,77 @@
+import io
+import pytest
+from account import Account
+from item import Task, Todo
+from transfer import read_ndjson, read_csv, import_items, import_file, export_file
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        '{"item-type": "todo", "todo-name": "y", "finished?": "no"}',
+        '{"item-type": "todo", "todo-name": "y", "finished?": 1}',
+        '{"item-type": "todo", "finished?": true}',
+        '{"item-type": "task", "task-name": "t", "task-preview": "p", "task-body": [0, 0, 1]}',
+        '{"item-type": "task", "task-name": "t", "task-content": null}',
+        '{"item-type": "task", "task-name": "", "task-content": "c"}',
+        '{"item-type": "note", "note-name": "n"}',
+        '["task", "t"]',
+    ],
+)
+def test_ndjson_refuses_what_is_not_a_full_item(line):
+    with pytest.raises(ValueError, match="not an item"):
+        list(read_ndjson(io.StringIO(line + "\n")))
+
+
+def test_ndjson_reads_items_and_skips_blank_lines():
+    text = (
+        '{"item-type": "task", "task-name": "t", "task-content": "a\\nb"}\n'
+        "\n"
+        '{"item-type": "todo", "todo-name": "d", "finished?": true}\n'
+    )
+    assert list(read_ndjson(io.StringIO(text))) == [Task("t", "a\nb"), Todo("d", True)]
+
+
+def test_csv_rows():
+    text = (
+        "item-type,name,content,finished?\n"
+        "task,t,\"two\nlines\",\n"
+        "todo,d,,TRUE\n"
+        "todo,e,,0\n"
+    )
+    assert list(read_csv(io.StringIO(text))) == [
+        Task("t", "two\nlines"),
+        Todo("d", True),
+        Todo("e", False),
+    ]
+    for bad_ in ("todo,,,1\n", "todo,d\n", "note,n,,\n"):
+        with pytest.raises(ValueError, match="row 2"):
+            list(read_csv(io.StringIO("item-type,name,content,finished?\n" + bad_)))
+
+
+def test_import_skips_names_already_there(storage):
+    acc = Account("transfer", "transfer")
+    with acc:
+        acc.add_task("kept", "mine")
+        acc.add_todo("done", True)
+    items = [Task("kept", "theirs"), Task("new", "body"), Todo("done", False), Todo("t2")]
+    stats = import_items(acc, items, batch=2)
+    assert (stats.count, stats.skipped) == (2, 2)
+    assert "2 already there skipped" in str(stats)
+    assert acc.get_task_content("kept") == "mine"
+    assert acc.todos["done"].finished
+    assert Account("transfer").has_todo("t2")
+
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".csv"])
+def test_export_then_import_round_trips(storage, tmp_path, suffix):
+    source = Account("source", "source")
+    with source:
+        source.add_task("task, with comma", 'quotes " and\nlines')
+        source.add_todo("todo", True)
+        source.add_todo("open", False)
+    path = tmp_path / f"items{suffix}"
+    assert export_file(source, path).count == 3
+    target = Account("target", "target")
+    assert import_file(target, path).count == 3
+    assert target.content == source.content